@@ -1,29 +1,183 @@
-from flask import Flask
 from flask_cors import CORS
 from .config import Config
+from .utils.lazy_app import LazyServiceApp
 from .utils.plaid_client import init_plaid_client
+from .utils.plaid_scheduler import PlaidScheduler
 from .utils.aws_cognito import init_cognito
 from .utils.aws_dynamodb import init_dynamodb
+from .utils.token_verifier import CognitoTokenVerifier
+from .utils.response_cache import ResponseCache
+from .utils.json_provider import select_json_provider
+from .utils.request_metrics import MetricsRegistry, init_request_metrics, instrument_boto3_client
+from .utils.request_profiler import RequestProfiler, init_request_profiler
 
 
 def create_app():
-    # Create the Flask app
-    app = Flask(__name__)
+    # Create the Flask app; its clients, models and controllers are built
+    # on first use, which keeps worker startup (and test setup) fast
+    app = LazyServiceApp(__name__)
     app.config.from_object(Config)
 
+    # Serialize responses with orjson when it is available
+    app.json = select_json_provider(app.config['JSON_PROVIDER'])(app)
+
     # Enable CORS for specific resources
     CORS(app)
 
     # Initialize AWS services
-    app.plaid_client = init_plaid_client(app.config)  # Initialize Plaid client
-    app.cognito = init_cognito(app.config)  # Initialize Cognito client
-    app.dynamodb = init_dynamodb(app.config)  # Initialize DynamoDB client
+    app.plaid_scheduler = PlaidScheduler.from_config(
+        app.config)  # Rate-limits and coalesces Plaid calls
+    app.register_service('plaid_client', lambda app: app.plaid_scheduler.wrap(
+        init_plaid_client(app.config)))  # Plaid client
+    app.register_service('cognito', init_cognito_service)  # Cognito client
+    app.register_service('dynamodb', init_dynamodb_service)  # DynamoDB resource
+    app.token_verifier = CognitoTokenVerifier.from_config(
+        app.config)  # Verifies Cognito JWTs locally
+    app.response_cache = ResponseCache.from_config(
+        app.config)  # Caches Plaid-derived responses
+
+    # Time requests and their phases for /metrics and Server-Timing
+    app.request_metrics = MetricsRegistry()
+    init_request_metrics(app, app.request_metrics)
+
+    # Profile requests that opt in (admin header) or are sampled
+    app.request_profiler = RequestProfiler.from_config(app.config)
+    init_request_profiler(app)
+
+    # Models and controllers are built once and shared across requests
+    init_services(app)
 
     # Register blueprints
     from .views.plaid_views import plaid_bp
     from .views.auth_views import auth_bp
+    from .views.transaction_views import transaction_bp
+    from .views.budget_views import budget_bp
+    from .views.subscription_views import subscription_bp
+    from .views.job_views import job_bp
+    from .views.metrics_views import metrics_bp
+    from .views.profile_views import profile_bp
 
     app.register_blueprint(plaid_bp, url_prefix='/plaid')
     app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(transaction_bp, url_prefix='/transactions')
+    app.register_blueprint(budget_bp, url_prefix='/budgets')
+    app.register_blueprint(subscription_bp, url_prefix='/subscriptions')
+    app.register_blueprint(job_bp, url_prefix='/jobs')
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(profile_bp, url_prefix='/admin/profiles')
 
     return app
+
+
+def init_cognito_service(app):
+    cognito = init_cognito(app.config)
+    instrument_boto3_client(cognito, 'cognito')
+    return cognito
+
+
+def init_dynamodb_service(app):
+    dynamodb = init_dynamodb(app.config)
+    instrument_boto3_client(dynamodb.meta.client, 'dynamodb')
+    return dynamodb
+
+
+def init_services(app):
+    """
+    Register the models and controllers, built once per app (i.e. per
+    worker process) on first use. They only hold references to the shared,
+    thread-safe clients, so every request reuses them instead of rebuilding
+    them.
+    """
+    from .models.user_model import UserModel
+    from .models.transaction_model import TransactionModel
+    from .models.rollup_model import RollupModel
+    from .models.budget_model import BudgetModel
+    from .models.subscription_model import SubscriptionModel
+    from .controllers.auth_controller import AuthController
+    from .controllers.plaid_controller import PlaidController
+    from .controllers.async_plaid_controller import AsyncPlaidController
+    from .controllers.sync_controller import SyncController
+    from .controllers.rollup_controller import RollupController
+    from .controllers.recurring_controller import RecurringController
+    from .controllers.transaction_controller import TransactionController
+    from .controllers.budget_controller import BudgetController
+    from .controllers.subscription_controller import SubscriptionController
+    from .controllers.webhook_controller import WebhookController
+    from .utils.webhook_verifier import PlaidWebhookVerifier
+    from .utils.keyed_lock import KeyedLock
+
+    app.register_service('user_model', lambda app: UserModel(app.dynamodb))
+    app.register_service('transaction_model', lambda app: TransactionModel(app.dynamodb))
+    app.register_service('rollup_model', lambda app: RollupModel(app.dynamodb))
+    app.register_service('budget_model', lambda app: BudgetModel(app.dynamodb))
+    app.register_service('subscription_model', lambda app: SubscriptionModel(app.dynamodb))
+
+    app.register_service('auth_controller', lambda app: AuthController(
+        app.cognito, app.user_model, app.config, app.token_verifier))
+    app.register_service('plaid_controller', lambda app: PlaidController(
+        app.plaid_client,
+        page_workers=app.config['PLAID_PAGE_WORKERS'],
+        webhook_url=app.config['PLAID_WEBHOOK_URL']
+    ))
+    app.register_service('async_plaid_controller', lambda app: AsyncPlaidController(
+        app.plaid_controller,
+        workers=app.config['PLAID_ASYNC_WORKERS'],
+        call_timeout=app.config['PLAID_CALL_TIMEOUT']
+    ))
+    # Per-user lock shared by syncs, imports and rollup rebuilds
+    app.register_service('user_locks', lambda app: KeyedLock())
+    app.register_service('recurring_controller', lambda app: RecurringController(
+        app.transaction_model, app.subscription_model))
+    app.register_service('sync_controller', lambda app: SyncController(
+        app.plaid_controller,
+        app.user_model,
+        app.transaction_model,
+        max_age=app.config['TRANSACTIONS_SYNC_MAX_AGE'],
+        rollup_model=app.rollup_model,
+        recurring_controller=app.recurring_controller,
+        response_cache=app.response_cache,
+        user_locks=app.user_locks,
+        # With webhooks keeping the store current, stale reads queue a sync
+        # instead of waiting on Plaid
+        enqueue_sync=(lambda user: app.job_controller.enqueue_sync(user))
+        if app.config['PLAID_WEBHOOK_URL'] else None
+    ))
+    app.register_service('rollup_controller', lambda app: RollupController(
+        app.rollup_model, app.transaction_model, user_locks=app.user_locks))
+    app.register_service('transaction_controller', lambda app: TransactionController(
+        app.transaction_model))
+    app.register_service('budget_controller', lambda app: BudgetController(app.budget_model))
+    app.register_service('subscription_controller', lambda app: SubscriptionController(
+        app.subscription_model))
+
+    # Plaid webhooks are verified on receipt and processed in the background
+    app.register_service('webhook_verifier', lambda app: PlaidWebhookVerifier(
+        app.plaid_client, max_age=app.config['PLAID_WEBHOOK_MAX_AGE']))
+    app.register_service('webhook_controller', lambda app: WebhookController(
+        app.user_model, app.sync_controller, app.response_cache))
+
+    # The runner is built with the controller that registers its handlers,
+    # so process-pool workers that only touch app.job_runner have them too
+    app.register_service('job_controller', init_job_controller)
+    app.register_service('job_runner', lambda app: app.job_controller.job_runner)
+
+
+def init_job_controller(app):
+    from .controllers.job_controller import JobController
+    from .utils.job_runner import JobRunner, DynamoDBJobStore
+
+    job_store = None
+    if app.config['JOB_STORE_TABLE']:
+        job_store = DynamoDBJobStore(app.dynamodb, app.config['JOB_STORE_TABLE'])
+    job_runner = JobRunner(
+        workers=app.config['JOB_WORKERS'],
+        maxsize=app.config['JOB_QUEUE_SIZE'],
+        max_retries=app.config['JOB_MAX_RETRIES'],
+        base_delay=app.config['JOB_RETRY_BASE_DELAY'],
+        mode=app.config['JOB_EXECUTOR'],
+        store=job_store
+    )
+    return JobController(
+        job_runner, app.user_model, app.sync_controller,
+        app.rollup_controller, app.webhook_controller,
+        response_cache=app.response_cache)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,9 +9,80 @@ class Config:
     AWS_REGION = os.getenv('AWS_REGION')
     AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
     AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
+    # Shared botocore connection pool, retries and timeouts (seconds)
+    AWS_MAX_POOL_CONNECTIONS = int(
+        os.getenv('AWS_MAX_POOL_CONNECTIONS', '50'))
+    AWS_MAX_ATTEMPTS = int(os.getenv('AWS_MAX_ATTEMPTS', '5'))
+    AWS_CONNECT_TIMEOUT = float(os.getenv('AWS_CONNECT_TIMEOUT', '2'))
+    AWS_READ_TIMEOUT = float(os.getenv('AWS_READ_TIMEOUT', '5'))
     COGNITO_USER_POOL_ID = os.getenv('COGNITO_USER_POOL_ID')
     COGNITO_APP_CLIENT_ID = os.getenv('COGNITO_APP_CLIENT_ID')
     COGNITO_APP_CLIENT_SECRET = os.getenv('COGNITO_APP_CLIENT_SECRET')
+    # Defaults to the user pool's /.well-known/jwks.json
+    COGNITO_JWKS_URL = os.getenv('COGNITO_JWKS_URL')
     PLAID_CLIENT_ID = os.getenv('PLAID_CLIENT_ID')
     PLAID_SECRET = os.getenv('PLAID_SECRET')
     PLAID_ENV = os.getenv('PLAID_ENV', 'sandbox')  # Default to 'sandbox'
+    # Overrides the https://<PLAID_ENV>.plaid.com API URL (e.g. for a local stand-in)
+    PLAID_HOST = os.getenv('PLAID_HOST')
+    # Plaid urllib3 pool size, timeouts (seconds) and page-fetch threads
+    PLAID_POOL_MAXSIZE = int(os.getenv('PLAID_POOL_MAXSIZE', '20'))
+    PLAID_CONNECT_TIMEOUT = float(os.getenv('PLAID_CONNECT_TIMEOUT', '3'))
+    PLAID_READ_TIMEOUT = float(os.getenv('PLAID_READ_TIMEOUT', '30'))
+    PLAID_PAGE_WORKERS = int(os.getenv('PLAID_PAGE_WORKERS', '4'))
+    # Threads and per-call timeout (seconds) for concurrent Plaid calls
+    PLAID_ASYNC_WORKERS = int(os.getenv('PLAID_ASYNC_WORKERS', '8'))
+    PLAID_CALL_TIMEOUT = float(os.getenv('PLAID_CALL_TIMEOUT', '30'))
+    # Longest a Plaid call may wait for a rate-limit token (seconds) before
+    # failing with a 429, and retries when Plaid returns RATE_LIMIT_EXCEEDED
+    PLAID_RATE_LIMIT_MAX_WAIT = float(
+        os.getenv('PLAID_RATE_LIMIT_MAX_WAIT', '10'))
+    PLAID_RATE_LIMIT_RETRIES = int(os.getenv('PLAID_RATE_LIMIT_RETRIES', '3'))
+    # JSON serializer for responses: "auto" (orjson if installed), "orjson" or "stdlib"
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+    # Webhook URL given to Plaid Link and the max age (seconds) of a signed webhook
+    PLAID_WEBHOOK_URL = os.getenv('PLAID_WEBHOOK_URL')
+    PLAID_WEBHOOK_MAX_AGE = int(os.getenv('PLAID_WEBHOOK_MAX_AGE', '300'))
+    # Background jobs: worker count, 'thread' or 'process' workers, max
+    # pending jobs, retries on Plaid rate limits and 5xx errors and the
+    # first retry delay (seconds). Set JOB_STORE_TABLE to persist jobs in
+    # DynamoDB
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+    JOB_EXECUTOR = os.getenv('JOB_EXECUTOR', 'thread')
+    JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', '1000'))
+    JOB_MAX_RETRIES = int(os.getenv('JOB_MAX_RETRIES', '5'))
+    JOB_RETRY_BASE_DELAY = float(os.getenv('JOB_RETRY_BASE_DELAY', '1'))
+    JOB_STORE_TABLE = os.getenv('JOB_STORE_TABLE')
+    # Opt-in Server-Timing header with per-phase request timings, and the
+    # bearer token /metrics and /plaid/scheduler/metrics require (unset =
+    # those endpoints are disabled)
+    SERVER_TIMING_HEADER = os.getenv(
+        'SERVER_TIMING_HEADER', 'false').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    # Opt-in request profiling. PROFILER_SECRET enables the X-Profile-Request
+    # header and guards /admin/profiles; PROFILER_SAMPLE_RATE (0-1) also
+    # profiles that fraction of requests to the comma-separated
+    # PROFILER_ENDPOINTS path prefixes (all paths when empty). PROFILER_MODE
+    # is 'sample' (stack sampling every PROFILER_INTERVAL seconds) or
+    # 'cprofile'; the last PROFILER_MAX_PROFILES are kept in PROFILER_DIR
+    PROFILER_SECRET = os.getenv('PROFILER_SECRET')
+    PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', '0'))
+    PROFILER_ENDPOINTS = os.getenv('PROFILER_ENDPOINTS', '')
+    PROFILER_MODE = os.getenv('PROFILER_MODE', 'sample')
+    PROFILER_INTERVAL = float(os.getenv('PROFILER_INTERVAL', '0.005'))
+    PROFILER_DIR = os.getenv('PROFILER_DIR', os.path.join(
+        tempfile.gettempdir(), 'spendwise-profiles'))
+    PROFILER_MAX_PROFILES = int(os.getenv('PROFILER_MAX_PROFILES', '50'))
+    # Writer threads used by bulk imports
+    BULK_WRITE_WORKERS = int(os.getenv('BULK_WRITE_WORKERS', '4'))
+    # Plaid response cache: entry count, TTLs (seconds) for windows that
+    # include today / lie in the past, and how long stale entries are served
+    # while they refresh. Set RESPONSE_CACHE_REDIS_URL to share it via Redis
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '2048'))
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '60'))
+    RESPONSE_CACHE_PAST_TTL = int(os.getenv('RESPONSE_CACHE_PAST_TTL', '86400'))
+    RESPONSE_CACHE_STALE_TTL = int(os.getenv('RESPONSE_CACHE_STALE_TTL', '300'))
+    RESPONSE_CACHE_REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL')
+    # Seconds before the local transaction store is considered stale
+    TRANSACTIONS_SYNC_MAX_AGE = int(
+        os.getenv('TRANSACTIONS_SYNC_MAX_AGE', '300'))
@@ -0,0 +1,73 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class PlaidCallTimeout(Exception):
+    pass
+
+
+class AsyncPlaidController:
+    """
+    Async facade over PlaidController for endpoints that make several
+    independent calls.
+
+    plaid-python's client is blocking, so each call runs on a shared thread
+    pool and is awaited from the event loop; `gather` runs calls
+    concurrently, so an endpoint costs as much as its slowest call rather
+    than the sum. Every call has a timeout, and when one call fails or times
+    out the request stops waiting for the calls still pending. They are
+    abandoned, not stopped: their executor threads run to completion and
+    the results are discarded.
+    """
+
+    def __init__(self, plaid_controller, workers=8, call_timeout=30):
+        self.plaid_controller = plaid_controller
+        self.call_timeout = call_timeout
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='plaid-async')
+
+    async def call(self, func, *args, timeout=None, **kwargs):
+        """
+        Run a blocking call on the pool and await its result.
+        """
+        timeout = timeout or self.call_timeout
+        loop = asyncio.get_running_loop()
+        # Run in a copy of this context so the call's time still counts
+        # towards the request's phase timings
+        context = contextvars.copy_context()
+        try:
+            async with asyncio.timeout(timeout):
+                return await loop.run_in_executor(
+                    self.executor, context.run, partial(func, *args, **kwargs))
+        except TimeoutError:
+            # The worker thread finishes on its own (bounded by the HTTP
+            # read timeout); its result is discarded
+            raise PlaidCallTimeout(
+                f"{getattr(func, '__name__', 'Plaid call')} timed out after {timeout}s")
+
+    async def gather(self, *coroutines):
+        """
+        Await every coroutine concurrently and return their results in order.
+        The first failure is re-raised and the rest are abandoned (their
+        awaits are cancelled; calls already on the pool still finish).
+        """
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(coroutine) for coroutine in coroutines]
+        except BaseExceptionGroup as e:
+            raise e.exceptions[0]
+        return [task.result() for task in tasks]
+
+    async def get_account_details(self, access_token, account_id, timeout=None):
+        return await self.call(
+            self.plaid_controller.get_account_details, access_token, account_id,
+            timeout=timeout)
+
+    def run(self, coroutine):
+        """
+        Bridge for the (synchronous) Flask views: run `coroutine` to
+        completion on a fresh event loop in the request thread.
+        """
+        return asyncio.run(coroutine)
@@ -1,12 +1,14 @@
 from botocore.exceptions import ClientError
 from ..utils.calculate_secret_hash import calculate_secret_hash
+from ..utils.token_verifier import TokenVerificationError
 from botocore.exceptions import ClientError as DynamoDBClientError
 
 
 class AuthController:
-    def __init__(self, cognito, user_model, config):
+    def __init__(self, cognito, user_model, config, token_verifier=None):
         self.cognito = cognito
         self.user_model = user_model
+        self.token_verifier = token_verifier
         self.user_pool_id = config['COGNITO_USER_POOL_ID']
         self.app_client_id = config['COGNITO_APP_CLIENT_ID']
         self.app_client_secret = config['COGNITO_APP_CLIENT_SECRET']
@@ -85,10 +87,15 @@ class AuthController:
             auth_result = response['AuthenticationResult']
             access_token = auth_result['AccessToken']
 
-            # Use the access token to get the user's attributes (including user_id)
-            user_response = self.cognito.get_user(AccessToken=access_token)
-            user_id = next(
-                attr['Value'] for attr in user_response['UserAttributes'] if attr['Name'] == 'sub')
+            # The ID token's `sub` claim is the user_id; verifying it locally
+            # saves a cognito.get_user round trip
+            if self.token_verifier:
+                user_id = self.token_verifier.verify(
+                    auth_result['IdToken'], token_use='id')['sub']
+            else:
+                user_response = self.cognito.get_user(AccessToken=access_token)
+                user_id = next(
+                    attr['Value'] for attr in user_response['UserAttributes'] if attr['Name'] == 'sub')
 
             # Return tokens, user_id, and a success message
             return {
@@ -103,6 +110,8 @@ class AuthController:
             return {"error": "Invalid credentials"}, 401
         except self.cognito.exceptions.UserNotFoundException:
             return {"error": "User not found"}, 404
+        except TokenVerificationError as e:
+            return {"error": f"Unexpected error: {str(e)}"}, 500
         except ClientError as e:
             return {"error": f"Unexpected error: {str(e)}"}, 500
 
@@ -113,6 +122,11 @@ class AuthController:
         try:
             # Use the access token to sign out the user globally
             self.cognito.global_sign_out(AccessToken=access_token)
+
+            # Locally verified tokens stay valid until they expire, so stop
+            # accepting this one in this process right away
+            if self.token_verifier:
+                self.token_verifier.revoke(access_token)
             return {"message": "Sign out successful"}, 200
 
         except self.cognito.exceptions.NotAuthorizedException:
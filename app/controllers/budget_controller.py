@@ -6,9 +6,13 @@ class BudgetController:
         self.budget_model.create_budget(user_id, category, amount)
         return {"message": "Budget created successfully"}, 201
 
-    def get_budgets(self, user_id):
-        budgets = self.budget_model.get_budgets(user_id)
-        return {"budgets": budgets}, 200
+    def get_budgets(self, user_id, limit, page_token=None):
+        budgets, next_page_token = self.budget_model.get_budgets_page(
+            user_id, limit, page_token)
+        return {"budgets": budgets, "next_page_token": next_page_token}, 200
+
+    def iter_budgets(self, user_id):
+        return self.budget_model.iter_budgets(user_id)
 
     def update_budget(self, user_id, category, new_amount):
         self.budget_model.update_budget(user_id, category, new_amount)
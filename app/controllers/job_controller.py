@@ -0,0 +1,64 @@
+from ..utils.response_cache import cache_scope
+
+
+class JobController:
+    """
+    Registers the app's background jobs and queues them. Jobs touching a
+    Plaid item share the item's serialization key, so a webhook sync, a
+    requested sync and a rollup rebuild for the same item never overlap.
+    With process workers, this process re-reads the job's user and drops
+    its cached responses once the job has run.
+    """
+
+    def __init__(self, job_runner, user_model, sync_controller, rollup_controller, webhook_controller,
+                 response_cache=None):
+        self.job_runner = job_runner
+        self.user_model = user_model
+        self.sync_controller = sync_controller
+        self.rollup_controller = rollup_controller
+        self.webhook_controller = webhook_controller
+        self.response_cache = response_cache
+
+        job_runner.register('sync_user', self._sync_user, after_process=self._refresh_user)
+        job_runner.register('rebuild_rollups', self._rebuild_rollups, after_process=self._refresh_user)
+        job_runner.register('plaid_webhook', self._handle_webhook, after_process=self._refresh_item)
+
+    def enqueue_sync(self, user):
+        return self.job_runner.submit(
+            'sync_user', {'user_id': user['user_id']}, key=cache_scope(user))
+
+    def enqueue_rollup_rebuild(self, user):
+        return self.job_runner.submit(
+            'rebuild_rollups', {'user_id': user['user_id']}, key=cache_scope(user))
+
+    def enqueue_webhook(self, event):
+        return self.job_runner.submit(
+            'plaid_webhook', {'event': event}, key=event['item_id'])
+
+    def get_job(self, job_id):
+        return self.job_runner.get(job_id)
+
+    def _sync_user(self, payload):
+        user = self.user_model.get_user(payload['user_id'])
+        if not user or not user.get('access_token'):
+            return None
+        return self.sync_controller.sync_user(user)
+
+    def _rebuild_rollups(self, payload):
+        return self.rollup_controller.rebuild(payload['user_id'])
+
+    def _handle_webhook(self, payload):
+        return self.webhook_controller.handle(payload['event'])
+
+    def _refresh_user(self, payload):
+        # Re-reading the user also refreshes the user cache
+        self._invalidate(self.user_model.get_user_fresh(payload['user_id']))
+
+    def _refresh_item(self, payload):
+        user = self.user_model.get_user_by_item_id(payload['event']['item_id'])
+        if user:
+            self._refresh_user(user)
+
+    def _invalidate(self, user):
+        if user and self.response_cache is not None:
+            self.response_cache.invalidate(cache_scope(user))
@@ -1,21 +1,70 @@
-from plaid.model.link_token_create_request import LinkTokenCreateRequest
-from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-from plaid.model.accounts_get_request import AccountsGetRequest
-from plaid.model.products import Products
-from plaid.model.country_code import CountryCode
-from plaid.model.transactions_get_request import TransactionsGetRequest
-from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
-from plaid.model.liabilities_get_request import LiabilitiesGetRequest
 from plaid.exceptions import ApiException
-from datetime import datetime, timedelta, date
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, date
+from ..utils.recurring_detector import RecurringDetector
+from ..utils.single_flight import SingleFlight
+from ..utils.transaction_record import project_transactions
+from ..utils.request_metrics import timed
+
+# Largest page size Plaid accepts for /transactions/get
+TRANSACTIONS_PAGE_SIZE = 500
+
+
+def transaction_frame(transactions):
+    """
+    Columnar view of `transactions` for the aggregations. numpy is only
+    loaded once a worker first aggregates something.
+    """
+    from ..utils.transaction_aggregator import TransactionFrame
+
+    return TransactionFrame(transactions)
+
+
+def previous_month_range(today=None):
+    """
+    Return the first and last day of the month before `today`.
+    """
+    today = today or date.today()
+    first_day_current_month = today.replace(day=1)
+    last_day_previous_month = first_day_current_month - timedelta(days=1)
+    first_day_previous_month = last_day_previous_month.replace(day=1)
+    return first_day_previous_month, last_day_previous_month
+
+
+def dashboard_range(today=None, summary_days=30, recurring_days=90):
+    """
+    Return the single date window that covers every dashboard widget:
+    the current year, the previous month and the summary/recurring lookbacks.
+    """
+    today = today or date.today()
+    start_date = min(
+        date(today.year, 1, 1),
+        previous_month_range(today)[0],
+        today - timedelta(days=summary_days),
+        today - timedelta(days=recurring_days)
+    )
+    return start_date, today
 
 
 class PlaidController:
-    def __init__(self, plaid_client):
+    def __init__(self, plaid_client, page_workers=4, webhook_url=None):
         self.plaid_client = plaid_client
+        self.page_workers = page_workers
+        self.webhook_url = webhook_url
+        # Concurrent identical reads (e.g. a dashboard's parallel requests)
+        # share one Plaid round trip
+        self.flights = SingleFlight()
 
     def create_link_token(self, user_id):
+        # Plaid model modules are imported where used to keep startup fast
+        from plaid.model.link_token_create_request import LinkTokenCreateRequest
+        from plaid.model.products import Products
+        from plaid.model.country_code import CountryCode
+
+        options = {}
+        if self.webhook_url:
+            # Items linked with this token send their webhooks here
+            options['webhook'] = self.webhook_url
         request = LinkTokenCreateRequest(
             user={
                 "client_user_id": user_id,
@@ -25,319 +74,262 @@ class PlaidController:
             country_codes=[CountryCode('US')],
             language="en",
             redirect_uri="http://localhost:3000/login",
+            **options
         )
         response = self.plaid_client.link_token_create(request)
-        return response.to_dict()["link_token"]
+        return response.link_token
 
     def exchange_public_token(self, public_token):
+        from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
+
         # Updated Public Token Exchange logic
         request = ItemPublicTokenExchangeRequest(public_token=public_token)
         response = self.plaid_client.item_public_token_exchange(request)
-        access_token = response.to_dict()["access_token"]
-        item_id = response.to_dict()["item_id"]
-        return access_token, item_id
+        return response.access_token, response.item_id
 
     def get_accounts(self, access_token):
         """
         Retrieve accounts and balances associated with the given access token.
         """
-        try:
-            # Use the access token to fetch accounts
-            request = AccountsGetRequest(access_token=access_token)
-            response = self.plaid_client.accounts_get(request)
-            accounts = response.to_dict()["accounts"]
-            return accounts
-        except Exception as e:
-            raise Exception(f"Error fetching accounts: {str(e)}")
-
-    def get_transactions_summary(self, access_token, start_date=None, end_date=None):
-        """
-        Fetch and summarize transactions into income and expenses.
-        Allows optional start_date and end_date.
-        """
-        try:
-            # Set default date range (last 30 days) if not provided
-            end_date = end_date or datetime.now().date()
-            start_date = start_date or (end_date - timedelta(days=30))
-
-            # Request transactions from Plaid
-            request = TransactionsGetRequest(
-                access_token=access_token,
-                start_date=start_date,
-                end_date=end_date,
-                options=TransactionsGetRequestOptions(count=500, offset=0)
-            )
-            response = self.plaid_client.transactions_get(request)
-            transactions = response.to_dict()["transactions"]
-
-            # Summarize income and expenses
-            summary = {
-                "income": 0,
-                "expenses": 0,
-                "income_details": [],
-                "expense_details": []
-            }
-
-            for txn in transactions:
-                amount = txn["amount"]
-                category = txn.get("category", ["Uncategorized"])[0]
-                date = txn["date"]
-
-                # Income: Negative amount
-                if amount < 0:
-                    summary["income"] += abs(amount)
-                    summary["income_details"].append({
-                        "date": date,
-                        "amount": abs(amount),
-                        "category": category,
-                        "name": txn["name"]
-                    })
-                # Expenses: Positive amount
-                else:
-                    summary["expenses"] += amount
-                    summary["expense_details"].append({
-                        "date": date,
-                        "amount": amount,
-                        "category": category,
-                        "name": txn["name"]
-                    })
-
-            return summary
-        except Exception as e:
-            raise Exception(f"Error fetching transactions: {str(e)}")
-
-    def get_transactions(self, access_token):
-        """
-        Fetch all transactions for the current year.
-        """
-        try:
-            end_date = datetime.now().date()
-            start_date = datetime(end_date.year, 1, 1).date()
-
-            # Plaid Transactions API request requires date objects
-            request = TransactionsGetRequest(
-                access_token=access_token,
-                start_date=start_date,  # Pass as date
-                end_date=end_date,      # Pass as date
-                options=TransactionsGetRequestOptions(count=500, offset=0)
-            )
-            response = self.plaid_client.transactions_get(request)
-            transactions = response.to_dict()["transactions"]
-
-            return transactions
-        except Exception as e:
-            raise Exception(f"Error fetching transactions: {str(e)}")
+        # Use the access token to fetch accounts
+        accounts = self.flights.do(
+            ('accounts', access_token), self._fetch_accounts, access_token)
+        return list(accounts)
 
-    def get_monthly_summary(self, access_token):
-        """
-        Get income and expense summary grouped by month for the current year.
-        """
-        try:
-            # Fetch all transactions for the current year
-            transactions = self.get_transactions(access_token)
-
-            # Dictionary to store monthly income and expenses
-            monthly_summary = defaultdict(
-                lambda: {"income": 0.0, "expenses": 0.0})
-
-            # Process transactions
-            for txn in transactions:
-                # Safely extract and parse the date
-                tx_date_str = txn.get("date")
-                if not tx_date_str:
-                    continue  # Skip transactions without a date
-
-                try:
-                    tx_date = datetime.strptime(tx_date_str, "%Y-%m-%d").date()
-                except ValueError:
-                    continue  # Skip transactions with invalid date formats
-
-                # Extract month name (e.g., "January", "February")
-                month = tx_date.strftime("%B")
-
-                # Extract the transaction amount
-                amount = txn.get("amount", 0.0)
-                if amount < 0:
-                    # Income is negative
-                    monthly_summary[month]["income"] += abs(amount)
-                else:
-                    # Expense is positive
-                    monthly_summary[month]["expenses"] += amount
-
-            # Prepare the result sorted by month order
-            month_order = ['January', 'February', 'March', 'April', 'May', 'June',
-                           'July', 'August', 'September', 'October', 'November', 'December']
-
-            result = [
-                {
-                    "month": month,
-                    "income": round(monthly_summary[month]["income"], 2),
-                    "expenses": round(monthly_summary[month]["expenses"], 2)
-                }
-                for month in month_order if month in monthly_summary
-            ]
+    def _fetch_accounts(self, access_token):
+        from plaid.model.accounts_get_request import AccountsGetRequest
 
-            return result
-        except Exception as e:
-            raise Exception(f"Error fetching monthly summary: {str(e)}")
+        request = AccountsGetRequest(access_token=access_token)
+        response = self.plaid_client.accounts_get(request)
+        with timed('convert'):
+            return response.to_dict()["accounts"]
 
-    def get_previous_month_expenses(self, access_token):
+    def fetch_transactions(self, access_token, start_date, end_date, account_ids=None):
         """
-        Fetch expenses for the previous month and categorize them.
+        Fetch every transaction in the date window, not just the first page.
+        The first page tells us `total_transactions`; the remaining offsets are
+        then requested concurrently and merged back in offset order.
+        Concurrent calls for the same window share one fetch.
         """
-        try:
-            # Calculate previous month's start and end dates
-            today = date.today()
-            first_day_current_month = today.replace(day=1)
-            last_day_previous_month = first_day_current_month - \
-                timedelta(days=1)
-            first_day_previous_month = last_day_previous_month.replace(day=1)
-
-            # start_date and end_date as date objects
-            start_date = first_day_previous_month
-            end_date = last_day_previous_month
-
-            # Fetch transactions from Plaid
-            request = TransactionsGetRequest(
-                access_token=access_token,
-                start_date=start_date,
-                end_date=end_date,
-                options=TransactionsGetRequestOptions(count=500, offset=0)
-            )
-            response = self.plaid_client.transactions_get(request)
-            transactions = response.to_dict()["transactions"]
-
-            # Group expenses by category
-            category_expenses = defaultdict(float)
-            total_expenses = 0.0
-
-            for txn in transactions:
-                amount = txn["amount"]
-                category = txn.get("category", ["Uncategorized"])[0]
-
-                # Only process expenses (positive amounts)
-                if amount > 0:
-                    category_expenses[category] += amount
-                    total_expenses += amount
-
-            # Format results
-            formatted_categories = [
-                {"category": cat, "amount": round(amount, 2)}
-                for cat, amount in category_expenses.items()
-            ]
+        key = ('transactions', access_token, start_date, end_date,
+               tuple(account_ids or ()))
+        transactions = self.flights.do(
+            key, self._fetch_all_transactions, access_token, start_date, end_date, account_ids)
+        return list(transactions)
+
+    def _fetch_all_transactions(self, access_token, start_date, end_date, account_ids=None):
+        first_page = self._fetch_transactions_page(
+            access_token, start_date, end_date, 0, account_ids)
+        transactions = first_page["transactions"]
+
+        offsets = range(len(transactions),
+                        first_page["total_transactions"], TRANSACTIONS_PAGE_SIZE)
+        if not transactions or not offsets:
+            return transactions
 
+        with ThreadPoolExecutor(max_workers=self.page_workers) as executor:
+            pages = executor.map(
+                lambda offset: self._fetch_transactions_page(
+                    access_token, start_date, end_date, offset, account_ids),
+                offsets)
+            for page in pages:
+                transactions.extend(page["transactions"])
+
+        return transactions
+
+    def _fetch_transactions_page(self, access_token, start_date, end_date, offset, account_ids=None):
+        from plaid.model.transactions_get_request import TransactionsGetRequest
+        from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
+
+        options = {"count": TRANSACTIONS_PAGE_SIZE, "offset": offset}
+        if account_ids:
+            options["account_ids"] = account_ids
+
+        # Plaid Transactions API request requires date objects
+        request = TransactionsGetRequest(
+            access_token=access_token,
+            start_date=start_date,
+            end_date=end_date,
+            options=TransactionsGetRequestOptions(**options)
+        )
+        # Project straight off the response models; to_dict() would copy
+        # every nested field of every transaction first
+        response = self.plaid_client.transactions_get(request)
+        with timed('convert'):
             return {
-                "categories": formatted_categories,
-                "total_categories": len(category_expenses),
-                "total_expenses": round(total_expenses, 2)
+                "transactions": project_transactions(response.transactions),
+                "total_transactions": response.total_transactions
             }
 
-        except Exception as e:
-            raise Exception(
-                f"Error fetching previous month expenses: {str(e)}")
+    def sync_transactions(self, access_token, cursor=None):
+        """
+        Pull transaction deltas for an item using Plaid's /transactions/sync.
+        Starts from `cursor` (or the beginning of history when None) and pages
+        until `has_more` is false. Returns the added/modified/removed lists and
+        the cursor to persist for the next sync.
+        """
+        start_cursor = cursor
+        while True:
+            try:
+                return self._sync_from_cursor(access_token, start_cursor)
+            except ApiException as e:
+                # Plaid asks us to restart the whole pagination loop if the
+                # item changed while we were paging through it
+                if "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION" in str(e.body):
+                    continue
+                raise
+
+    def _sync_from_cursor(self, access_token, cursor):
+        from plaid.model.transactions_sync_request import TransactionsSyncRequest
+
+        added, modified, removed = [], [], []
+        has_more = True
+
+        while has_more:
+            request_args = {"access_token": access_token}
+            if cursor:
+                request_args["cursor"] = cursor
+            response = self.plaid_client.transactions_sync(
+                TransactionsSyncRequest(**request_args))
+
+            with timed('convert'):
+                added.extend(project_transactions(response.added))
+                modified.extend(project_transactions(response.modified))
+                removed.extend({"transaction_id": txn.transaction_id}
+                               for txn in response.removed)
+            has_more = response.has_more
+            cursor = response.next_cursor
+
+        return {
+            "added": added,
+            "modified": modified,
+            "removed": removed,
+            "next_cursor": cursor
+        }
 
     def get_account_details(self, access_token, account_id):
         """
         Fetch account details for a specific account.
         """
-        try:
-            # Use the AccountsGetRequest to fetch account details
-            request = AccountsGetRequest(access_token=access_token)
-            response = self.plaid_client.accounts_get(request)
+        from plaid.model.accounts_get_request import AccountsGetRequest
+
+        # Use the AccountsGetRequest to fetch account details
+        request = AccountsGetRequest(access_token=access_token)
+        response = self.plaid_client.accounts_get(request)
+        with timed('convert'):
             accounts = response.to_dict().get("accounts", [])
 
-            # Filter to get the specific account by account_id
-            for account in accounts:
-                if account["account_id"] == account_id:
-                    return account  # Return the matched account details
+        # Filter to get the specific account by account_id
+        for account in accounts:
+            if account["account_id"] == account_id:
+                return account  # Return the matched account details
 
-            # If no account matches, raise an exception
-            raise Exception("Account not found for the given account_id")
+        # If no account matches, raise an exception
+        raise Exception("Account not found for the given account_id")
+
+    @timed('aggregate')
+    def summarize_transactions(self, transactions):
+        """
+        Split transactions into income and expenses with per-transaction details.
+        """
+        return transaction_frame(transactions).summary()
 
-        except Exception as e:
-            raise Exception(f"Error fetching account details: {str(e)}")
+    @timed('aggregate')
+    def summarize_monthly(self, transactions, month_format="%B"):
+        """
+        Group income and expenses by calendar month (full month names by default).
+        """
+        return transaction_frame(transactions).monthly_summary(month_format=month_format)
 
-    def get_transactions_for_account(self, access_token, account_id, days=90):
+    @timed('aggregate')
+    def summarize_expense_categories(self, transactions):
         """
-        Fetch transactions for a specific account and identify recurring transactions.
+        Group expenses (positive amounts) by their primary category.
         """
-        try:
-            # Set the start and end dates for the transactions
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=days)
-
-            # Pass `start_date` and `end_date` as `datetime.date` objects
-            request = TransactionsGetRequest(
-                access_token=access_token,
-                start_date=start_date,  # Pass as `date` object
-                end_date=end_date,      # Pass as `date` object
-                options=TransactionsGetRequestOptions(
-                    account_ids=[account_id], count=500, offset=0)
-            )
-            response = self.plaid_client.transactions_get(request)
-            transactions = response.to_dict().get("transactions", [])
-
-            # Process transactions to identify recurring ones
-            recurring_transactions = self.identify_recurring_transactions(
-                transactions)
+        return transaction_frame(transactions).expense_categories()
 
-            return {
-                "transactions": transactions,
-                "recurring_transactions": recurring_transactions
+    @timed('aggregate')
+    def build_dashboard(self, transactions, today=None, summary_days=30, recurring_days=90):
+        """
+        Compute every dashboard widget from one columnar view of `transactions`,
+        which should cover `dashboard_range(today)`:
+        - income/expense summary for the last `summary_days`
+        - monthly income/expenses for the current year
+        - expense categories for the previous month
+        - recurring transactions per account over the last `recurring_days`
+        """
+        today = today or date.today()
+        frame = transaction_frame(transactions)
+
+        summary = frame.summary(
+            frame.window(today - timedelta(days=summary_days), today), details=False)
+        current_year = frame.window(date(today.year, 1, 1), today)
+        previous_month = frame.window(*previous_month_range(today))
+        recurring_window = frame.window(
+            today - timedelta(days=recurring_days), today)
+
+        return {
+            "summary": {
+                "income": round(summary["income"], 2),
+                "expenses": round(summary["expenses"], 2)
+            },
+            "monthly_summary": frame.monthly_summary(current_year, month_format="%b"),
+            "expense_categories": frame.expense_categories(previous_month),
+            "recurring_transactions": {
+                account_id: self.identify_recurring_transactions(account_txns)
+                for account_id, account_txns in frame.group_by_account(recurring_window).items()
             }
-        except Exception as e:
-            raise Exception(f"Error fetching transactions: {str(e)}")
+        }
 
+    @timed('aggregate')
     def identify_recurring_transactions(self, transactions):
         """
-        Identify recurring transactions based on transaction name and frequency.
+        Identify recurring transactions by normalized merchant, cadence
+        (weekly/biweekly/monthly/annual) and amount stability.
         """
-        transaction_counts = defaultdict(list)
-
-        # Group transactions by name and store transaction amounts and dates
-        for txn in transactions:
-            transaction_counts[txn['name']].append({
-                "amount": txn['amount'],
-                "date": txn['date']
-            })
-
-        # Identify recurring transactions (e.g., more than 3 occurrences)
-        recurring = []
-        for name, txn_list in transaction_counts.items():
-            if len(txn_list) >= 3:  # Arbitrary threshold for recurring
-                recurring.append({
-                    "name": name,
-                    "occurrences": len(txn_list),
-                    "transactions": txn_list
-                })
-
-        return recurring
+        detector = RecurringDetector()
+        # Transactions without an id (e.g. ad-hoc lists) are keyed by position
+        detector.update(
+            txn if txn.get('transaction_id') else {**txn, 'transaction_id': str(i)}
+            for i, txn in enumerate(transactions))
+
+        return [{
+            "name": result["name"],
+            "frequency": result["frequency"],
+            "score": result["score"],
+            "next_date": result["next_date"],
+            "occurrences": result["occurrences"],
+            "transactions": [
+                {"amount": txn["amount"], "date": txn["date"]}
+                for txn in result["transactions"]
+            ]
+        } for result in detector.recurring()]
 
     def get_liabilities(self, access_token):
         """
         Fetch and return the entire liabilities response for the given access token.
         """
-        try:
-            request = LiabilitiesGetRequest(access_token=access_token)
-            response = self.plaid_client.liabilities_get(request)
+        from plaid.model.liabilities_get_request import LiabilitiesGetRequest
 
-            # Convert response to a dictionary
-            liabilities = response.to_dict()
-
-            # Sanitize the liabilities fields
-            if "liabilities" in liabilities:
-                for liability_type in ["mortgage", "student", "credit"]:
-                    if liability_type in liabilities["liabilities"]:
-                        for item in liabilities["liabilities"][liability_type]:
-                            # Replace None with empty strings or default values
-                            if item.get("account_number") is None:
-                                item["account_number"] = ""
+        request = LiabilitiesGetRequest(access_token=access_token)
+        response = self.plaid_client.liabilities_get(request)
 
-                            # Example: Handle additional fields if needed
-                            if "interest_rate" in item and item["interest_rate"].get("percentage") is None:
-                                item["interest_rate"]["percentage"] = 0.0
-
-            return liabilities
+        # Convert response to a dictionary
+        with timed('convert'):
+            liabilities = response.to_dict()
 
-        except ApiException as e:
-            raise Exception(f"Error fetching liabilities: {str(e)}")
+        # Sanitize the liabilities fields
+        if "liabilities" in liabilities:
+            for liability_type in ["mortgage", "student", "credit"]:
+                # Plaid returns null for liability types the item has none of
+                if liabilities["liabilities"].get(liability_type):
+                    for item in liabilities["liabilities"][liability_type]:
+                        # Replace None with empty strings or default values
+                        if item.get("account_number") is None:
+                            item["account_number"] = ""
+
+                        # Example: Handle additional fields if needed
+                        if "interest_rate" in item and item["interest_rate"].get("percentage") is None:
+                            item["interest_rate"]["percentage"] = 0.0
+
+        return liabilities
@@ -0,0 +1,86 @@
+from decimal import Decimal
+from ..utils.recurring_detector import RecurringDetector
+from ..utils.ttl_cache import TTLCache
+
+# Only what the detector needs is read when rebuilding a user's state
+DETECTOR_PROJECTION = ['transaction_id', 'date', 'amount', 'name', 'merchant_name']
+SUBSCRIPTION_PROJECTION = ['merchant', 'source']
+
+
+class RecurringController:
+    """
+    Keeps each user's detected subscriptions in SpendWiseSubscriptions.
+
+    Detector state is cached per user in this process and updated from each
+    sync's deltas. On a cache miss (first sync in this process, or after
+    `state_ttl` seconds, which bounds drift when another process synced the
+    same user) it is rebuilt from the transaction store, and the stored
+    detected subscriptions tell it which merchants were recurring before.
+    """
+
+    def __init__(self, transaction_model, subscription_model, state_ttl=3600, max_users=1024,
+                 min_score=0.75):
+        self.transaction_model = transaction_model
+        self.subscription_model = subscription_model
+        self.min_score = min_score
+        self.detectors = TTLCache(maxsize=max_users, ttl=state_ttl)
+
+    def apply_sync(self, user_id, upserted_items, removed_ids):
+        """
+        Feed one sync's stored items and removed ids into the user's detector
+        and write the subscriptions whose detection changed.
+        """
+        detector = self.detectors.get(user_id)
+        if detector is None:
+            # The store already holds this sync's writes
+            detector = self._build_detector(user_id)
+        else:
+            detector.update(upserted_items)
+            detector.remove(removed_ids)
+
+        recurring, dropped = detector.pop_changes()
+        self.detectors.set(user_id, detector)
+
+        if recurring:
+            self.subscription_model.add_subscriptions(
+                [to_subscription_item(user_id, result) for result in recurring])
+        for merchant in dropped:
+            self.subscription_model.delete_subscription(
+                user_id, subscription_id(user_id, merchant))
+
+        return {"detected": len(recurring), "dropped": len(dropped)}
+
+    def _build_detector(self, user_id):
+        detector = RecurringDetector(min_score=self.min_score)
+        detector.update(self.transaction_model.iter_transactions(
+            user_id, projection=DETECTOR_PROJECTION))
+        # Subscriptions added by hand are not the detector's to drop
+        detector.mark_recurring(
+            subscription['merchant']
+            for subscription in self.subscription_model.iter_subscriptions(
+                user_id, projection=SUBSCRIPTION_PROJECTION)
+            if subscription.get('source') == 'detected' and subscription.get('merchant'))
+        return detector
+
+
+def subscription_id(user_id, merchant):
+    return f"{user_id}#{merchant}"
+
+
+def to_subscription_item(user_id, result):
+    """
+    Store a detector result as a subscription (amounts and scores as Decimal).
+    """
+    return {
+        'subscription_id': subscription_id(user_id, result['merchant']),
+        'user_id': user_id,
+        'name': result['name'],
+        'merchant': result['merchant'],
+        'amount': Decimal(str(result['average_amount'])),
+        'frequency': result['frequency'],
+        'score': Decimal(str(result['score'])),
+        'occurrences': result['occurrences'],
+        'last_date': result['last_date'],
+        'next_date': result['next_date'],
+        'source': 'detected'
+    }
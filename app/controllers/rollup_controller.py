@@ -0,0 +1,67 @@
+from datetime import date
+from ..models.rollup_model import compute_rollup_deltas
+from ..utils.keyed_lock import KeyedLock
+
+# Only the fields the rollups are built from
+ROLLUP_PROJECTION = ['date', 'amount', 'category']
+
+
+class RollupController:
+    """
+    Serve monthly and category summaries from the precomputed rollups,
+    so reads no longer grow with the number of transactions.
+    """
+
+    def __init__(self, rollup_model, transaction_model=None, user_locks=None):
+        self.rollup_model = rollup_model
+        self.transaction_model = transaction_model
+        # Shared with SyncController, so a rebuild never interleaves with a
+        # sync or import writing the same user's deltas
+        self.user_locks = user_locks or KeyedLock()
+
+    def rebuild(self, user_id):
+        """
+        Recompute every rollup for a user from the transaction store, e.g.
+        after a backfill or to repair drift. Holds the user's lock for the
+        whole rebuild, so no sync or import applies deltas in between.
+        """
+        with self.user_locks.hold(user_id):
+            items = self.transaction_model.iter_stored_items(
+                user_id, projection=ROLLUP_PROJECTION)
+            months = self.rollup_model.replace_rollups(
+                user_id, compute_rollup_deltas(items, []))
+        return {"months": months}
+
+    def get_monthly_summary(self, user_id, year, month_format="%b"):
+        """
+        Income and expenses for every month of `year` that has activity.
+        """
+        rollups = self.rollup_model.get_rollups(
+            user_id, f"{year}-01", f"{year}-12")
+
+        return [
+            {
+                "month": date(year, int(rollup["month"][5:7]), 1).strftime(month_format),
+                "income": round(rollup["income"], 2),
+                "expenses": round(rollup["expenses"], 2)
+            }
+            for rollup in sorted(rollups, key=lambda rollup: rollup["month"])
+            if rollup["transaction_count"] > 0
+        ]
+
+    def get_expense_categories(self, user_id, month_start):
+        """
+        Expense breakdown by category for the month starting at `month_start`.
+        """
+        rollup = self.rollup_model.get_rollup(
+            user_id, month_start.strftime("%Y-%m"))
+        categories = rollup["categories"] if rollup else {}
+
+        return {
+            "categories": [
+                {"category": cat, "amount": round(amount, 2)}
+                for cat, amount in categories.items()
+            ],
+            "total_categories": len(categories),
+            "total_expenses": round(sum(categories.values()), 2)
+        }
@@ -6,10 +6,15 @@ class SubscriptionController:
         self.subscription_model.add_subscription(subscription)
         return {"message": "Subscription added successfully"}, 201
 
-    def get_subscriptions(self, user_id):
-        subscriptions = self.subscription_model.get_subscriptions(user_id)
-        return {"subscriptions": subscriptions}, 200
+    def get_subscriptions(self, user_id, limit, page_token=None):
+        subscriptions, next_page_token = self.subscription_model.get_subscriptions_page(
+            user_id, limit, page_token)
+        return {"subscriptions": subscriptions, "next_page_token": next_page_token}, 200
 
-    def delete_subscription(self, subscription_id):
-        self.subscription_model.delete_subscription(subscription_id)
+    def iter_subscriptions(self, user_id):
+        return self.subscription_model.iter_subscriptions(user_id)
+
+    def delete_subscription(self, user_id, subscription_id):
+        if not self.subscription_model.delete_subscription(user_id, subscription_id):
+            return {"error": "Subscription not found"}, 404
         return {"message": "Subscription deleted successfully"}, 200
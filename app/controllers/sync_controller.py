@@ -0,0 +1,304 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+from ..models.rollup_model import compute_rollup_deltas
+from .rollup_controller import ROLLUP_PROJECTION
+from ..utils.job_runner import QueueFullError
+from ..utils.keyed_lock import KeyedLock
+from ..utils.response_cache import cache_scope
+from ..utils.single_flight import SingleFlight
+
+# Rows of a bulk import validated (and then written) at a time
+IMPORT_CHUNK_SIZE = 500
+
+
+class BulkImportError(ValueError):
+    """
+    A bulk import stopped at an invalid row; `written` rows before it were
+    already stored.
+    """
+
+    def __init__(self, message, written):
+        super().__init__(message)
+        self.written = written
+
+
+class SyncController:
+    """
+    Keeps the local transaction store (and, when given, the monthly
+    rollups, detected subscriptions and cached responses) in step with
+    Plaid using the /transactions/sync cursor saved on the user record.
+    Syncs and imports hold the user's lock in `user_locks` while they
+    write; share it with anything else that rewrites a user's derived data
+    (e.g. RollupController.rebuild).
+
+    Across processes, a sync claims its range of deltas by moving the
+    stored cursor with a conditional update before writing anything. Of
+    two syncs that fetched the same deltas only one wins, so rollups are
+    never applied twice. If writing fails after the claim, the cursor is
+    handed back and the touched months' rollups are recomputed from the
+    store, so the retry's deltas (against what was already written) add
+    up again.
+
+    With `enqueue_sync` (e.g. JobController.enqueue_sync, when Plaid
+    webhooks keep the store current), reads of a stale store are served as
+    is and the sync is queued; only users never synced are synced inline.
+    """
+
+    def __init__(self, plaid_controller, user_model, transaction_model, max_age=300, rollup_model=None,
+                 recurring_controller=None, response_cache=None, user_locks=None, enqueue_sync=None):
+        self.plaid_controller = plaid_controller
+        self.user_model = user_model
+        self.transaction_model = transaction_model
+        self.max_age = max_age
+        self.rollup_model = rollup_model
+        self.recurring_controller = recurring_controller
+        self.response_cache = response_cache
+        # One sync per user at a time in this process; concurrent callers
+        # share its result instead of applying the same deltas twice
+        self.flights = SingleFlight()
+        self.user_locks = user_locks or KeyedLock()
+        self.enqueue_sync = enqueue_sync
+
+    def sync_user(self, user):
+        """
+        Apply every delta since the stored cursor and persist the new cursor.
+        """
+        counts, cursor, synced_at = self.flights.do(
+            user['user_id'], self._sync_user, dict(user))
+
+        # Keep the caller's copy of the user in step with DynamoDB
+        user['transactions_cursor'] = cursor
+        user['transactions_synced_at'] = synced_at
+        return counts
+
+    def _sync_user(self, user):
+        if not user.get('access_token'):
+            raise ValueError("No linked bank account for this user")
+
+        with self.user_locks.hold(user['user_id']):
+            return self._sync_locked(user)
+
+    def _sync_locked(self, user):
+        user_id = user['user_id']
+        access_token = user['access_token']
+        deltas = self.plaid_controller.sync_transactions(
+            access_token, user.get('transactions_cursor'))
+
+        removed_ids = [txn["transaction_id"] for txn in deltas["removed"]]
+        removed = set(removed_ids)
+
+        # Added and modified transactions are both upserts keyed by
+        # transaction_id; keep only the latest version and skip any that
+        # were removed again later in the same sync
+        upserts = list({
+            txn["transaction_id"]: txn
+            for txn in deltas["added"] + deltas["modified"]
+            if txn["transaction_id"] not in removed
+        }.values())
+
+        item_id = user.get('item_id')
+        old_items = self._stored_versions(user_id, upserts, removed_ids)
+
+        synced_at = datetime.utcnow().isoformat()
+        if not self.user_model.advance_cursor(
+                user_id, item_id, user.get('transactions_cursor'), deltas["next_cursor"], synced_at):
+            # Another sync (or a relink) moved the cursor first and owns
+            # these deltas; report the state it left behind
+            current = self.user_model.get_user(user_id) or {}
+            counts = {"added": 0, "modified": 0, "removed": 0}
+            return counts, current.get('transactions_cursor'), current.get('transactions_synced_at')
+
+        try:
+            self.apply_changes(user, upserts, removed_ids, item_id=item_id, old_items=old_items)
+        except Exception:
+            # Hand the range back so the next sync fetches it again
+            self.user_model.advance_cursor(
+                user_id, item_id, deltas["next_cursor"], user.get('transactions_cursor'),
+                user.get('transactions_synced_at'))
+            raise
+
+        counts = {
+            "added": len(deltas["added"]),
+            "modified": len(deltas["modified"]),
+            "removed": len(removed_ids)
+        }
+        return counts, deltas["next_cursor"], synced_at
+
+    def apply_changes(self, user, upserts, removed_ids, item_id=None, workers=1, old_items=None):
+        """
+        Store `upserts` (unique by transaction_id) tagged with the Plaid
+        `item_id` they came from (None for imported rows), delete
+        `removed_ids`, and bring the rollups, detected subscriptions and
+        cached responses in step. `old_items` are the stored versions of
+        those transactions, when the caller already read them. Returns the
+        items as stored.
+        """
+        user_id = user['user_id']
+        if old_items is None:
+            old_items = self._stored_versions(user_id, upserts, removed_ids)
+
+        new_items = []
+        try:
+            if upserts:
+                new_items = self.transaction_model.put_transactions(
+                    user_id, item_id, upserts, workers=workers)
+            if removed_ids:
+                self.transaction_model.delete_transactions(user_id, removed_ids)
+
+            if self.rollup_model is not None:
+                self.rollup_model.apply_deltas(
+                    user_id, compute_rollup_deltas(new_items, old_items))
+        except Exception:
+            # Some of the writes may have landed; a retry only sees deltas
+            # against them, so bring the rollups in step with the store now
+            self._repair_rollups(user_id, upserts, old_items)
+            raise
+
+        if self.recurring_controller is not None:
+            self.recurring_controller.apply_sync(user_id, new_items, removed_ids)
+
+        # Responses built from the old data are now out of date
+        if self.response_cache is not None and (upserts or removed_ids):
+            self.response_cache.invalidate(cache_scope(user))
+
+        return new_items
+
+    def link_item(self, user, access_token, item_id):
+        """
+        Point the user at a newly linked Plaid item, starting its sync from
+        the beginning. Transactions synced from the item it replaces are
+        purged along with their rollups, detected subscriptions and cached
+        responses, so the old and new items never both count. Imported
+        transactions (no item_id) are kept. Returns how many were purged.
+        """
+        user_id = user['user_id']
+        with self.user_locks.hold(user_id):
+            # Switch items first: a sync of the old item that is still
+            # running elsewhere now loses its cursor claim
+            self.user_model.update_item(
+                user_id, access_token=access_token, item_id=item_id,
+                transactions_cursor=None, transactions_synced_at=None)
+
+            old_item_id = user.get('item_id')
+            if not old_item_id or old_item_id == item_id:
+                return 0
+            stale_ids = [
+                item['transaction_id']
+                for item in self.transaction_model.iter_stored_items(
+                    user_id, projection=['transaction_id', 'item_id'])
+                if item.get('item_id') == old_item_id
+            ]
+            if stale_ids:
+                self.apply_changes(user, [], stale_ids)
+            return len(stale_ids)
+
+    def _repair_rollups(self, user_id, upserts, old_items):
+        # Recompute the months these transactions touch from the store
+        if self.rollup_model is None:
+            return
+        months = {str(txn.get('date') or '')[:7] for txn in list(upserts) + list(old_items)}
+        months.discard('')
+        try:
+            items = [
+                item for month in sorted(months)
+                for item in self.transaction_model.iter_stored_items(
+                    user_id, projection=ROLLUP_PROJECTION,
+                    start_date=f"{month}-01", end_date=f"{month}-31")
+            ]
+            self.rollup_model.replace_rollups(
+                user_id, compute_rollup_deltas(items, []), months=months)
+        except Exception:
+            # The store is unreachable too; a rollup rebuild repairs it
+            pass
+
+    def _stored_versions(self, user_id, upserts, removed_ids):
+        # Rollups need the stored versions of everything we are about to
+        # overwrite or delete, so re-syncing an item never double counts
+        if self.rollup_model is None:
+            return []
+        return self.transaction_model.get_stored_items(
+            user_id, [txn["transaction_id"] for txn in upserts] + list(removed_ids))
+
+    def import_transactions(self, user, transactions, workers=1, chunk_size=IMPORT_CHUNK_SIZE):
+        """
+        Store transactions from a bulk import through the same steps as a
+        sync. `transactions` may be any iterable (e.g. a streamed body); it
+        is validated and written `chunk_size` rows at a time, and an
+        invalid row raises BulkImportError saying how many rows were
+        already written. As in a sync, the last copy of a transaction_id
+        wins. Returns the number of distinct transactions written.
+        """
+        rows = iter(transactions)
+        written = set()
+        index = 0
+        while True:
+            chunk = {}
+            try:
+                for txn in islice(rows, chunk_size):
+                    transaction_id = validate_import_row(index, txn)
+                    # Re-inserted so the chunk keeps stream order
+                    chunk.pop(transaction_id, None)
+                    chunk[transaction_id] = txn
+                    index += 1
+            except ValueError as e:
+                raise BulkImportError(str(e), len(written))
+            if not chunk:
+                return len(written)
+            with self.user_locks.hold(user['user_id']):
+                self.apply_changes(user, list(chunk.values()), [], workers=workers)
+            written.update(chunk)
+
+    def needs_sync(self, user):
+        """
+        A user needs a sync if they have never been synced or their last sync
+        is older than `max_age` seconds.
+        """
+        synced_at = user.get('transactions_synced_at')
+        if not user.get('transactions_cursor') or not synced_at:
+            return True
+
+        try:
+            last_sync = datetime.fromisoformat(synced_at)
+        except ValueError:
+            return True
+        return datetime.utcnow() - last_sync > timedelta(seconds=self.max_age)
+
+    def ensure_synced(self, user):
+        if not self.needs_sync(user):
+            return None
+        if self.enqueue_sync is not None and user.get('transactions_cursor'):
+            # Serve what is stored; a queued sync catches up in the background
+            try:
+                self.enqueue_sync(user)
+            except QueueFullError:
+                pass
+            return None
+        return self.sync_user(user)
+
+    def get_transactions(self, user, start_date=None, end_date=None, account_id=None):
+        """
+        Read transactions from the local store, syncing first if it is stale.
+        """
+        self.ensure_synced(user)
+        return self.transaction_model.get_transactions(
+            user['user_id'], start_date=start_date, end_date=end_date, account_id=account_id)
+
+
+def validate_import_row(index, txn):
+    """
+    Check that an imported row has what storing and rolling it up need,
+    and return its transaction_id.
+    """
+    if not isinstance(txn, dict) or not txn.get('transaction_id') \
+            or not isinstance(txn['transaction_id'], str):
+        raise ValueError(f"transaction {index} is missing a transaction_id")
+    amount = txn.get('amount')
+    if isinstance(amount, bool) or not isinstance(amount, (int, float, Decimal)) \
+            or not Decimal(str(amount)).is_finite():
+        raise ValueError(f"transaction {index} needs a numeric amount")
+    try:
+        date.fromisoformat(txn.get('date'))
+    except (TypeError, ValueError):
+        raise ValueError(f"transaction {index} needs a date in YYYY-MM-DD format")
+    return txn['transaction_id']
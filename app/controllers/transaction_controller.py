@@ -1,11 +1,30 @@
+# Columns of a transaction export, in CSV column order
+EXPORT_FIELDS = ['transaction_id', 'date', 'name', 'merchant_name', 'amount',
+                 'category', 'account_id', 'pending']
+# Items read from DynamoDB per page while exporting
+EXPORT_PAGE_SIZE = 500
+
+
 class TransactionController:
     def __init__(self, transaction_model):
         self.transaction_model = transaction_model
 
-    def add_transaction(self, transaction):
-        self.transaction_model.add_transaction(transaction)
-        return {"message": "Transaction added successfully"}, 201
+    def get_transactions(self, user_id, limit, page_token=None):
+        transactions, next_page_token = self.transaction_model.get_transactions_page(
+            user_id, limit, page_token)
+        return {"transactions": transactions, "next_page_token": next_page_token}, 200
+
+    def iter_transactions(self, user_id):
+        return self.transaction_model.iter_transactions(user_id)
 
-    def get_transactions(self, user_id):
-        transactions = self.transaction_model.get_transactions(user_id)
-        return {"transactions": transactions}, 200
+    def export_transactions(self, user_id, start_date=None, end_date=None, account_ids=None):
+        """
+        Lazily yield export rows for the window, one DynamoDB page at a time,
+        so an export of any size holds a single page in memory.
+        """
+        transactions = self.transaction_model.iter_transactions(
+            user_id, start_date=start_date, end_date=end_date,
+            account_id=account_ids or None, page_size=EXPORT_PAGE_SIZE,
+            projection=EXPORT_FIELDS)
+        for txn in transactions:
+            yield {field: txn.get(field) for field in EXPORT_FIELDS}
@@ -0,0 +1,55 @@
+from ..utils.response_cache import cache_scope
+
+# Transactions webhooks that mean new data is waiting behind the sync cursor
+SYNC_WEBHOOK_CODES = {
+    'SYNC_UPDATES_AVAILABLE', 'INITIAL_UPDATE', 'HISTORICAL_UPDATE',
+    'DEFAULT_UPDATE', 'TRANSACTIONS_REMOVED'
+}
+
+
+class WebhookController:
+    """
+    Handles verified Plaid webhooks off the request path: events are
+    queued by the endpoint and processed by background workers, which sync
+    the item's transactions (updating rollups, detected subscriptions and
+    cached responses) so user-facing reads find the store already fresh.
+    """
+
+    def __init__(self, user_model, sync_controller, response_cache=None):
+        self.user_model = user_model
+        self.sync_controller = sync_controller
+        self.response_cache = response_cache
+
+    def should_handle(self, event):
+        webhook_type = event.get('webhook_type')
+        if webhook_type == 'TRANSACTIONS':
+            return event.get('webhook_code') in SYNC_WEBHOOK_CODES
+        return webhook_type == 'ITEM'
+
+    def handle(self, event):
+        """
+        Process one webhook event (called from a worker thread).
+        """
+        match = self.user_model.get_user_by_item_id(event['item_id'])
+        if not match:
+            return None
+        # The item index may lag behind a relink; trust only the user's own
+        # record, and only while it is still linked to this item
+        user = self.user_model.get_user_fresh(match['user_id'])
+        if not user or user.get('item_id') != event['item_id']:
+            return None
+
+        if event['webhook_type'] == 'TRANSACTIONS':
+            return self.sync_controller.sync_user(user)
+
+        # ITEM events (errors, expiring consent, revoked access) change what
+        # the endpoints can return; record the status and drop cached responses
+        error = event.get('error') or {}
+        self.user_model.update_item(
+            user['user_id'],
+            item_status=event.get('webhook_code'),
+            item_error=error.get('error_code')
+        )
+        if self.response_cache is not None:
+            self.response_cache.invalidate(cache_scope(user))
+        return None
@@ -1,3 +1,7 @@
+from boto3.dynamodb.conditions import Key
+from ..utils.dynamodb_pagination import iter_query, query_page
+
+
 class BudgetModel:
     def __init__(self, dynamodb):
         self.table = dynamodb.Table('SpendWiseBudgets')
@@ -10,11 +14,17 @@ class BudgetModel:
         })
 
     def get_budgets(self, user_id):
-        response = self.table.query(
-            KeyConditionExpression="user_id = :user_id",
-            ExpressionAttributeValues={":user_id": user_id}
-        )
-        return response.get('Items', [])
+        return list(self.iter_budgets(user_id))
+
+    def iter_budgets(self, user_id, page_size=None, projection=None):
+        return iter_query(
+            self.table, page_size=page_size, projection=projection,
+            KeyConditionExpression=Key('user_id').eq(user_id))
+
+    def get_budgets_page(self, user_id, limit, page_token=None, projection=None):
+        return query_page(
+            self.table, limit, page_token=page_token, projection=projection,
+            KeyConditionExpression=Key('user_id').eq(user_id))
 
     def update_budget(self, user_id, category, new_amount):
         self.table.update_item(
@@ -0,0 +1,142 @@
+from collections import defaultdict
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+from ..utils.dynamodb_pagination import iter_query
+
+# Category totals are stored as top-level attributes so they can be
+# incremented atomically with ADD (ADD cannot create keys inside a missing map)
+CATEGORY_PREFIX = 'category:'
+
+
+class RollupModel:
+    """
+    Per-user monthly rollups keyed by `user_id` + `month` ("YYYY-MM").
+    Each item holds income, expenses, transaction_count and one
+    `category:<name>` attribute per expense category.
+    """
+
+    def __init__(self, dynamodb):
+        self.table = dynamodb.Table('SpendWiseRollups')
+
+    def apply_deltas(self, user_id, deltas):
+        """
+        Atomically add the per-month deltas produced by `compute_rollup_deltas`.
+        """
+        for month, delta in deltas.items():
+            names = {'#income': 'income', '#expenses': 'expenses',
+                     '#count': 'transaction_count'}
+            values = {':income': delta['income'], ':expenses': delta['expenses'],
+                      ':count': delta['transaction_count']}
+            for i, (category, amount) in enumerate(delta['categories'].items()):
+                names[f'#c{i}'] = CATEGORY_PREFIX + category
+                values[f':c{i}'] = amount
+
+            self.table.update_item(
+                Key={'user_id': user_id, 'month': month},
+                UpdateExpression="ADD " + ", ".join(
+                    f"{name} {name.replace('#', ':')}" for name in names),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
+
+    def replace_rollups(self, user_id, totals, months=None):
+        """
+        Overwrite the user's rollups with `totals` (as produced by
+        `compute_rollup_deltas` from the full history) and delete months
+        that no longer have any transactions. When `months` is given, only
+        those months are rewritten and `totals` covers just them. Returns
+        the months written.
+        """
+        if months is None:
+            months = {
+                item['month'] for item in iter_query(
+                    self.table, projection=['month'],
+                    KeyConditionExpression=Key('user_id').eq(user_id))
+            }
+        stale_months = set(months) - set(totals)
+
+        with self.table.batch_writer() as batch:
+            for month, total in totals.items():
+                item = {
+                    'user_id': user_id,
+                    'month': month,
+                    'income': total['income'],
+                    'expenses': total['expenses'],
+                    'transaction_count': total['transaction_count']
+                }
+                for category, amount in total['categories'].items():
+                    if amount:
+                        item[CATEGORY_PREFIX + category] = amount
+                batch.put_item(Item=item)
+            for month in stale_months:
+                batch.delete_item(Key={'user_id': user_id, 'month': month})
+
+        return len(totals)
+
+    def get_rollup(self, user_id, month):
+        response = self.table.get_item(Key={'user_id': user_id, 'month': month})
+        item = response.get('Item')
+        return from_dynamodb_item(item) if item else None
+
+    def get_rollups(self, user_id, start_month, end_month):
+        """
+        Retrieve the rollups for every month in [start_month, end_month].
+        """
+        items = iter_query(
+            self.table,
+            KeyConditionExpression=Key('user_id').eq(
+                user_id) & Key('month').between(start_month, end_month)
+        )
+        return [from_dynamodb_item(item) for item in items]
+
+
+def compute_rollup_deltas(new_items, old_items):
+    """
+    Work out how each month's rollup changes when `old_items` (the stored
+    versions of removed or updated transactions) are replaced by `new_items`.
+    Both lists hold stored transaction items (see `to_dynamodb_item`).
+    """
+    deltas = defaultdict(lambda: {
+        'income': Decimal('0'),
+        'expenses': Decimal('0'),
+        'transaction_count': 0,
+        'categories': defaultdict(Decimal)
+    })
+
+    for items, sign in ((new_items, 1), (old_items, -1)):
+        for item in items:
+            if not item.get('date'):
+                continue
+            delta = deltas[item['date'][:7]]
+            amount = Decimal(item['amount'])
+            delta['transaction_count'] += sign
+
+            # Same sign conventions as the transaction summaries
+            if amount < 0:
+                delta['income'] += sign * -amount
+            else:
+                delta['expenses'] += sign * amount
+            if amount > 0:
+                category = (item.get('category') or ["Uncategorized"])[0]
+                delta['categories'][category] += sign * amount
+
+    # Drop months where the changes cancelled out
+    return {
+        month: delta for month, delta in deltas.items()
+        if delta['transaction_count'] or delta['income'] or delta['expenses']
+        or any(delta['categories'].values())
+    }
+
+
+def from_dynamodb_item(item):
+    return {
+        'month': item['month'],
+        'income': float(item.get('income', 0)),
+        'expenses': float(item.get('expenses', 0)),
+        'transaction_count': int(item.get('transaction_count', 0)),
+        'categories': {
+            key[len(CATEGORY_PREFIX):]: float(value)
+            for key, value in item.items()
+            if key.startswith(CATEGORY_PREFIX) and value
+        }
+    }
@@ -1,3 +1,9 @@
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from ..utils.batch_writer import BatchWritePipeline
+from ..utils.dynamodb_pagination import iter_query, query_page
+
+
 class SubscriptionModel:
     def __init__(self, dynamodb):
         self.table = dynamodb.Table('SpendWiseSubscriptions')
@@ -5,12 +11,38 @@ class SubscriptionModel:
     def add_subscription(self, subscription):
         self.table.put_item(Item=subscription)
 
+    def add_subscriptions(self, subscriptions, workers=1):
+        """
+        Bulk-insert subscriptions, de-duplicated by subscription_id.
+        Returns the number of subscriptions written.
+        """
+        return BatchWritePipeline(self.table, ['subscription_id'], workers=workers).put_items(subscriptions)
+
     def get_subscriptions(self, user_id):
-        response = self.table.query(
-            KeyConditionExpression="user_id = :user_id",
-            ExpressionAttributeValues={":user_id": user_id}
-        )
-        return response.get('Items', [])
-
-    def delete_subscription(self, subscription_id):
-        self.table.delete_item(Key={'subscription_id': subscription_id})
+        return list(self.iter_subscriptions(user_id))
+
+    def iter_subscriptions(self, user_id, page_size=None, projection=None):
+        return iter_query(
+            self.table, page_size=page_size, projection=projection,
+            KeyConditionExpression=Key('user_id').eq(user_id))
+
+    def get_subscriptions_page(self, user_id, limit, page_token=None, projection=None):
+        return query_page(
+            self.table, limit, page_token=page_token, projection=projection,
+            KeyConditionExpression=Key('user_id').eq(user_id))
+
+    def delete_subscription(self, user_id, subscription_id):
+        """
+        Delete one of the user's subscriptions. Returns False if the user
+        has no subscription with that id.
+        """
+        try:
+            self.table.delete_item(
+                Key={'user_id': user_id, 'subscription_id': subscription_id},
+                ConditionExpression="attribute_exists(subscription_id)"
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise e
+        return True
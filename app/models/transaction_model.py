@@ -1,12 +1,162 @@
+from datetime import date, datetime
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key, Attr
+from ..utils.batch_writer import BatchWritePipeline
+from ..utils.dynamodb_pagination import iter_query, query_page
+
+KEY_NAMES = ['user_id', 'transaction_id']
+# GSI with `user_id` as partition key and `date` as sort key, so date
+# windows are key conditions rather than filters over the whole history
+DATE_INDEX = 'user_id-date-index'
+
+
 class TransactionModel:
     def __init__(self, dynamodb):
+        self.dynamodb = dynamodb
         self.table = dynamodb.Table('SpendWiseTransactions')
 
     def add_transaction(self, transaction):
         self.table.put_item(Item=transaction)
 
-    def get_transactions(self, user_id):
-        response = self.table.query(
-            KeyConditionExpression=Key('user_id').eq(user_id)
-        )
-        return response.get('Items', [])
+    def add_transactions(self, transactions, workers=1):
+        """
+        Bulk-insert transactions (any iterable), de-duplicated by transaction_id.
+        Returns the number of transactions written.
+        """
+        return BatchWritePipeline(self.table, KEY_NAMES, workers=workers).put_items(transactions)
+
+    def get_transactions(self, user_id, start_date=None, end_date=None, account_id=None):
+        """
+        Retrieve stored transactions for a user, optionally limited to a date
+        window (inclusive) and a single account.
+        """
+        return list(self.iter_transactions(
+            user_id, start_date=start_date, end_date=end_date, account_id=account_id))
+
+    def iter_transactions(self, user_id, start_date=None, end_date=None, account_id=None,
+                          page_size=None, projection=None):
+        """
+        Stream stored transactions page by page instead of buffering them.
+        """
+        query_kwargs = _query_kwargs(user_id, start_date, end_date, account_id)
+        for item in iter_query(self.table, page_size=page_size, projection=projection, **query_kwargs):
+            yield from_dynamodb_item(item)
+
+    def iter_stored_items(self, user_id, projection=None, start_date=None, end_date=None):
+        """
+        Stream a user's stored items as-is (amounts stay as Decimal),
+        optionally limited to a date window (inclusive).
+        """
+        return iter_query(
+            self.table, projection=projection,
+            **_query_kwargs(user_id, start_date, end_date))
+
+    def get_transactions_page(self, user_id, limit, page_token=None, start_date=None,
+                              end_date=None, account_id=None, projection=None):
+        """
+        Return one page of transactions and the token for the next page.
+        """
+        query_kwargs = _query_kwargs(user_id, start_date, end_date, account_id)
+        items, next_page_token = query_page(
+            self.table, limit, page_token=page_token, projection=projection, **query_kwargs)
+        return [from_dynamodb_item(item) for item in items], next_page_token
+
+    def get_stored_items(self, user_id, transaction_ids):
+        """
+        Batch-read the stored items for the given transaction ids.
+        Ids that are not stored are skipped. Amounts stay as Decimal.
+        """
+        items = []
+        ids = list(dict.fromkeys(transaction_ids))
+        # BatchGetItem accepts at most 100 keys per request
+        for i in range(0, len(ids), 100):
+            request_items = {self.table.name: {'Keys': [
+                {'user_id': user_id, 'transaction_id': transaction_id}
+                for transaction_id in ids[i:i + 100]
+            ]}}
+            while request_items:
+                response = self.dynamodb.batch_get_item(
+                    RequestItems=request_items)
+                items.extend(response.get('Responses', {}).get(
+                    self.table.name, []))
+                request_items = response.get('UnprocessedKeys')
+        return items
+
+    def put_transactions(self, user_id, item_id, transactions, workers=1):
+        """
+        Insert or overwrite Plaid transactions for a user.
+        Returns the items as stored.
+        """
+        items = [to_dynamodb_item(user_id, item_id, txn)
+                 for txn in transactions]
+        self.add_transactions(items, workers=workers)
+        return items
+
+    def delete_transactions(self, user_id, transaction_ids):
+        """
+        Remove transactions that Plaid reported as removed.
+        """
+        BatchWritePipeline(self.table, KEY_NAMES).delete_keys(
+            {'user_id': user_id, 'transaction_id': transaction_id}
+            for transaction_id in transaction_ids)
+
+
+def _query_kwargs(user_id, start_date=None, end_date=None, account_id=None):
+    key_condition = Key('user_id').eq(user_id)
+    query_kwargs = {}
+
+    if start_date or end_date:
+        query_kwargs['IndexName'] = DATE_INDEX
+        if start_date and end_date:
+            key_condition &= Key('date').between(
+                _to_date_string(start_date), _to_date_string(end_date))
+        elif start_date:
+            key_condition &= Key('date').gte(_to_date_string(start_date))
+        else:
+            key_condition &= Key('date').lte(_to_date_string(end_date))
+
+    query_kwargs['KeyConditionExpression'] = key_condition
+    # `account_id` may also be a list of accounts
+    if isinstance(account_id, (list, tuple)):
+        query_kwargs['FilterExpression'] = Attr('account_id').is_in(list(account_id))
+    elif account_id:
+        query_kwargs['FilterExpression'] = Attr('account_id').eq(account_id)
+    return query_kwargs
+
+
+def _to_date_string(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def to_dynamodb_item(user_id, item_id, txn):
+    """
+    Project a Plaid transaction dict onto the fields we store.
+    DynamoDB does not accept floats, so amounts are stored as Decimal.
+    """
+    return {
+        'user_id': user_id,
+        'transaction_id': txn['transaction_id'],
+        'item_id': item_id,
+        'account_id': txn.get('account_id'),
+        'amount': Decimal(str(txn['amount'])),
+        'date': _to_date_string(txn.get('date')),
+        'name': txn.get('name'),
+        'merchant_name': txn.get('merchant_name'),
+        'category': txn.get('category') or ["Uncategorized"],
+        'pending': bool(txn.get('pending', False))
+    }
+
+
+def from_dynamodb_item(item):
+    """
+    Convert a stored item back into the plain transaction dict shape used
+    by the summary code.
+    """
+    txn = dict(item)
+    if isinstance(txn.get('amount'), Decimal):
+        txn['amount'] = float(txn['amount'])
+    return txn
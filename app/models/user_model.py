@@ -1,9 +1,26 @@
 from datetime import datetime
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from ..utils.ttl_cache import TTLCache
+from ..utils.single_flight import SingleFlight
+from ..utils.request_metrics import timed
+
+# Process-local cache of user records. Every /plaid/* endpoint resolves the
+# user's access_token, so this saves a DynamoDB get_item on most requests.
+# Writes through this model invalidate the entry; other processes rely on the TTL.
+user_cache = TTLCache(maxsize=1024, ttl=60)
+# Concurrent cache misses for the same user share one get_item
+user_flights = SingleFlight()
+
+# GSI on item_id, used to resolve Plaid webhooks to their user
+ITEM_INDEX = 'item_id-index'
 
 
 class UserModel:
-    def __init__(self, dynamodb):
+    def __init__(self, dynamodb, cache=user_cache, flights=user_flights):
         self.table = dynamodb.Table('spend-wise-users')
+        self.cache = cache
+        self.flights = flights
 
     def create_user(self, user_id, email, first_name, last_name):
         """
@@ -14,18 +31,97 @@ class UserModel:
             'email': email,
             'first_name': first_name,
             'last_name': last_name,
-            'item_id': None,
+            # `item_id` is left unset until an item is linked: it keys the
+            # item_id GSI, which rejects NULL values
             'access_token': None,
             'created_at': datetime.utcnow().isoformat(),
             'updated_at': datetime.utcnow().isoformat()
         })
+        self.cache.invalidate(user_id)
 
+    @timed('user_lookup')
     def get_user(self, user_id):
         """
-        Retrieve user details by `user_id`.
+        Retrieve user details by `user_id`, served from the cache when possible.
+        """
+        user = self.cache.get(user_id)
+        if user is None:
+            user = self.flights.do(user_id, self._load_user, user_id)
+            if user is None:
+                return None
+
+        # Hand out a copy so callers can't mutate the cached record
+        return dict(user)
+
+    def get_user_fresh(self, user_id):
+        """
+        Read a user with a strongly consistent get_item, bypassing (and
+        refreshing) the cache.
+        """
+        user = self._load_user(user_id, consistent=True)
+        return dict(user) if user is not None else None
+
+    def _load_user(self, user_id, consistent=False):
+        read_kwargs = {'ConsistentRead': True} if consistent else {}
+        response = self.table.get_item(Key={'user_id': user_id}, **read_kwargs)
+        user = response.get('Item')
+        if user is not None:
+            self.cache.set(user_id, user)
+        return user
+
+    def get_user_by_item_id(self, item_id):
+        """
+        Retrieve the user who linked the given Plaid item (bypasses the cache).
+        GSI reads are eventually consistent: re-read the record with
+        `get_user_fresh` before acting on it.
         """
-        response = self.table.get_item(Key={'user_id': user_id})
-        return response.get('Item')
+        response = self.table.query(
+            IndexName=ITEM_INDEX,
+            KeyConditionExpression=Key('item_id').eq(item_id),
+            Limit=1
+        )
+        items = response.get('Items', [])
+        return items[0] if items else None
+
+    def advance_cursor(self, user_id, item_id, old_cursor, new_cursor, synced_at):
+        """
+        Move the user's transactions sync cursor from `old_cursor` to
+        `new_cursor`, but only while the user is still linked to `item_id`
+        and no other sync has moved the cursor first. Returns False, and
+        changes nothing, when the update lost that race.
+        """
+        values = {
+            ':new_cursor': new_cursor,
+            ':synced_at': synced_at,
+            ':updated_at': datetime.utcnow().isoformat()
+        }
+        if old_cursor is None:
+            # Never synced: the attribute is missing or stored as NULL
+            condition = "(attribute_not_exists(transactions_cursor) " \
+                        "OR attribute_type(transactions_cursor, :null))"
+            values[':null'] = 'NULL'
+        else:
+            condition = "transactions_cursor = :old_cursor"
+            values[':old_cursor'] = old_cursor
+        if item_id is not None:
+            condition += " AND item_id = :item_id"
+            values[':item_id'] = item_id
+
+        try:
+            self.table.update_item(
+                Key={'user_id': user_id},
+                UpdateExpression="SET transactions_cursor = :new_cursor, "
+                                 "transactions_synced_at = :synced_at, updated_at = :updated_at",
+                ConditionExpression=condition,
+                ExpressionAttributeValues=values
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise e
+        finally:
+            self.cache.invalidate(user_id)
 
     def update_item(self, user_id, **attributes):
         """
@@ -56,3 +152,5 @@ class UserModel:
                 raise ValueError("User not found")
             else:
                 raise e
+        finally:
+            self.cache.invalidate(user_id)
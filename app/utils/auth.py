@@ -0,0 +1,56 @@
+import hmac
+from flask import request, jsonify, current_app
+from functools import wraps
+from .token_verifier import TokenVerificationError
+
+
+def requires_auth(func):
+    """
+    Verify the Cognito Bearer token locally and expose its `sub` as
+    `request.user_id`. Only access tokens are accepted, since sign-out
+    revokes the access token. A `user_id` in the body must belong to the
+    token.
+    """
+    @wraps(func)
+    def decorated(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return jsonify({'error': 'Authorization Bearer token is required'}), 401
+
+        # Extract the Access Token (Bearer token)
+        access_token = auth_header.split(" ")[1]
+        try:
+            claims = current_app.token_verifier.verify(access_token, token_use='access')
+        except TokenVerificationError as e:
+            return jsonify({'error': str(e)}), 401
+
+        data = request.get_json(silent=True)
+        if isinstance(data, dict) and data.get('user_id') and data['user_id'] != claims['sub']:
+            return jsonify({'error': 'Token does not belong to this user'}), 403
+
+        # Attach to request object for downstream use
+        request.access_token = access_token
+        request.token_claims = claims
+        request.user_id = claims['sub']
+        return func(*args, **kwargs)
+
+    return decorated
+
+
+def requires_metrics_token(func):
+    """
+    Guard operational endpoints (metrics): require
+    `Authorization: Bearer <METRICS_TOKEN>`. The endpoints do not exist
+    (404) while METRICS_TOKEN is unset.
+    """
+    @wraps(func)
+    def decorated(*args, **kwargs):
+        token = current_app.config['METRICS_TOKEN']
+        if not token:
+            return jsonify({'error': 'Metrics are disabled'}), 404
+        auth_header = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(auth_header.encode(), f"Bearer {token}".encode()):
+            return jsonify({'error': 'Invalid metrics token'}), 401
+        return func(*args, **kwargs)
+
+    return decorated
@@ -0,0 +1,18 @@
+from botocore.config import Config as BotocoreConfig
+
+
+def build_client_config(config):
+    """
+    Shared botocore settings for every AWS client: a connection pool sized
+    for the app's request threads, adaptive retries and explicit timeouts.
+    """
+    return BotocoreConfig(
+        max_pool_connections=config['AWS_MAX_POOL_CONNECTIONS'],
+        connect_timeout=config['AWS_CONNECT_TIMEOUT'],
+        read_timeout=config['AWS_READ_TIMEOUT'],
+        retries={
+            'mode': 'adaptive',
+            'max_attempts': config['AWS_MAX_ATTEMPTS']
+        },
+        tcp_keepalive=True
+    )
@@ -1,4 +1,5 @@
 import boto3
+from .aws_client_config import build_client_config
 
 
 def init_cognito(config):
@@ -6,6 +7,7 @@ def init_cognito(config):
         'cognito-idp',
         region_name=config['AWS_REGION'],
         aws_access_key_id=config['AWS_ACCESS_KEY_ID'],
-        aws_secret_access_key=config['AWS_SECRET_ACCESS_KEY']
+        aws_secret_access_key=config['AWS_SECRET_ACCESS_KEY'],
+        config=build_client_config(config)
     )
     return cognito
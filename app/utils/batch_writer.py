@@ -0,0 +1,96 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+# BatchWriteItem accepts at most 25 requests per call
+BATCH_SIZE = 25
+
+
+class BatchWriteError(Exception):
+    pass
+
+
+class BatchWritePipeline:
+    """
+    Bulk writer for a DynamoDB table.
+
+    Items are de-duplicated by primary key, keeping the first copy of each
+    key in the stream (later copies are skipped whichever chunk they fall
+    in, so parallel chunks never race on a key). They are sent in
+    BatchWriteItem calls of 25, and any UnprocessedItems are retried with
+    exponential backoff. With
+    `workers` > 1 the chunks are written from a thread pool. Works on any
+    iterable, so streamed input is never held in memory all at once.
+    """
+
+    def __init__(self, table, key_names, workers=1, max_retries=8, base_delay=0.05, sleep=time.sleep):
+        self.table = table
+        # The resource's client accepts plain Python types, like Table.put_item
+        self.client = table.meta.client
+        self.key_names = key_names
+        self.workers = workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.sleep = sleep
+
+    def put_items(self, items):
+        """
+        Write every item and return how many unique items were written.
+        """
+        requests = (
+            (self._key(item), {'PutRequest': {'Item': item}}) for item in items)
+        return self._run(requests)
+
+    def delete_keys(self, keys):
+        requests = (
+            (self._key(key), {'DeleteRequest': {'Key': key}}) for key in keys)
+        return self._run(requests)
+
+    def _key(self, item):
+        try:
+            return tuple(item[name] for name in self.key_names)
+        except KeyError as e:
+            raise BatchWriteError(f"Item is missing key attribute {e}")
+
+    def _chunks(self, requests):
+        # DynamoDB rejects a batch with duplicate keys; keep the first copy
+        seen = set()
+        while True:
+            chunk = {}
+            for key, request in requests:
+                if key in seen or key in chunk:
+                    continue
+                chunk[key] = request
+                if len(chunk) == BATCH_SIZE:
+                    break
+            if not chunk:
+                return
+            seen.update(chunk)
+            yield list(chunk.values())
+
+    def _run(self, requests):
+        chunks = self._chunks(iter(requests))
+        if self.workers <= 1:
+            return sum(self._write_chunk(chunk) for chunk in chunks)
+
+        written = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # Keep a bounded number of chunks in flight
+            while True:
+                window = list(islice(chunks, self.workers * 2))
+                if not window:
+                    return written
+                written += sum(executor.map(self._write_chunk, window))
+
+    def _write_chunk(self, chunk):
+        request_items = {self.table.name: chunk}
+        for attempt in range(self.max_retries + 1):
+            response = self.client.batch_write_item(RequestItems=request_items)
+            request_items = response.get('UnprocessedItems')
+            if not request_items:
+                return len(chunk)
+            self.sleep(self.base_delay * (2 ** attempt))
+
+        unprocessed = len(request_items.get(self.table.name, []))
+        raise BatchWriteError(
+            f"{unprocessed} items were still unprocessed after {self.max_retries} retries")
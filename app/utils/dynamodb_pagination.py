@@ -0,0 +1,101 @@
+import base64
+import json
+from decimal import Decimal
+
+
+class InvalidPageToken(ValueError):
+    pass
+
+
+def encode_page_token(last_evaluated_key):
+    """
+    Turn a LastEvaluatedKey into an opaque, URL-safe continuation token.
+    """
+    if not last_evaluated_key:
+        return None
+    payload = json.dumps(
+        last_evaluated_key,
+        default=lambda value: {"$decimal": str(value)},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_page_token(page_token):
+    if not page_token:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(page_token.encode('ascii'))
+        key = json.loads(
+            payload,
+            object_hook=lambda obj: Decimal(obj["$decimal"]) if set(obj) == {"$decimal"} else obj
+        )
+    except (ValueError, UnicodeError) as e:
+        raise InvalidPageToken(f"Invalid page token: {str(e)}")
+    if not isinstance(key, dict):
+        raise InvalidPageToken("Invalid page token")
+    return key
+
+
+def build_projection(attributes):
+    """
+    Build a ProjectionExpression with placeholders, since attribute names
+    such as `date` and `name` are DynamoDB reserved words.
+    """
+    names = {f"#p{i}": attribute for i, attribute in enumerate(attributes)}
+    return ", ".join(names), names
+
+
+def _with_projection(query_kwargs, projection):
+    if not projection:
+        return query_kwargs
+    expression, names = build_projection(projection)
+    query_kwargs = dict(query_kwargs)
+    query_kwargs['ProjectionExpression'] = expression
+    query_kwargs['ExpressionAttributeNames'] = {
+        **query_kwargs.get('ExpressionAttributeNames', {}), **names}
+    return query_kwargs
+
+
+def iter_query(table, page_size=None, projection=None, start_key=None, **query_kwargs):
+    """
+    Yield every item matching the query, following LastEvaluatedKey so
+    results are never truncated at DynamoDB's 1 MB page limit. Only one
+    page is held in memory at a time.
+    """
+    query_kwargs = _with_projection(query_kwargs, projection)
+    if page_size:
+        query_kwargs['Limit'] = page_size
+
+    while True:
+        if start_key:
+            query_kwargs['ExclusiveStartKey'] = start_key
+        response = table.query(**query_kwargs)
+        yield from response.get('Items', [])
+        start_key = response.get('LastEvaluatedKey')
+        if not start_key:
+            return
+
+
+def query_page(table, limit, page_token=None, projection=None, **query_kwargs):
+    """
+    Return up to `limit` items and a token for the next page (None when
+    there are no more results).
+    """
+    query_kwargs = _with_projection(query_kwargs, projection)
+    start_key = decode_page_token(page_token)
+    items = []
+
+    while len(items) < limit:
+        # Limit caps the items DynamoDB evaluates, so a filtered query can
+        # return fewer; keep reading until the page is full or we run out
+        query_kwargs['Limit'] = limit - len(items)
+        if start_key:
+            query_kwargs['ExclusiveStartKey'] = start_key
+        response = table.query(**query_kwargs)
+        items.extend(response.get('Items', []))
+        start_key = response.get('LastEvaluatedKey')
+        if not start_key:
+            break
+
+    return items, encode_page_token(start_key)
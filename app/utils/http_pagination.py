@@ -0,0 +1,65 @@
+import csv
+import io
+from flask import Response, request, current_app, stream_with_context
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NDJSON_MIMETYPE = 'application/x-ndjson'
+CSV_MIMETYPE = 'text/csv'
+
+
+def page_args():
+    """
+    Read `limit` and `page_token` from the query string.
+    """
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit, request.args.get('page_token')
+
+
+def wants_ndjson():
+    """
+    Exports are requested with `?format=ndjson` or `Accept: application/x-ndjson`.
+    """
+    return (request.args.get('format') == 'ndjson'
+            or request.accept_mimetypes.best == NDJSON_MIMETYPE)
+
+
+def ndjson_response(items):
+    """
+    Stream items one JSON document per line, without building the whole body.
+    """
+    def generate():
+        for item in items:
+            yield current_app.json.dumps(item) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def csv_response(rows, fieldnames, filename=None):
+    """
+    Stream dict rows as CSV, one line per row. List values (e.g. categories)
+    are joined with ";".
+    """
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                key: ";".join(value) if isinstance(value, list) else value
+                for key, value in row.items()
+            })
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    headers = {}
+    if filename:
+        headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return Response(stream_with_context(generate()), mimetype=CSV_MIMETYPE, headers=headers)
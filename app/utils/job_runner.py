@@ -0,0 +1,322 @@
+import heapq
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from plaid.exceptions import ApiException
+from .plaid_scheduler import is_rate_limit_error
+
+QUEUED = 'queued'
+RUNNING = 'running'
+RETRYING = 'retrying'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+PENDING_STATUSES = (QUEUED, RUNNING, RETRYING)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobRunner:
+    """
+    In-process background jobs.
+
+    Jobs are registered by name and submitted with a JSON-serializable
+    payload and an optional serialization key (e.g. a Plaid item id):
+    - at most `maxsize` jobs are pending at once; `submit` raises
+      QueueFullError beyond that
+    - `workers` threads run jobs, either directly or (with
+      `mode='process'`) on a process pool whose workers build their own app.
+      A handler's `after_process(payload)` hook then runs in this process
+      after each attempt, to drop the caches the worker's writes made stale
+    - jobs sharing a key never run concurrently, and submitting a job that
+      is already queued for the same key returns the queued job instead
+    - a job that raises plaid's ApiException for a rate limit (429) or a
+      server error (5xx) is retried with exponential backoff up to
+      `max_retries` times. The retry is scheduled, not slept on, so the
+      worker and the job's key are free in between
+    - job records stay available through `get` and `stats`; with a `store`
+      (see DynamoDBJobStore) they are persisted and pending jobs are
+      re-queued by `recover` after a restart
+    """
+
+    def __init__(self, workers=4, maxsize=1000, max_retries=5, base_delay=1.0, max_delay=60,
+                 mode='thread', store=None, history=1000, clock=time.monotonic):
+        self.workers = workers
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.mode = mode
+        self.store = store
+        self.history = history
+        self.clock = clock
+        self.handlers = {}
+        self.after_process = {}
+
+        self._jobs = OrderedDict()
+        self._ready = deque()
+        self._delayed = []      # heap of (due time, job id) for scheduled retries
+        self._waiting = {}      # key -> deque of job ids blocked behind a running job
+        self._running_keys = set()
+        self._queued = {}       # (name, key) -> queued job id, for coalescing
+        self._condition = threading.Condition()
+        self._threads = []
+        self._process_pool = None
+
+    def register(self, name, handler, after_process=None):
+        self.handlers[name] = handler
+        if after_process is not None:
+            self.after_process[name] = after_process
+
+    def submit(self, name, payload=None, key=None):
+        """
+        Queue a job and return its record.
+        """
+        if name not in self.handlers:
+            raise ValueError(f"Unknown job: {name}")
+
+        with self._condition:
+            queued_id = self._queued.get((name, key)) if key is not None else None
+            if queued_id is not None:
+                return dict(self._jobs[queued_id])
+
+            if self._pending_count() >= self.maxsize:
+                raise QueueFullError("Job queue is full")
+
+            now = datetime.utcnow().isoformat()
+            job = {
+                'job_id': str(uuid.uuid4()),
+                'name': name,
+                'key': key,
+                'payload': payload or {},
+                'status': QUEUED,
+                'attempts': 0,
+                'error': None,
+                'result': None,
+                'created_at': now,
+                'updated_at': now
+            }
+            self._enqueue(job)
+
+        self._save(job)
+        self._start()
+        return dict(job)
+
+    def get(self, job_id):
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        with self._condition:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            return {
+                'workers': self.workers,
+                'mode': self.mode,
+                'pending': self._pending_count(),
+                'running_keys': len(self._running_keys),
+                'jobs': counts
+            }
+
+    def recover(self):
+        """
+        Re-queue the jobs the durable store still has pending (jobs that were
+        running when the process stopped are run again).
+        """
+        if self.store is None:
+            return 0
+        recovered = 0
+        with self._condition:
+            for job in self.store.pending_jobs():
+                if job['job_id'] in self._jobs or job['name'] not in self.handlers:
+                    continue
+                job['status'] = QUEUED
+                self._enqueue(job)
+                recovered += 1
+        if recovered:
+            self._start()
+        return recovered
+
+    def _enqueue(self, job):
+        # Caller holds the condition
+        self._jobs[job['job_id']] = job
+        if job['key'] is not None:
+            self._queued[(job['name'], job['key'])] = job['job_id']
+        self._ready.append(job['job_id'])
+        self._trim_history()
+        self._condition.notify()
+
+    def _pending_count(self):
+        return sum(1 for job in self._jobs.values() if job['status'] in PENDING_STATUSES)
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job['status'] not in PENDING_STATUSES]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def _start(self):
+        with self._condition:
+            if self._threads:
+                return
+            if self.mode == 'process':
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker_process)
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"job-runner-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _next_job(self):
+        with self._condition:
+            while True:
+                while self._delayed and self._delayed[0][0] <= self.clock():
+                    self._ready.append(heapq.heappop(self._delayed)[1])
+                while self._ready:
+                    job = self._jobs[self._ready.popleft()]
+                    key = job['key']
+                    if key is not None and key in self._running_keys:
+                        # Run it after the job holding this key finishes
+                        self._waiting.setdefault(key, deque()).append(job['job_id'])
+                        continue
+                    if key is not None:
+                        self._running_keys.add(key)
+                        if self._queued.get((job['name'], key)) == job['job_id']:
+                            del self._queued[(job['name'], key)]
+                    self._update(job, status=RUNNING)
+                    return job
+                timeout = None
+                if self._delayed:
+                    timeout = max(0, self._delayed[0][0] - self.clock())
+                self._condition.wait(timeout)
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            self._save(job)
+            try:
+                self._run(job)
+            finally:
+                self._release(job)
+
+    def _run(self, job):
+        self._update(job, attempts=job['attempts'] + 1)
+        try:
+            result = self._execute(job['name'], job['payload'])
+            self._update(job, status=SUCCEEDED, error=None, result=result)
+        except ApiException as e:
+            if is_retryable(e) and job['attempts'] <= self.max_retries:
+                self._update(job, status=RETRYING, error=f"Plaid error: {str(e)}")
+                self._retry_later(job, self._retry_delay(job, e))
+            else:
+                self._update(job, status=FAILED, error=f"Plaid error: {str(e)}")
+        except Exception as e:
+            print(f"Job {job['name']} failed:", traceback.format_exc())
+            self._update(job, status=FAILED, error=str(e))
+        self._save(job)
+
+    def _retry_delay(self, job, e):
+        delay = self.base_delay * (2 ** (job['attempts'] - 1))
+        # Our own rate limiter knows when the next call can go out
+        delay = max(delay, getattr(e, 'retry_after', 0) or 0)
+        return min(self.max_delay, delay)
+
+    def _retry_later(self, job, delay):
+        with self._condition:
+            heapq.heappush(self._delayed, (self.clock() + delay, job['job_id']))
+            # Submits for the same key wait for the retry instead of piling up
+            if job['key'] is not None:
+                self._queued.setdefault((job['name'], job['key']), job['job_id'])
+            self._condition.notify()
+
+    def _execute(self, name, payload):
+        if self._process_pool is None:
+            return self.handlers[name](payload)
+        try:
+            return self._process_pool.submit(_run_in_process, name, payload).result()
+        finally:
+            # The worker wrote through its own app and caches
+            after_process = self.after_process.get(name)
+            if after_process is not None:
+                after_process(payload)
+
+    def _release(self, job):
+        key = job['key']
+        if key is None:
+            return
+        with self._condition:
+            self._running_keys.discard(key)
+            waiting = self._waiting.get(key)
+            if waiting:
+                self._ready.appendleft(waiting.popleft())
+                if not waiting:
+                    del self._waiting[key]
+                self._condition.notify()
+
+    def _update(self, job, **fields):
+        with self._condition:
+            job.update(fields, updated_at=datetime.utcnow().isoformat())
+
+    def _save(self, job):
+        if self.store is not None:
+            self.store.save(dict(job))
+
+
+def is_retryable(e):
+    """
+    Plaid errors worth retrying: rate limits and server-side failures.
+    Anything else (bad request, item login required, ...) fails the same
+    way on every attempt.
+    """
+    return is_rate_limit_error(e) or (e.status or 0) >= 500
+
+
+class DynamoDBJobStore:
+    """
+    Durable job records in the `SpendWiseJobs` table (keyed by job_id).
+    """
+
+    def __init__(self, dynamodb, table_name='SpendWiseJobs'):
+        self.table = dynamodb.Table(table_name)
+
+    def save(self, job):
+        self.table.put_item(Item=job)
+
+    def pending_jobs(self):
+        scan_kwargs = {
+            'FilterExpression': '#status IN (:queued, :running, :retrying)',
+            'ExpressionAttributeNames': {'#status': 'status'},
+            'ExpressionAttributeValues': {
+                ':queued': QUEUED, ':running': RUNNING, ':retrying': RETRYING}
+        }
+        while True:
+            response = self.table.scan(**scan_kwargs)
+            yield from response.get('Items', [])
+            start_key = response.get('LastEvaluatedKey')
+            if not start_key:
+                return
+            scan_kwargs['ExclusiveStartKey'] = start_key
+
+
+# Process-pool workers build their own app (clients, models, controllers)
+# and run jobs through its runner's handlers
+_worker_app = None
+
+
+def _init_worker_process():
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app()
+
+
+def _run_in_process(name, payload):
+    return _worker_app.job_runner.handlers[name](payload)
@@ -0,0 +1,103 @@
+import dataclasses
+import math
+import uuid
+from datetime import date
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from .transaction_record import Transaction
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# orjson only encodes integers that fit in 64 bits
+INT_MIN, INT_MAX = -2 ** 63, 2 ** 64 - 1
+
+
+def json_default(value):
+    """
+    Encode the non-JSON types our responses carry: dates as ISO 8601
+    strings (as orjson does natively) and DynamoDB Decimals as numbers.
+    Integral Decimals too large for orjson become floats, and values no
+    float can hold become strings.
+    """
+    if isinstance(value, Transaction):
+        return value.to_dict()
+    if isinstance(value, Decimal):
+        if value.is_finite() and value == value.to_integral_value() \
+                and INT_MIN <= value <= INT_MAX:
+            return int(value)
+        number = float(value)
+        return number if math.isfinite(number) else str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """
+    Flask's stdlib provider with the same encoding rules as OrjsonProvider:
+    UTF-8 rather than \\u escapes, compact separators unless indenting, and
+    the same encoder hook, so bodies match whichever one is active (floats
+    aside, where the two may spell an exponent differently).
+    """
+
+    default = staticmethod(json_default)
+    ensure_ascii = False
+    # Keep the insertion order of response dicts (and skip the sorting cost)
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if 'indent' not in kwargs:
+            kwargs.setdefault('separators', (',', ':'))
+        return super().dumps(obj, **kwargs)
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """
+    Serialize with orjson, which encodes dicts, floats and dates in C.
+    Calls passing stdlib-only options (e.g. `parse_float`) use the stdlib.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._dumps(obj, indent) + b"\n", mimetype=self.mimetype)
+
+    def _dumps(self, obj, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=json_default, option=option)
+
+
+def select_json_provider(name='auto'):
+    """
+    Pick the provider class for JSON_PROVIDER: "orjson", "stdlib", or
+    "auto" (orjson when installed).
+    """
+    if name == 'stdlib' or (name == 'auto' and orjson is None):
+        return StdlibJSONProvider
+    if orjson is None:
+        raise Exception("JSON_PROVIDER is orjson but orjson is not installed")
+    return OrjsonProvider
@@ -0,0 +1,35 @@
+import threading
+from contextlib import contextmanager
+
+
+class KeyedLock:
+    """
+    One reentrant lock per key (e.g. a user id).
+
+    A key's lock is created on first use and dropped once nobody holds or
+    waits for it, so the map only grows with the keys in use. Like
+    SingleFlight it is process-local: it serializes threads, not separate
+    worker processes.
+    """
+
+    def __init__(self):
+        self._locks = {}    # key -> [lock, holders and waiters]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, key):
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.RLock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+    def in_use(self):
+        with self._lock:
+            return len(self._locks)
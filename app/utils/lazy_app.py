@@ -0,0 +1,48 @@
+import threading
+import time
+from flask import Flask
+
+
+class LazyServiceApp(Flask):
+    """
+    Flask app whose shared services (clients, models, controllers) are built
+    on first use rather than in create_app.
+
+    `app.register_service(name, factory)` registers `factory(app)`; the first
+    `app.<name>` (or `current_app.<name>`) builds it under a lock and stores
+    it as a plain attribute, so later lookups cost what they always did.
+    Factories may use other services; they are built on demand too.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.service_factories = {}
+        # Seconds each service took to build (including the services it
+        # built first), for the startup report
+        self.service_timings = {}
+        # Reentrant: building one service builds the ones it depends on
+        self._service_lock = threading.RLock()
+
+    def register_service(self, name, factory):
+        self.service_factories[name] = factory
+        self.__dict__.pop(name, None)
+
+    def warm_services(self):
+        """
+        Build every registered service now, e.g. in a worker's post-fork hook.
+        """
+        for name in list(self.service_factories):
+            getattr(self, name)
+
+    def __getattr__(self, name):
+        # Only called for attributes that are not set yet
+        factories = self.__dict__.get('service_factories')
+        if not factories or name not in factories:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        with self._service_lock:
+            if name not in self.__dict__:
+                started = time.perf_counter()
+                service = factories[name](self)
+                self.service_timings[name] = time.perf_counter() - started
+                self.__dict__[name] = service
+            return self.__dict__[name]
@@ -1,16 +1,50 @@
-from plaid.api import plaid_api
+import socket
+from urllib3 import Retry
+from urllib3.connection import HTTPConnection
 from plaid.configuration import Configuration
 from plaid.api_client import ApiClient
 
 
+class PooledApiClient(ApiClient):
+    """
+    ApiClient that applies a default timeout to every Plaid call unless
+    the caller passes its own `_request_timeout`.
+    """
+
+    def __init__(self, configuration, request_timeout=None):
+        super().__init__(configuration)
+        self.request_timeout = request_timeout
+
+    def call_api(self, *args, _request_timeout=None, **kwargs):
+        return super().call_api(
+            *args, _request_timeout=_request_timeout or self.request_timeout, **kwargs)
+
+
 def init_plaid_client(config):
+    # PlaidApi imports every request/response model; load it only when the
+    # client is first needed
+    from plaid.api import plaid_api
+
     # Create Plaid API client using updated API
     configuration = Configuration(
-        host=f"https://{config['PLAID_ENV']}.plaid.com",
+        host=config.get('PLAID_HOST') or f"https://{config['PLAID_ENV']}.plaid.com",
         api_key={
             'clientId': config['PLAID_CLIENT_ID'],
             'secret': config['PLAID_SECRET'],
         },
     )
-    api_client = ApiClient(configuration)
+    # One urllib3 pool shared by every request thread; keep connections
+    # alive so requests reuse TLS sessions instead of handshaking each time
+    configuration.connection_pool_maxsize = config['PLAID_POOL_MAXSIZE']
+    configuration.socket_options = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    # Only retry failed connects; Plaid POSTs are not safe to replay blindly
+    configuration.retries = Retry(
+        total=None, connect=2, read=0, redirect=0, status=0, other=0)
+
+    api_client = PooledApiClient(
+        configuration,
+        request_timeout=(config['PLAID_CONNECT_TIMEOUT'],
+                         config['PLAID_READ_TIMEOUT'])
+    )
     return plaid_api.PlaidApi(api_client)
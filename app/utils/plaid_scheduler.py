@@ -0,0 +1,235 @@
+import json
+import threading
+import time
+from functools import partial
+from plaid.exceptions import ApiException
+from .ttl_cache import TTLCache
+from .single_flight import SingleFlight
+from .request_metrics import timed
+
+# Requests per minute allowed (client-wide, per item), kept below Plaid's
+# published limits so we throttle ourselves before Plaid does
+DEFAULT_RATE_LIMITS = {
+    'accounts_get': (1200, 12),
+    'transactions_get': (1200, 25),
+    'transactions_sync': (1200, 40),
+    'liabilities_get': (600, 40),
+    'link_token_create': (600, None),
+    'item_public_token_exchange': (600, None),
+    'webhook_verification_key_get': (600, None)
+}
+
+# Reads whose concurrent identical requests can share one response
+COALESCED_ENDPOINTS = {
+    'accounts_get', 'transactions_get', 'transactions_sync', 'liabilities_get',
+    'webhook_verification_key_get'
+}
+
+
+class PlaidRateLimitError(ApiException):
+    """
+    Raised when a Plaid call would have to queue longer than allowed, or
+    Plaid keeps answering RATE_LIMIT_EXCEEDED. `retry_after` is in seconds.
+    """
+
+    def __init__(self, endpoint, retry_after):
+        super().__init__(status=429, reason="RATE_LIMIT_EXCEEDED")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return f"Plaid rate limit reached for {self.endpoint}, retry in {self.retry_after:.0f}s"
+
+
+def is_rate_limit_error(e):
+    return e.status == 429 or "RATE_LIMIT_EXCEEDED" in str(e.body)
+
+
+class TokenBucket:
+    """
+    Allows `per_minute` requests per minute with bursts of up to `capacity`.
+    """
+
+    def __init__(self, per_minute, capacity=None, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.clock = clock
+        self.tokens = float(self.capacity)
+        self.updated_at = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait):
+        """
+        Take a token and return how long to wait before using it, or return
+        None (taking nothing) if that would be longer than `max_wait`.
+        """
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            # Tokens may go negative: later callers queue behind this reservation
+            self.tokens -= 1
+            return wait
+
+    def refund(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def retry_after(self):
+        with self._lock:
+            return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class PlaidScheduler:
+    """
+    Admission control for Plaid calls.
+
+    Every call takes a token from its endpoint's client-wide bucket and,
+    for item-scoped endpoints, from a per-access-token bucket, sleeping
+    until both allow it (or failing with PlaidRateLimitError when that
+    would take more than `max_wait` seconds). Concurrent identical read
+    requests share one in-flight call. RATE_LIMIT_EXCEEDED responses are
+    retried with exponential backoff. `metrics` reports queueing delay per
+    endpoint.
+    """
+
+    def __init__(self, rate_limits=None, max_wait=10, max_retries=3, base_delay=1.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate_limits = rate_limits or DEFAULT_RATE_LIMITS
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.clock = clock
+        self.sleep = sleep
+
+        self.client_buckets = {
+            endpoint: TokenBucket(client_limit, clock=clock)
+            for endpoint, (client_limit, _) in self.rate_limits.items()
+        }
+        # Idle items' buckets refill within a minute, so they can be dropped
+        self.item_buckets = TTLCache(maxsize=10000, ttl=300)
+        self.flights = SingleFlight()
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            max_wait=config['PLAID_RATE_LIMIT_MAX_WAIT'],
+            max_retries=config['PLAID_RATE_LIMIT_RETRIES']
+        )
+
+    def wrap(self, plaid_client):
+        return ScheduledPlaidClient(plaid_client, self)
+
+    def call(self, endpoint, method, request):
+        """
+        Run `method(request)` once the rate limits allow it. The request's
+        `plaid` phase includes the time spent queued or waiting on a
+        coalesced call.
+        """
+        with timed('plaid'):
+            if endpoint not in COALESCED_ENDPOINTS:
+                return self._call(endpoint, method, request)
+
+            key = (endpoint, json.dumps(request.to_dict(), sort_keys=True, default=str))
+            response, shared = self.flights.run(key, self._call, endpoint, method, request)
+            if shared:
+                self._record(endpoint, coalesced=1)
+            return response
+
+    def metrics(self):
+        with self._lock:
+            return {
+                endpoint: {
+                    **counts,
+                    'avg_queue_delay': round(
+                        counts['queue_delay_total'] / counts['calls'], 4) if counts['calls'] else 0.0
+                }
+                for endpoint, counts in self._metrics.items()
+            }
+
+    def _call(self, endpoint, method, request):
+        for attempt in range(self.max_retries + 1):
+            self._acquire(endpoint, request)
+            self._record(endpoint, calls=1)
+            try:
+                return method(request)
+            except ApiException as e:
+                if not is_rate_limit_error(e):
+                    raise
+                delay = self.base_delay * (2 ** attempt)
+                self._record(endpoint, rate_limited=1)
+                if attempt == self.max_retries:
+                    raise PlaidRateLimitError(endpoint, delay)
+                self.sleep(delay)
+
+    def _acquire(self, endpoint, request):
+        buckets = []
+        client_bucket = self.client_buckets.get(endpoint)
+        if client_bucket is not None:
+            buckets.append(client_bucket)
+        item_bucket = self._item_bucket(endpoint, request)
+        if item_bucket is not None:
+            buckets.append(item_bucket)
+
+        wait = 0.0
+        for i, bucket in enumerate(buckets):
+            bucket_wait = bucket.reserve(self.max_wait)
+            if bucket_wait is None:
+                for reserved in buckets[:i]:
+                    reserved.refund()
+                self._record(endpoint, rejected=1)
+                raise PlaidRateLimitError(endpoint, bucket.retry_after())
+            wait = max(wait, bucket_wait)
+
+        if wait:
+            self.sleep(wait)
+        self._record(endpoint, queue_delay_total=wait, queue_delay_max=wait)
+
+    def _item_bucket(self, endpoint, request):
+        item_limit = self.rate_limits.get(endpoint, (None, None))[1]
+        access_token = getattr(request, 'access_token', None) if item_limit else None
+        if not access_token:
+            return None
+
+        key = (endpoint, access_token)
+        with self._lock:
+            bucket = self.item_buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(item_limit, clock=self.clock)
+            # Re-set on every use so active items' buckets never expire
+            self.item_buckets.set(key, bucket)
+        return bucket
+
+    def _record(self, endpoint, **counts):
+        with self._lock:
+            metrics = self._metrics.setdefault(endpoint, {
+                'calls': 0, 'coalesced': 0, 'rejected': 0, 'rate_limited': 0,
+                'queue_delay_total': 0.0, 'queue_delay_max': 0.0
+            })
+            for name, value in counts.items():
+                if name == 'queue_delay_max':
+                    metrics[name] = max(metrics[name], value)
+                else:
+                    metrics[name] += value
+
+
+class ScheduledPlaidClient:
+    """
+    Drop-in wrapper for PlaidApi that routes rate-limited endpoints through
+    a PlaidScheduler; everything else passes straight through.
+    """
+
+    def __init__(self, plaid_client, scheduler):
+        self.plaid_client = plaid_client
+        self.scheduler = scheduler
+
+    def __getattr__(self, name):
+        attribute = getattr(self.plaid_client, name)
+        if name in self.scheduler.rate_limits:
+            return partial(self.scheduler.call, name, attribute)
+        return attribute
@@ -0,0 +1,192 @@
+import re
+import statistics
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+
+# (name, period in days, allowed deviation in days)
+CADENCES = [
+    ("weekly", 7, 2),
+    ("biweekly", 14, 3),
+    ("monthly", 30.44, 5),
+    ("annual", 365.25, 20)
+]
+
+# Card processors and banks prefix descriptors with noise such as
+# "SQ *", "TST* " or "POS DEBIT"
+_PREFIX = re.compile(r"^((pos|debit|purchase|recurring|ach|card)\s+)+|^(sq|tst|pp|sp)\s*\*\s*")
+# Store numbers, dates and reference ids
+_DIGITS = re.compile(r"[#*]?\d[\d\-/.]*")
+_PUNCTUATION = re.compile(r"[^a-z ]+")
+_SUFFIXES = {"inc", "llc", "ltd", "co", "com", "corp", "www"}
+
+
+def normalize_merchant(name):
+    """
+    Reduce a transaction descriptor to a stable merchant key, e.g.
+    "SQ *BLUE BOTTLE #1234" and "Blue Bottle 5678" both become "blue bottle".
+    """
+    name = _PREFIX.sub("", (name or "").lower())
+    name = _PUNCTUATION.sub(" ", _DIGITS.sub(" ", name))
+    return " ".join(word for word in name.split() if word not in _SUFFIXES)
+
+
+def _to_date(value):
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class MerchantSeries:
+    """
+    One merchant's charges, kept sorted by date so a new transaction is
+    inserted in O(log n) comparisons instead of re-sorting the group.
+    """
+
+    def __init__(self, merchant):
+        self.merchant = merchant
+        self.entries = []  # sorted (date, transaction_id, amount, name)
+        self.result = None
+
+    def add(self, transaction_id, txn_date, amount, name):
+        insort(self.entries, (txn_date, transaction_id, amount, name))
+
+    def remove(self, transaction_id, txn_date):
+        index = bisect_left(self.entries, (txn_date, transaction_id))
+        if index < len(self.entries) and self.entries[index][1] == transaction_id:
+            del self.entries[index]
+
+    def score(self, min_occurrences):
+        """
+        Match the median gap between charges to the nearest cadence, then
+        score how many gaps fit that cadence and how stable the amount is.
+        """
+        if len(self.entries) < min_occurrences:
+            return None
+
+        dates = [entry[0] for entry in self.entries]
+        gaps = [(later - earlier).days for earlier, later in zip(dates, dates[1:])]
+        median_gap = statistics.median(gaps)
+
+        for frequency, period, tolerance in CADENCES:
+            if abs(median_gap - period) <= tolerance:
+                break
+        else:
+            return None
+
+        regularity = sum(abs(gap - period) <= tolerance for gap in gaps) / len(gaps)
+        amounts = [float(entry[2]) for entry in self.entries]
+        mean_amount = statistics.fmean(amounts)
+        variation = statistics.pstdev(amounts) / mean_amount if mean_amount else 1.0
+        stability = max(0.0, 1.0 - variation)
+
+        return {
+            "merchant": self.merchant,
+            "name": self.entries[-1][3],
+            "frequency": frequency,
+            "score": round(0.7 * regularity + 0.3 * stability, 3),
+            "occurrences": len(self.entries),
+            "average_amount": round(mean_amount, 2),
+            "last_date": dates[-1].isoformat(),
+            "next_date": (dates[-1] + timedelta(days=round(period))).isoformat(),
+            "transactions": [
+                {"transaction_id": transaction_id, "amount": amount, "date": txn_date.isoformat()}
+                for txn_date, transaction_id, amount, _ in self.entries
+            ]
+        }
+
+
+class RecurringDetector:
+    """
+    Incremental recurring-charge detection for one user.
+
+    Transactions are grouped by normalized merchant name. `update` and
+    `remove` only touch the affected merchants, and only those merchants
+    are re-scored, so feeding in a sync's deltas does not rescan the user's
+    history. A merchant is recurring when it has at least `min_occurrences`
+    charges and its periodicity score reaches `min_score`. Only outflows
+    (positive amounts, as Plaid signs them) count, so payroll and other
+    regular income are never reported as subscriptions.
+    """
+
+    def __init__(self, min_occurrences=3, min_score=0.75):
+        self.min_occurrences = min_occurrences
+        self.min_score = min_score
+        self.series = {}
+        # transaction_id -> (merchant, date), to move or drop updated charges
+        self.index = {}
+        self.dirty = set()
+
+    def update(self, transactions):
+        """
+        Add transactions, replacing any with a transaction_id seen before.
+        """
+        for txn in transactions:
+            if not txn.get('date'):
+                continue
+            transaction_id = txn['transaction_id']
+            self._discard(transaction_id)
+            if not float(txn['amount']) > 0:
+                continue
+
+            name = txn.get('merchant_name') or txn.get('name') or ""
+            merchant = normalize_merchant(name)
+            if not merchant:
+                continue
+            txn_date = _to_date(txn['date'])
+            series = self.series.get(merchant)
+            if series is None:
+                series = self.series[merchant] = MerchantSeries(merchant)
+            series.add(transaction_id, txn_date, txn['amount'], name)
+            self.index[transaction_id] = (merchant, txn_date)
+            self.dirty.add(merchant)
+
+    def remove(self, transaction_ids):
+        for transaction_id in transaction_ids:
+            self._discard(transaction_id)
+
+    def _discard(self, transaction_id):
+        previous = self.index.pop(transaction_id, None)
+        if previous is None:
+            return
+        merchant, txn_date = previous
+        self.series[merchant].remove(transaction_id, txn_date)
+        self.dirty.add(merchant)
+
+    def mark_recurring(self, merchants):
+        """
+        Record merchants already known to be recurring (e.g. stored
+        subscriptions when the detector is rebuilt), so the next
+        `pop_changes` reports the ones that no longer are.
+        """
+        for merchant in merchants:
+            series = self.series.get(merchant)
+            if series is None:
+                series = self.series[merchant] = MerchantSeries(merchant)
+            if series.result is None:
+                series.result = {"merchant": merchant}
+            self.dirty.add(merchant)
+
+    def pop_changes(self):
+        """
+        Re-score the merchants touched since the last call. Returns the
+        merchants that are now recurring and the merchants that no longer are.
+        """
+        recurring, dropped = [], []
+        for merchant in self.dirty:
+            series = self.series[merchant]
+            was_recurring = series.result is not None
+            result = series.score(self.min_occurrences)
+            series.result = result if result and result["score"] >= self.min_score else None
+
+            if series.result is not None:
+                recurring.append(series.result)
+            elif was_recurring:
+                dropped.append(merchant)
+            if not series.entries:
+                del self.series[merchant]
+        self.dirty.clear()
+        return recurring, dropped
+
+    def recurring(self):
+        self.pop_changes()
+        return [series.result for series in self.series.values() if series.result is not None]
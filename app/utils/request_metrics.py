@@ -0,0 +1,208 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, request
+
+# Prometheus' default latency buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Phase timings of the request being handled, if any. Threads a request
+# fans out to see it too when they run in a copy of its context
+_current_timings = ContextVar('request_timings', default=None)
+# Phases already being timed in this context, so nested timers (e.g.
+# build_dashboard calling identify_recurring_transactions) count once
+_active_phases = ContextVar('active_phases', default=frozenset())
+
+
+class Histogram:
+    """
+    Cumulative histogram in the Prometheus sense: per-bucket counts of
+    observations <= each bound, plus their sum and count.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestTimings:
+    """
+    Seconds spent in each phase while handling one request.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block (or decorated function) to `phase` of
+    the current request. Outside a request it only runs the block.
+    """
+    timings = _current_timings.get()
+    active = _active_phases.get()
+    if timings is None or phase in active:
+        yield
+        return
+
+    token = _active_phases.set(active | {phase})
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+        _active_phases.reset(token)
+
+
+def instrument_boto3_client(client, phase):
+    """
+    Time every API call made by a boto3 client (including retries) as `phase`.
+    """
+    def before_call(context, **kwargs):
+        context['metrics_started'] = time.perf_counter()
+
+    def after_call(context, **kwargs):
+        timings = _current_timings.get()
+        started = context.get('metrics_started')
+        if timings is not None and started is not None:
+            timings.add(phase, time.perf_counter() - started)
+
+    client.meta.events.register('before-call', before_call)
+    client.meta.events.register('after-call', after_call)
+
+
+class MetricsRegistry:
+    """
+    Request latency and per-phase time histograms, labelled by endpoint
+    (the URL rule, so path parameters do not multiply series). Metrics
+    are per process.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.requests = {}
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, method, status, seconds, phases):
+        with self._lock:
+            self._histogram(self.requests, (endpoint, method, str(status))).observe(seconds)
+            for phase, phase_seconds in phases.items():
+                self._histogram(self.phases, (endpoint, phase)).observe(phase_seconds)
+
+    def render(self):
+        """
+        The histograms in the Prometheus text exposition format.
+        """
+        with self._lock:
+            lines = render_histograms(
+                'spendwise_request_duration_seconds',
+                'Request latency by endpoint, method and status.',
+                ('endpoint', 'method', 'status'), self.requests)
+            lines += render_histograms(
+                'spendwise_request_phase_seconds',
+                'Time per request spent in each phase (dynamodb, plaid, aggregate, ...).',
+                ('endpoint', 'phase'), self.phases)
+        return "\n".join(lines) + "\n"
+
+    def _histogram(self, series, labels):
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram(self.buckets)
+        return histogram
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    return ",".join(f'{name}="{_label_value(value)}"' for name, value in zip(names, values))
+
+
+def render_histograms(name, help_text, label_names, series):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for values, histogram in sorted(series.items()):
+        labels = _labels(label_names, values)
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def render_counters(name, help_text, label_name, values, metric_type='counter'):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for label, value in sorted(values.items()):
+        lines.append(f'{name}{{{_labels((label_name,), (label,))}}} {value}')
+    return lines
+
+
+def server_timing(phases, total):
+    """
+    `Server-Timing` header value, e.g. "dynamodb;dur=3.1, plaid;dur=80.4, total;dur=90.2".
+    """
+    entries = [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in sorted(phases.items())]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def init_request_metrics(app, registry):
+    """
+    Time every request and its phases, record them in `registry` and, when
+    SERVER_TIMING_HEADER is on, report the breakdown in `Server-Timing`.
+    """
+    # Serializing the response is a phase of its own
+    json_response = app.json.response
+
+    def timed_json_response(*args, **kwargs):
+        with timed('serialize'):
+            return json_response(*args, **kwargs)
+
+    app.json.response = timed_json_response
+
+    @app.before_request
+    def start_request_timing():
+        g.request_started = time.perf_counter()
+        g.request_timings = RequestTimings()
+        g.request_timings_token = _current_timings.set(g.request_timings)
+
+    @app.after_request
+    def record_request_timing(response):
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        phases = dict(g.request_timings.phases)
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        registry.observe(endpoint, request.method, response.status_code, total, phases)
+        if app.config['SERVER_TIMING_HEADER']:
+            response.headers['Server-Timing'] = server_timing(phases, total)
+        return response
+
+    @app.teardown_request
+    def reset_request_timing(exc):
+        token = g.pop('request_timings_token', None)
+        if token is not None:
+            try:
+                _current_timings.reset(token)
+            except ValueError:
+                # Torn down from another context (e.g. a streamed response)
+                _current_timings.set(None)
@@ -0,0 +1,296 @@
+import cProfile
+import hmac
+import io
+import json
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from flask import g, request, current_app
+
+PROFILE_HEADER = 'X-Profile-Request'
+PROFILE_MODES = ('sample', 'cprofile')
+# Files written per profile: metadata plus the profile in each format
+PROFILE_FILES = {
+    'collapsed': '.collapsed',  # collapsed stacks, for flamegraph.pl / speedscope
+    'pstats': '.prof',          # cProfile dump, for pstats / snakeviz
+    'text': '.txt'              # pstats report sorted by cumulative time
+}
+
+
+class StackSampler:
+    """
+    Sample one thread's Python stack every `interval` seconds from a
+    background thread and count identical stacks. The profiled thread is
+    only paused for the GIL handoff, so overhead stays low.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        """
+        One "root;...;leaf count" line per distinct stack.
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in sorted(
+            self.stacks.items(), key=lambda entry: -entry[1])) + "\n"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack = ";".join(reversed(names))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+
+def _short_path(path):
+    # The last two components are enough to tell app/ from site-packages
+    return "/".join(path.replace("\\", "/").split("/")[-2:])
+
+
+class ProfileStore:
+    """
+    Bounded on-disk ring buffer of profiles: once `max_profiles` are
+    stored, saving a new one deletes the oldest.
+    """
+
+    def __init__(self, directory, max_profiles=50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def save(self, metadata, outputs):
+        """
+        Write `metadata` and each `outputs[kind]` (bytes) and return the
+        profile id.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        # Ids sort by creation time, which is what eviction relies on
+        now = time.time()
+        profile_id = (f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))}"
+                      f"-{int(now % 1 * 1e6):06d}-{uuid.uuid4().hex[:6]}")
+        metadata = {**metadata, 'profile_id': profile_id, 'files': sorted(outputs)}
+        for kind, data in outputs.items():
+            with open(self._path(profile_id, PROFILE_FILES[kind]), 'wb') as output:
+                output.write(data)
+        # Metadata last: a profile is listed only once its files exist
+        with open(self._path(profile_id, '.json'), 'w') as output:
+            json.dump(metadata, output)
+        self._evict()
+        return profile_id
+
+    def list(self):
+        """
+        Metadata of the stored profiles, newest first.
+        """
+        profiles = []
+        for name in self._metadata_files():
+            try:
+                with open(os.path.join(self.directory, name)) as metadata:
+                    profiles.append(json.load(metadata))
+            except (OSError, ValueError):
+                # Evicted (or half-written) by another worker meanwhile
+                continue
+        return sorted(profiles, key=lambda profile: profile['profile_id'], reverse=True)
+
+    def get(self, profile_id):
+        if not _valid_id(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id, '.json')) as metadata:
+                return json.load(metadata)
+        except (OSError, ValueError):
+            return None
+
+    def file_path(self, profile_id, kind):
+        """
+        Path of a stored profile file, or None if there is no such file.
+        """
+        if not _valid_id(profile_id) or kind not in PROFILE_FILES:
+            return None
+        path = self._path(profile_id, PROFILE_FILES[kind])
+        return path if os.path.exists(path) else None
+
+    def _metadata_files(self):
+        try:
+            return [name for name in os.listdir(self.directory) if name.endswith('.json')]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self):
+        with self._lock:
+            names = sorted(self._metadata_files())
+            for name in names[:max(0, len(names) - self.max_profiles)]:
+                profile_id = name[:-len('.json')]
+                for suffix in ('.json', *PROFILE_FILES.values()):
+                    try:
+                        os.remove(self._path(profile_id, suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def _path(self, profile_id, suffix):
+        return os.path.join(self.directory, profile_id + suffix)
+
+
+def _valid_id(profile_id):
+    # Ids are generated by `save`; anything else could be a path traversal
+    return bool(profile_id) and all(c.isalnum() or c in '-T' for c in profile_id)
+
+
+class RequestProfiler:
+    """
+    Opt-in profiling of individual requests.
+
+    A request is profiled when it sends `X-Profile-Request: <PROFILER_SECRET>`
+    (optionally `X-Profile-Mode: sample|cprofile`), or at random with
+    probability `sample_rate` when its path starts with one of `endpoints`
+    (any path when empty). "sample" mode runs a StackSampler over the
+    request thread and stores collapsed stacks; "cprofile" mode runs
+    cProfile and stores a pstats dump and report. At most one request per
+    process is profiled at a time, which bounds the overhead and keeps
+    profilers from interfering with each other.
+    """
+
+    def __init__(self, store, secret=None, sample_rate=0.0, endpoints=(), mode='sample',
+                 interval=0.005):
+        self.store = store
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.endpoints = tuple(endpoints)
+        self.mode = mode
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            ProfileStore(config['PROFILER_DIR'], max_profiles=config['PROFILER_MAX_PROFILES']),
+            secret=config['PROFILER_SECRET'],
+            sample_rate=config['PROFILER_SAMPLE_RATE'],
+            endpoints=[path for path in config['PROFILER_ENDPOINTS'].split(',') if path],
+            mode=config['PROFILER_MODE'],
+            interval=config['PROFILER_INTERVAL']
+        )
+
+    def is_admin(self, token):
+        if not self.secret or not token:
+            return False
+        # Bytes, as compare_digest rejects non-ASCII str (headers are latin-1)
+        return hmac.compare_digest(token.encode('utf-8'), self.secret.encode('utf-8'))
+
+    def trigger(self, path, headers):
+        """
+        Why this request should be profiled ("header" or "sample"), or None.
+        """
+        if self.is_admin(headers.get(PROFILE_HEADER)):
+            return 'header'
+        if self.sample_rate and (not self.endpoints or path.startswith(self.endpoints)) \
+                and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def start(self, mode=None):
+        """
+        Start profiling the calling thread; returns None if another
+        request is already being profiled.
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        mode = mode if mode in PROFILE_MODES else self.mode
+        try:
+            if mode == 'cprofile':
+                profiler = cProfile.Profile()
+                profiler.enable()
+            else:
+                profiler = StackSampler(threading.get_ident(), self.interval)
+                profiler.start()
+        except Exception:
+            self._lock.release()
+            raise
+        return {'mode': mode, 'profiler': profiler, 'started': time.perf_counter()}
+
+    def finish(self, session, metadata):
+        """
+        Stop `session`, store its output and return the profile id.
+        """
+        profiler = session['profiler']
+        try:
+            if session['mode'] == 'cprofile':
+                profiler.disable()
+                outputs = _cprofile_outputs(profiler)
+                metadata = {**metadata, 'samples': None}
+            else:
+                profiler.stop()
+                outputs = {'collapsed': profiler.collapsed().encode('utf-8')}
+                metadata = {**metadata, 'samples': profiler.samples}
+        finally:
+            self._lock.release()
+
+        duration = time.perf_counter() - session['started']
+        return self.store.save({
+            **metadata, 'mode': session['mode'], 'duration_ms': round(duration * 1000, 1),
+            'created_at': time.time()
+        }, outputs)
+
+
+def _cprofile_outputs(profiler):
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats('cumulative').print_stats(60)
+    # What Profile.dump_stats writes, without going through a file name
+    return {'pstats': marshal.dumps(stats.stats), 'text': report.getvalue().encode('utf-8')}
+
+
+def init_request_profiler(app):
+    """
+    Profile the requests `app.request_profiler` selects and report the
+    stored profile's id in an `X-Profile-Id` header.
+    """
+    @app.before_request
+    def start_request_profile():
+        profiler = current_app.request_profiler
+        trigger = profiler.trigger(request.path, request.headers)
+        if trigger is None:
+            return
+        session = profiler.start(request.headers.get('X-Profile-Mode'))
+        if session is not None:
+            g.profile_session = {**session, 'trigger': trigger}
+
+    @app.after_request
+    def finish_request_profile(response):
+        session = g.pop('profile_session', None)
+        if session is None:
+            return response
+        profile_id = current_app.request_profiler.finish(session, {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.url_rule.rule if request.url_rule else None,
+            'status': response.status_code,
+            'user_id': getattr(request, 'user_id', None),
+            'trigger': session['trigger']
+        })
+        response.headers['X-Profile-Id'] = profile_id
+        return response
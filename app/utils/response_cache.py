@@ -0,0 +1,168 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from .json_provider import json_default
+
+
+class MemoryBackend:
+    """
+    In-process LRU store exposing the subset of the Redis API the response
+    cache uses (get, set with `ex`, incr, delete), so it doubles as a local
+    stand-in for Redis.
+    """
+
+    def __init__(self, maxsize=2048, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            expires_at = self.clock() + ex if ex else None
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            value, expires_at = self._entries.get(key, (0, None))
+            value = int(value) + 1
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            return value
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+def init_cache_backend(config):
+    """
+    Use Redis when RESPONSE_CACHE_REDIS_URL is set, otherwise an in-process LRU.
+    """
+    redis_url = config.get('RESPONSE_CACHE_REDIS_URL')
+    if not redis_url:
+        return MemoryBackend(maxsize=config['RESPONSE_CACHE_SIZE'])
+
+    try:
+        import redis
+    except ImportError:
+        raise Exception(
+            "RESPONSE_CACHE_REDIS_URL is set but the redis package is not installed")
+    return redis.Redis.from_url(redis_url)
+
+
+def cache_scope(user):
+    """
+    Cached responses are grouped by Plaid item (falling back to the user
+    for users linked before item ids were stored).
+    """
+    return user.get('item_id') or user['user_id']
+
+
+class ResponseCache:
+    """
+    Cache for Plaid-derived responses keyed by (item, endpoint, params).
+
+    Each item has a generation counter that is part of every key, so
+    `invalidate(item)` after a sync or webhook orphans all of the item's
+    entries in one write; they then age out of the backend. Windows that
+    end before today cannot change without a sync, so they are kept for
+    `past_ttl` instead of `ttl`. Once an entry is past its TTL it is still
+    served for `stale_ttl` more seconds while it is recomputed in the
+    background.
+    """
+
+    def __init__(self, backend, ttl=60, past_ttl=86400, stale_ttl=300, workers=2, clock=time.time):
+        self.backend = backend
+        self.ttl = ttl
+        self.past_ttl = past_ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='response-cache')
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            init_cache_backend(config),
+            ttl=config['RESPONSE_CACHE_TTL'],
+            past_ttl=config['RESPONSE_CACHE_PAST_TTL'],
+            stale_ttl=config['RESPONSE_CACHE_STALE_TTL']
+        )
+
+    def get_or_compute(self, scope, endpoint, params, compute, end_date=None):
+        """
+        Return the cached payload for this request, calling `compute()` on a
+        miss. `compute` may run on a background thread, so it must not touch
+        the request context. `end_date` is the last day the payload covers.
+        """
+        key = self._key(scope, endpoint, params)
+        entry = self.backend.get(key)
+        if entry is not None:
+            entry = json.loads(entry)
+            if entry['fresh_until'] > self.clock():
+                return entry['payload']
+            self._refresh_in_background(key, compute, end_date)
+            return entry['payload']
+
+        return self._store(key, compute(), end_date)
+
+    def invalidate(self, scope):
+        self.backend.incr(f"gen:{scope}")
+
+    def ttl_for(self, end_date):
+        if end_date is not None and end_date < date.today():
+            return self.past_ttl
+        return self.ttl
+
+    def _key(self, scope, endpoint, params):
+        generation = int(self.backend.get(f"gen:{scope}") or 0)
+        digest = hashlib.sha256(json.dumps(
+            params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return f"resp:{scope}:{generation}:{endpoint}:{digest}"
+
+    def _store(self, key, payload, end_date):
+        ttl = self.ttl_for(end_date)
+        entry = {'payload': payload, 'fresh_until': self.clock() + ttl}
+        self.backend.set(key, json.dumps(entry, default=json_default),
+                         ex=ttl + self.stale_ttl)
+        return payload
+
+    def _refresh_in_background(self, key, compute, end_date):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._store(key, compute(), end_date)
+            except Exception:
+                # Keep serving the stale entry; the next request retries
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self.executor.submit(refresh)
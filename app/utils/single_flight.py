@@ -0,0 +1,52 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into one.
+
+    The first caller for a key runs the function; callers arriving with the
+    same key while it is in flight wait and receive the same result, or
+    the same exception. Once the call finishes the key is forgotten, so
+    this only de-duplicates overlapping calls and never caches. It is
+    process-local: threads share flights, separate worker processes do not.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def run(self, key, fn, *args, **kwargs):
+        """
+        Return `(result, shared)`, where `shared` is True when this caller
+        waited on another caller's call.
+        """
+        with self._lock:
+            future = self._flights.get(key)
+            leader = future is None
+            if leader:
+                future = self._flights[key] = Future()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if leader:
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._flights[key]
+
+        return future.result(), not leader
+
+    def do(self, key, fn, *args, **kwargs):
+        return self.run(key, fn, *args, **kwargs)[0]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._flights)
@@ -0,0 +1,101 @@
+import hashlib
+import time
+import jwt
+from .ttl_cache import TTLCache
+
+
+class TokenVerificationError(Exception):
+    pass
+
+
+class CognitoTokenVerifier:
+    """
+    Verify Cognito access and ID tokens locally.
+
+    Signatures are checked against the user pool's JWKS, which PyJWKClient
+    caches and refreshes every `jwks_lifespan` seconds (or sooner when a
+    token is signed with a key id it has not seen). Verified claims are
+    cached by token hash, so repeated requests with the same token skip
+    the RSA check entirely. Revocation (sign-out) is per process: other
+    workers keep accepting a revoked token until it expires.
+    """
+
+    def __init__(self, region, user_pool_id, app_client_id, jwks_url=None,
+                 jwks_lifespan=3600, claims_cache_size=4096, claims_cache_ttl=300):
+        self.issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+        self.app_client_id = app_client_id
+        self.jwks_client = jwt.PyJWKClient(
+            jwks_url or f"{self.issuer}/.well-known/jwks.json",
+            cache_jwk_set=True,
+            lifespan=jwks_lifespan
+        )
+        self.claims_cache = TTLCache(
+            maxsize=claims_cache_size, ttl=claims_cache_ttl)
+        # Tokens signed out in this process. Cognito tokens live at most a
+        # day, so entries can be dropped after that
+        self.revoked = TTLCache(maxsize=claims_cache_size, ttl=86400)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config['AWS_REGION'],
+            config['COGNITO_USER_POOL_ID'],
+            config['COGNITO_APP_CLIENT_ID'],
+            jwks_url=config.get('COGNITO_JWKS_URL'),
+            jwks_lifespan=config.get('COGNITO_JWKS_LIFESPAN', 3600)
+        )
+
+    def verify(self, token, token_use=None):
+        """
+        Return the claims of a valid token or raise TokenVerificationError.
+        With `token_use` ('access' or 'id'), only that kind of token passes.
+        """
+        token_hash = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        if self.revoked.get(token_hash):
+            raise TokenVerificationError("Token has been revoked")
+
+        claims = self.claims_cache.get(token_hash)
+        if claims is not None and claims['exp'] <= time.time():
+            # Cached claims are only good until the token itself expires
+            self.claims_cache.invalidate(token_hash)
+            claims = None
+        if claims is None:
+            claims = self._decode(token)
+            self.claims_cache.set(token_hash, claims)
+
+        if token_use is not None and claims['token_use'] != token_use:
+            raise TokenVerificationError(f"Invalid token: expected an {token_use} token")
+        return claims
+
+    def revoke(self, token):
+        token_hash = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        self.claims_cache.invalidate(token_hash)
+        self.revoked.set(token_hash, True)
+
+    def _decode(self, token):
+        try:
+            signing_key = self.jwks_client.get_signing_key_from_jwt(token)
+            # `aud` only exists on ID tokens, so it is checked by hand below
+            claims = jwt.decode(
+                token,
+                signing_key.key,
+                algorithms=["RS256"],
+                issuer=self.issuer,
+                options={"require": ["exp", "iss", "sub", "token_use"],
+                         "verify_aud": False}
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Invalid token: {str(e)}")
+
+        token_use = claims.get('token_use')
+        if token_use == 'access':
+            audience = claims.get('client_id')
+        elif token_use == 'id':
+            audience = claims.get('aud')
+        else:
+            raise TokenVerificationError("Invalid token: unexpected token_use")
+
+        if audience != self.app_client_id:
+            raise TokenVerificationError("Invalid token: audience mismatch")
+
+        return claims
@@ -0,0 +1,168 @@
+import numpy as np
+from datetime import date
+
+
+def _to_day_array(values):
+    """
+    Convert dates or "YYYY-MM-DD" strings to a datetime64[D] array in one go.
+    Missing or malformed dates become NaT.
+    """
+    try:
+        return np.array(values, dtype='datetime64[D]')
+    except (TypeError, ValueError):
+        days = np.empty(len(values), dtype='datetime64[D]')
+        for i, value in enumerate(values):
+            try:
+                days[i] = np.datetime64(value, 'D') if value else np.datetime64('NaT')
+            except (TypeError, ValueError):
+                days[i] = np.datetime64('NaT')
+        return days
+
+
+def _encode(values):
+    """
+    Map values to integer codes in order of first appearance.
+    """
+    codes = {}
+    encoded = np.fromiter(
+        (codes.setdefault(value, len(codes)) for value in values),
+        dtype=np.intp, count=len(values))
+    return encoded, list(codes)
+
+
+def _ordered_sums(codes, weights, size):
+    # np.bincount accumulates in input order, so sums match a plain Python
+    # loop bit-for-bit (np.sum would use pairwise summation instead)
+    return np.bincount(codes, weights=weights, minlength=size)
+
+
+def _ordered_sum(weights):
+    return float(_ordered_sums(np.zeros(len(weights), dtype=np.intp), weights, 1)[0])
+
+
+class TransactionFrame:
+    """
+    Columnar view of a list of transaction dicts. Each field is converted
+    once into a NumPy array (amount, day, month, category code, account code)
+    and every summary is computed with masked, vectorized group-bys.
+    """
+
+    def __init__(self, transactions):
+        self.transactions = list(transactions)
+        count = len(self.transactions)
+
+        self.amounts = np.fromiter(
+            (txn.get("amount", 0.0) for txn in self.transactions),
+            dtype=np.float64, count=count)
+        self.days = _to_day_array(
+            [txn.get("date") for txn in self.transactions])
+        self.valid_dates = ~np.isnat(self.days)
+
+        months = self.days.astype('datetime64[M]').astype(np.int64)
+        self.months = months % 12  # 0 = January
+
+        self.category_codes, self.categories = _encode(
+            [(txn.get("category") or ["Uncategorized"])[0] for txn in self.transactions])
+        self.account_codes, self.accounts = _encode(
+            [txn.get("account_id") for txn in self.transactions])
+
+    def __len__(self):
+        return len(self.transactions)
+
+    def window(self, start_date=None, end_date=None):
+        """
+        Boolean mask of transactions dated within [start_date, end_date].
+        """
+        mask = self.valid_dates.copy()
+        if start_date is not None:
+            mask &= self.days >= np.datetime64(start_date, 'D')
+        if end_date is not None:
+            mask &= self.days <= np.datetime64(end_date, 'D')
+        return mask
+
+    def summary(self, mask=None, details=True):
+        """
+        Income (negative amounts) and expenses (zero or positive amounts),
+        optionally with per-transaction details.
+        """
+        mask = np.ones(len(self), dtype=bool) if mask is None else mask
+        income_mask = mask & (self.amounts < 0)
+        expense_mask = mask & (self.amounts >= 0)
+
+        summary = {
+            "income": _ordered_sum(np.where(income_mask, -self.amounts, 0.0)),
+            "expenses": _ordered_sum(np.where(expense_mask, self.amounts, 0.0))
+        }
+        if details:
+            summary["income_details"] = self._details(income_mask)
+            summary["expense_details"] = self._details(expense_mask)
+        return summary
+
+    def _details(self, mask):
+        return [
+            {
+                "date": self.transactions[i]["date"],
+                "amount": abs(float(self.amounts[i])),
+                "category": self.categories[self.category_codes[i]],
+                "name": self.transactions[i]["name"]
+            }
+            for i in np.flatnonzero(mask)
+        ]
+
+    def monthly_summary(self, mask=None, month_format="%B"):
+        """
+        Income and expenses grouped by calendar month, in month order.
+        Transactions without a valid date are skipped.
+        """
+        mask = self.valid_dates if mask is None else mask & self.valid_dates
+        months = np.where(mask, self.months, 0)
+        income = _ordered_sums(
+            months, np.where(mask & (self.amounts < 0), -self.amounts, 0.0), 12)
+        expenses = _ordered_sums(
+            months, np.where(mask & (self.amounts >= 0), self.amounts, 0.0), 12)
+        present = np.bincount(self.months[mask], minlength=12) > 0
+
+        return [
+            {
+                "month": date(2000, month + 1, 1).strftime(month_format),
+                "income": round(float(income[month]), 2),
+                "expenses": round(float(expenses[month]), 2)
+            }
+            for month in np.flatnonzero(present)
+        ]
+
+    def expense_categories(self, mask=None):
+        """
+        Expenses (positive amounts) grouped by primary category, in order of
+        first appearance.
+        """
+        mask = np.ones(len(self), dtype=bool) if mask is None else mask
+        expense_mask = mask & (self.amounts > 0)
+
+        codes = self.category_codes[expense_mask]
+        amounts = self.amounts[expense_mask]
+        totals = _ordered_sums(codes, amounts, len(self.categories))
+        _, first_seen = np.unique(codes, return_index=True)
+        ordered_codes = codes[np.sort(first_seen)]
+
+        return {
+            "categories": [
+                {"category": self.categories[code],
+                    "amount": round(float(totals[code]), 2)}
+                for code in ordered_codes
+            ],
+            "total_categories": len(ordered_codes),
+            "total_expenses": round(_ordered_sum(amounts), 2)
+        }
+
+    def group_by_account(self, mask=None):
+        """
+        Split the (masked) transactions into lists per account_id.
+        """
+        mask = np.ones(len(self), dtype=bool) if mask is None else mask
+        indices = np.flatnonzero(mask)
+        codes = self.account_codes[indices]
+        return {
+            self.accounts[code]: [self.transactions[i] for i in indices[codes == code]]
+            for code in codes[np.sort(np.unique(codes, return_index=True)[1])]
+        }
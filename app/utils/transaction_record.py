@@ -0,0 +1,82 @@
+class Transaction:
+    """
+    Compact transaction record holding only the fields the app uses.
+
+    `from_plaid` reads them straight off a Plaid model instead of going
+    through `to_dict()`, which deep-copies every nested field (location,
+    payment_meta, counterparties, ...). Records also answer `txn["amount"]`,
+    `txn.get("category")`, `"name" in txn`, `txn.items()` and `dict(txn)`,
+    so code written for transaction dicts (summaries, the store, the
+    recurring detector) runs on them as is.
+
+    Every other Plaid field is dropped, so JSON built from records (and
+    from the store, which keeps the same fields) has only these keys.
+    """
+
+    __slots__ = ('transaction_id', 'account_id', 'amount', 'date', 'name',
+                 'merchant_name', 'category', 'pending')
+
+    def __init__(self, transaction_id, account_id=None, amount=0.0, date=None, name=None,
+                 merchant_name=None, category=None, pending=False):
+        self.transaction_id = transaction_id
+        self.account_id = account_id
+        self.amount = amount
+        self.date = date
+        self.name = name
+        self.merchant_name = merchant_name
+        self.category = category
+        self.pending = pending
+
+    @classmethod
+    def from_plaid(cls, model):
+        """
+        Project a Plaid `Transaction` model (or any object with the same
+        attributes). Missing optional fields become None.
+        """
+        category = getattr(model, 'category', None)
+        return cls(
+            model.transaction_id,
+            account_id=getattr(model, 'account_id', None),
+            amount=model.amount,
+            date=getattr(model, 'date', None),
+            name=getattr(model, 'name', None),
+            merchant_name=getattr(model, 'merchant_name', None),
+            category=list(category) if category else None,
+            pending=bool(getattr(model, 'pending', False))
+        )
+
+    def keys(self):
+        return self.__slots__
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self.__slots__]
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __getitem__(self, key):
+        # Only fields are items; methods such as `get` are not
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other):
+        if isinstance(other, Transaction):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Transaction({self.transaction_id!r}, amount={self.amount!r}, date={self.date!r})"
+
+
+def project_transactions(models):
+    return [Transaction.from_plaid(model) for model in models]
@@ -0,0 +1,76 @@
+import hashlib
+import hmac
+import time
+import jwt
+from .ttl_cache import TTLCache
+
+
+class WebhookVerificationError(Exception):
+    pass
+
+
+class PlaidWebhookVerifier:
+    """
+    Verify the `Plaid-Verification` header sent with every Plaid webhook.
+
+    The header is an ES256 JWT whose `request_body_sha256` claim must match
+    the raw request body and whose `iat` must be recent. Signing keys are
+    fetched from /webhook_verification_key/get by key id and cached.
+    """
+
+    def __init__(self, plaid_client, max_age=300, key_cache_ttl=86400, clock=time.time):
+        self.plaid_client = plaid_client
+        self.max_age = max_age
+        self.clock = clock
+        self.keys = TTLCache(maxsize=64, ttl=key_cache_ttl)
+
+    def verify(self, body, header):
+        """
+        Return the verified claims or raise WebhookVerificationError.
+        """
+        if not header:
+            raise WebhookVerificationError("Missing Plaid-Verification header")
+
+        try:
+            unverified = jwt.get_unverified_header(header)
+        except jwt.PyJWTError as e:
+            raise WebhookVerificationError(f"Invalid webhook signature: {str(e)}")
+        if unverified.get('alg') != 'ES256' or not unverified.get('kid'):
+            raise WebhookVerificationError("Invalid webhook signature: unexpected header")
+
+        try:
+            claims = jwt.decode(
+                header,
+                self._signing_key(unverified['kid']),
+                algorithms=["ES256"],
+                options={"require": ["iat", "request_body_sha256"]}
+            )
+        except jwt.PyJWTError as e:
+            raise WebhookVerificationError(f"Invalid webhook signature: {str(e)}")
+
+        if self.clock() - claims['iat'] > self.max_age:
+            raise WebhookVerificationError("Webhook is too old")
+
+        body_hash = hashlib.sha256(body).hexdigest()
+        if not hmac.compare_digest(body_hash, claims['request_body_sha256']):
+            raise WebhookVerificationError("Webhook body does not match its signature")
+
+        return claims
+
+    def _signing_key(self, key_id):
+        from plaid.model.webhook_verification_key_get_request import WebhookVerificationKeyGetRequest
+
+        key = self.keys.get(key_id)
+        if key is None:
+            try:
+                response = self.plaid_client.webhook_verification_key_get(
+                    WebhookVerificationKeyGetRequest(key_id=key_id))
+            except Exception as e:
+                raise WebhookVerificationError(
+                    f"Error fetching webhook verification key: {str(e)}")
+            jwk = response.to_dict()['key']
+            if jwk.get('expired_at'):
+                raise WebhookVerificationError("Webhook verification key has expired")
+            key = jwt.PyJWK(jwk, algorithm="ES256").key
+            self.keys.set(key_id, key)
+        return key
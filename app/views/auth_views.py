@@ -1,5 +1,4 @@
 from flask import Blueprint, request, jsonify, current_app
-from ..models.user_model import UserModel
 from ..controllers.auth_controller import AuthController
 
 auth_bp = Blueprint('auth_bp', __name__)
@@ -8,12 +7,11 @@ auth_bp = Blueprint('auth_bp', __name__)
 @auth_bp.before_request
 def setup_controller():
     """
-    Initialize `auth_controller` and `user_model` for every request dynamically.
+    Point `auth_controller` and `user_model` at the app's shared instances.
     """
     global auth_controller, user_model
-    user_model = UserModel(current_app.dynamodb)
-    auth_controller = AuthController(
-        current_app.cognito, user_model, current_app.config)
+    user_model = current_app.user_model
+    auth_controller = current_app.auth_controller
 
 
 @auth_bp.route('/register', methods=['POST'])
@@ -64,6 +62,5 @@ def sign_out():
     if access_token.startswith("Bearer "):
         access_token = access_token[len("Bearer "):]
 
-    # No user model needed for sign out
-    auth_controller = AuthController(current_app.cognito, None)
-    return jsonify(*auth_controller.sign_out(access_token))
+    result, status_code = auth_controller.sign_out(access_token)
+    return jsonify(result), status_code
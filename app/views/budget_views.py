@@ -1,36 +1,62 @@
 from flask import Blueprint, request, jsonify, current_app
-from ..models.budget_model import BudgetModel
-from ..controllers.budget_controller import BudgetController
+from ..utils.auth import requires_auth
+from ..utils.http_pagination import page_args, wants_ndjson, ndjson_response
 
 budget_bp = Blueprint('budget_bp', __name__)
-budget_model = BudgetModel(current_app.dynamodb)
-budget_controller = BudgetController(budget_model)
+
+
+@budget_bp.before_request
+def setup_controller():
+    """
+    Point `budget_controller` at the app's shared instance for this request.
+    """
+    global budget_controller
+    budget_controller = current_app.budget_controller
+
+
+def _budget_body():
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
 
 
 @budget_bp.route('/', methods=['POST'])
+@requires_auth
 def create_budget():
-    data = request.json
-    user_id = data.get('user_id')
+    data = _budget_body()
     category = data.get('category')
+    if not category:
+        return jsonify({'error': 'Category is required'}), 400
     amount = data.get('amount')
-    return budget_controller.create_budget(user_id, category, amount)
+    return budget_controller.create_budget(request.user_id, category, amount)
 
 
 @budget_bp.route('/', methods=['GET'])
+@requires_auth
 def get_budgets():
-    user_id = request.args.get('user_id')
-    return budget_controller.get_budgets(user_id)
+    """
+    Cursor-paginated list of the authenticated user's budgets, or a full
+    NDJSON export.
+    """
+    user_id = request.user_id
+
+    if wants_ndjson():
+        return ndjson_response(budget_controller.iter_budgets(user_id))
+
+    try:
+        limit, page_token = page_args()
+        return budget_controller.get_budgets(user_id, limit, page_token)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 
 @budget_bp.route('/<string:category>', methods=['PUT'])
+@requires_auth
 def update_budget(category):
-    data = request.json
-    user_id = data.get('user_id')
-    new_amount = data.get('amount')
-    return budget_controller.update_budget(user_id, category, new_amount)
+    new_amount = _budget_body().get('amount')
+    return budget_controller.update_budget(request.user_id, category, new_amount)
 
 
 @budget_bp.route('/<string:category>', methods=['DELETE'])
+@requires_auth
 def delete_budget(category):
-    user_id = request.args.get('user_id')
-    return budget_controller.delete_budget(user_id, category)
+    return budget_controller.delete_budget(request.user_id, category)
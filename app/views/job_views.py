@@ -0,0 +1,62 @@
+from flask import Blueprint, request, jsonify, current_app
+from ..utils.auth import requires_auth, requires_metrics_token
+from ..utils.job_runner import QueueFullError
+
+job_bp = Blueprint('job_bp', __name__)
+
+
+def _queue_for_user(enqueue):
+    """
+    Look up the caller and queue a job for them with `enqueue(user)`.
+    """
+    user = current_app.user_model.get_user(request.user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    if not user.get('access_token'):
+        return jsonify({'error': 'No linked bank account for this user'}), 400
+
+    try:
+        job = enqueue(user)
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+
+    return jsonify({"message": "Job queued", "job": job}), 202
+
+
+@job_bp.route('/sync', methods=['POST'])
+@requires_auth
+def queue_sync():
+    """
+    Queue a transaction sync instead of running it on the request thread.
+    """
+    return _queue_for_user(current_app.job_controller.enqueue_sync)
+
+
+@job_bp.route('/rollups/rebuild', methods=['POST'])
+@requires_auth
+def queue_rollup_rebuild():
+    """
+    Queue a rebuild of the user's monthly rollups from the transaction store.
+    """
+    return _queue_for_user(current_app.job_controller.enqueue_rollup_rebuild)
+
+
+@job_bp.route('/<job_id>', methods=['GET'])
+@requires_auth
+def get_job(job_id):
+    """
+    Status of one of the caller's jobs.
+    """
+    job = current_app.job_controller.get_job(job_id)
+    if not job or job['payload'].get('user_id') != request.user_id:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job), 200
+
+
+@job_bp.route('/stats', methods=['GET'])
+@requires_metrics_token
+def get_job_stats():
+    """
+    Queue depth and job counts by status for this process.
+    """
+    return jsonify(current_app.job_runner.stats()), 200
@@ -0,0 +1,44 @@
+from flask import Blueprint, current_app
+from ..utils.auth import requires_metrics_token
+from ..utils.request_metrics import render_counters
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+# PlaidScheduler.metrics() fields exported as counters: (metric, help)
+SCHEDULER_COUNTERS = {
+    'calls': ('spendwise_plaid_calls_total', 'Plaid calls made.'),
+    'coalesced': ('spendwise_plaid_coalesced_total',
+                  'Plaid calls answered by an identical in-flight call.'),
+    'rejected': ('spendwise_plaid_rejected_total',
+                 'Plaid calls refused by the client-side rate limiter.'),
+    'rate_limited': ('spendwise_plaid_rate_limited_total',
+                     'Plaid calls answered with RATE_LIMIT_EXCEEDED.'),
+    'queue_delay_total': ('spendwise_plaid_queue_delay_seconds_total',
+                          'Seconds Plaid calls spent queued for a rate-limit token.')
+}
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+@requires_metrics_token
+def get_metrics():
+    """
+    Request, phase and Plaid scheduler metrics in the Prometheus text format.
+    """
+    body = current_app.request_metrics.render()
+
+    scheduler_metrics = current_app.plaid_scheduler.metrics()
+    lines = []
+    for field, (name, help_text) in SCHEDULER_COUNTERS.items():
+        lines += render_counters(name, help_text, 'endpoint', {
+            endpoint: counts[field] for endpoint, counts in scheduler_metrics.items()})
+
+    job_stats = current_app.job_runner.stats()
+    lines += render_counters(
+        'spendwise_jobs', 'Background jobs by status.', 'status', job_stats['jobs'],
+        metric_type='gauge')
+    lines += ["# HELP spendwise_jobs_pending Background jobs waiting for a worker.",
+              "# TYPE spendwise_jobs_pending gauge",
+              f"spendwise_jobs_pending {job_stats['pending']}"]
+
+    return current_app.response_class(
+        body + "\n".join(lines) + "\n", mimetype='text/plain; version=0.0.4')
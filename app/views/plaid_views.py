@@ -1,376 +1,543 @@
-from flask import Blueprint, request, jsonify, current_app
-from ..controllers.plaid_controller import PlaidController
-from ..models.user_model import UserModel
 from functools import wraps
+from flask import Blueprint, request, jsonify, current_app
+from werkzeug.exceptions import HTTPException
+from ..controllers.plaid_controller import PlaidController, previous_month_range, dashboard_range
+from ..utils.auth import requires_auth, requires_metrics_token
+from ..utils.response_cache import cache_scope
+from ..utils.webhook_verifier import WebhookVerificationError
+from ..utils.job_runner import QueueFullError
+from ..utils.plaid_scheduler import PlaidRateLimitError
+from ..utils.http_pagination import ndjson_response, csv_response
+from ..controllers.transaction_controller import EXPORT_FIELDS
 from datetime import datetime, timedelta, date
-from collections import defaultdict
+import math
 
 # Define Blueprint correctly
 plaid_bp = Blueprint('plaid_bp', __name__)
 
 
-def requires_auth(func):
-    @wraps(func)
-    def decorated(*args, **kwargs):
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return jsonify({'error': 'Authorization Bearer token is required'}), 401
+@plaid_bp.errorhandler(PlaidRateLimitError)
+def rate_limited(e):
+    """
+    429 response for a Plaid call that hit our (or Plaid's) rate limit.
+    """
+    response = jsonify({'error': str(e)})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(e.retry_after)))
+    return response
 
-        # Extract the Access Token (Bearer token)
-        access_token = auth_header.split(" ")[1]
-        # Attach to request object for downstream use
-        request.access_token = access_token
-        return func(*args, **kwargs)
 
-    return decorated
+def plaid_errors(message=None):
+    """
+    Answer an unexpected error from the view with a 500 whose message
+    starts with `message`. Rate limits are left to `rate_limited`.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            try:
+                return f(*args, **kwargs)
+            except (PlaidRateLimitError, HTTPException):
+                raise
+            except Exception as e:
+                error = f"{message}: {str(e)}" if message else str(e)
+                return jsonify({'error': error}), 500
+        return decorated
+    return decorator
 
 
 @plaid_bp.route('/create_link_token', methods=['POST'])
+@requires_auth
+@plaid_errors()
 def create_link_token():
-    # Access the Plaid client from the current app context
-    plaid_client = current_app.plaid_client
-    plaid_controller = PlaidController(plaid_client)
-
-    data = request.json
-    user_id = data.get('user_id')
-    if not user_id:
-        return jsonify({'error': 'User ID is required'}), 400
+    # Access the shared Plaid controller from the current app context
+    plaid_controller = current_app.plaid_controller
 
-    try:
-        link_token = plaid_controller.create_link_token(user_id)
-        return jsonify({'link_token': link_token}), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    link_token = plaid_controller.create_link_token(request.user_id)
+    return jsonify({'link_token': link_token}), 200
 
 
 @plaid_bp.route('/exchange_public_token', methods=['POST'])
+@requires_auth
+@plaid_errors('Error linking bank account')
 def exchange_public_token():
-    # Access the Plaid client and user model from the current app context
-    plaid_client = current_app.plaid_client
-    user_model = UserModel(current_app.dynamodb)  # Initialize the user model
-    plaid_controller = PlaidController(plaid_client)
+    # Access the shared Plaid controller and user model from the current app context
+    user_model = current_app.user_model
+    plaid_controller = current_app.plaid_controller
 
-    data = request.json
+    data = request.get_json(silent=True) or {}
     public_token = data.get('public_token')
-    user_id = data.get('user_id')
+    user_id = request.user_id
 
-    if not public_token or not user_id:
-        return jsonify({'error': 'Public token and user_id are required'}), 400
+    if not public_token:
+        return jsonify({'error': 'Public token is required'}), 400
 
-    try:
-        # Exchange public token for access token and item_id
-        access_token, item_id = plaid_controller.exchange_public_token(
-            public_token)
-
-        # Update the user in DynamoDB with the new access_token and item_id
-        user_model.update_item(
-            user_id, access_token=access_token, item_id=item_id)
+    # Exchange public token for access token and item_id
+    access_token, item_id = plaid_controller.exchange_public_token(
+        public_token)
 
-        return jsonify({
-            "message": "Bank account linked successfully",
-            "item_id": item_id,
-            "access_token": access_token  # Optional to return for security
-        }), 200
+    # Save the new access_token and item_id; the new item syncs from
+    # the beginning and the replaced item's transactions are purged
+    user = user_model.get_user(user_id) or {'user_id': user_id}
+    current_app.sync_controller.link_item(user, access_token, item_id)
 
-    except Exception as e:
-        return jsonify({'error': f"Error linking bank account: {str(e)}"}), 500
+    # The access token stays server-side
+    return jsonify({
+        "message": "Bank account linked successfully",
+        "item_id": item_id
+    }), 200
 
 
 @plaid_bp.route('/get_user_bank_info', methods=['POST'])
 @requires_auth  # Validate the Bearer token
+@plaid_errors('Error fetching bank info')
 def get_user_bank_info():
     """
     Fetch the user's bank account information from Plaid using their access token.
     """
-    plaid_client = current_app.plaid_client
-    user_model = UserModel(current_app.dynamodb)  # Initialize the user model
-    plaid_controller = PlaidController(plaid_client)
+    user_model = current_app.user_model
+    plaid_controller = current_app.plaid_controller
 
     data = request.json
-    user_id = data.get('user_id')
+    user_id = data.get('user_id', request.user_id)
 
     if not user_id:
         return jsonify({'error': 'User ID is required'}), 400
 
-    try:
-        # Retrieve user from DynamoDB
-        user = user_model.get_user(user_id)
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-
-        access_token = user.get('access_token')
-        if not access_token:
-            return jsonify({'error': 'No linked bank account for this user'}), 400
+    # Retrieve user from DynamoDB
+    user = user_model.get_user(user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
 
-        # Fetch bank accounts using Plaid
-        accounts = plaid_controller.get_accounts(access_token)
+    access_token = user.get('access_token')
+    if not access_token:
+        return jsonify({'error': 'No linked bank account for this user'}), 400
 
-        return jsonify({
-            "message": "User bank information retrieved successfully",
-            "accounts": accounts
-        }), 200
+    # Fetch bank accounts using Plaid
+    accounts = plaid_controller.get_accounts(access_token)
 
-    except Exception as e:
-        return jsonify({'error': f"Error fetching bank info: {str(e)}"}), 500
+    return jsonify({
+        "message": "User bank information retrieved successfully",
+        "accounts": accounts
+    }), 200
 
 
 @plaid_bp.route('/transactions/summary', methods=['POST'])
 @requires_auth
+@plaid_errors('Error fetching transactions summary')
 def get_transactions_summary():
     """
     Fetch the user's transactions and compute income/expenses summary.
     Allows optional start_date and end_date parameters.
     """
-    plaid_client = current_app.plaid_client
-    user_model = UserModel(current_app.dynamodb)
-    plaid_controller = PlaidController(plaid_client)
+    user_model = current_app.user_model
+    plaid_controller = current_app.plaid_controller
+    sync_controller = current_app.sync_controller
+    response_cache = current_app.response_cache
 
     data = request.json
-    user_id = data.get('user_id')
+    user_id = data.get('user_id', request.user_id)
     start_date = data.get('start_date')  # Optional
     end_date = data.get('end_date')  # Optional
 
     if not user_id:
         return jsonify({'error': 'User ID is required'}), 400
 
-    try:
-        # Retrieve user from DynamoDB
-        user = user_model.get_user(user_id)
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-
-        access_token = user.get('access_token')
-        if not access_token:
-            return jsonify({'error': 'No linked bank account for this user'}), 400
-
-        # Convert start_date and end_date to datetime.date
-        start_date = datetime.strptime(
-            start_date, "%Y-%m-%d").date() if start_date else None
-        end_date = datetime.strptime(
-            end_date, "%Y-%m-%d").date() if end_date else None
-
-        # Get transactions summary
-        summary = plaid_controller.get_transactions_summary(
-            access_token=access_token,
-            start_date=start_date,
-            end_date=end_date
-        )
-
-        return jsonify({
+    # Retrieve user from DynamoDB
+    user = user_model.get_user(user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    access_token = user.get('access_token')
+    if not access_token:
+        return jsonify({'error': 'No linked bank account for this user'}), 400
+
+    # Convert start_date and end_date to datetime.date
+    start_date = datetime.strptime(
+        start_date, "%Y-%m-%d").date() if start_date else None
+    end_date = datetime.strptime(
+        end_date, "%Y-%m-%d").date() if end_date else None
+
+    # Set default date range (last 30 days) if not provided
+    end_date = end_date or datetime.now().date()
+    start_date = start_date or (end_date - timedelta(days=30))
+
+    # Summarize transactions from the local store
+    def summarize():
+        transactions = sync_controller.get_transactions(
+            user, start_date=start_date, end_date=end_date)
+        summary = plaid_controller.summarize_transactions(transactions)
+        return {
             "message": "Transactions summary fetched successfully",
             "income": round(summary["income"], 2),
             "expenses": round(summary["expenses"], 2),
             "income_details": summary["income_details"],
             "expense_details": summary["expense_details"]
-        }), 200
+        }
 
-    except Exception as e:
-        return jsonify({'error': f"Error fetching transactions summary: {str(e)}"}), 500
+    payload = response_cache.get_or_compute(
+        cache_scope(user), 'transactions/summary',
+        {"start_date": start_date, "end_date": end_date}, summarize,
+        end_date=end_date)
+    return jsonify(payload), 200
 
 
 @plaid_bp.route('/transactions/monthly-summary', methods=['POST'])
 @requires_auth
+@plaid_errors('Error fetching monthly summary')
 def get_monthly_summary():
     """
     Endpoint to get income and expense summary for each month.
     """
-    plaid_client = current_app.plaid_client
-    plaid_controller = PlaidController(plaid_client)
-    user_model = UserModel(current_app.dynamodb)
+    user_model = current_app.user_model
+    sync_controller = current_app.sync_controller
+    rollup_controller = current_app.rollup_controller
+    response_cache = current_app.response_cache
 
     # Get request data
     data = request.json
-    user_id = data.get('user_id')
+    user_id = data.get('user_id', request.user_id)
 
     if not user_id:
         return jsonify({'error': 'User ID is required'}), 400
 
-    try:
-        # Retrieve user from DynamoDB
-        user = user_model.get_user(user_id)
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-
-        access_token = user.get('access_token')
-        if not access_token:
-            return jsonify({'error': 'No linked bank account for this user'}), 400
+    # Retrieve user from DynamoDB
+    user = user_model.get_user(user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
 
-        # Fetch transactions from Plaid
-        transactions = plaid_controller.get_transactions(access_token)
+    access_token = user.get('access_token')
+    if not access_token:
+        return jsonify({'error': 'No linked bank account for this user'}), 400
 
-        # Process transactions: group by month
-        monthly_summary = defaultdict(lambda: {'income': 0, 'expenses': 0})
+    # Read the current year's monthly rollups (abbreviated month names, e.g. "Jan")
+    year = datetime.now().year
 
-        for txn in transactions:
-            try:
-                # Safely handle txn['date']
-                txn_date = txn.get('date')
-                if not txn_date:
-                    continue  # Skip if no date
-
-                # Check if txn_date is already a datetime.date object
-                if isinstance(txn_date, datetime):
-                    txn_date = txn_date.date()  # Extract date if datetime
-                elif isinstance(txn_date, str):
-                    txn_date = datetime.strptime(txn_date, "%Y-%m-%d").date()
-
-                # Extract month abbreviation
-                month = txn_date.strftime("%b")
-
-                # Categorize amount into income or expenses
-                amount = txn.get('amount', 0)
-                if amount < 0:  # Negative amount = income
-                    monthly_summary[month]['income'] += abs(amount)
-                else:  # Positive amount = expense
-                    monthly_summary[month]['expenses'] += amount
-            except Exception as txn_error:
-                print(f"Skipping malformed transaction: {txn_error}")
-                continue
-
-        # Convert summary to a list of dictionaries (sorted by month order)
-        month_order = ['Jan', 'Feb', 'Mar', 'Apr', 'May',
-                       'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        result = [
-            {
-                "month": month,
-                "income": round(monthly_summary[month]['income'], 2),
-                "expenses": round(monthly_summary[month]['expenses'], 2)
-            }
-            for month in month_order if month in monthly_summary
-        ]
-
-        return jsonify({
+    def summarize():
+        sync_controller.ensure_synced(user)
+        return {
             "message": "Monthly income and expense summary fetched successfully",
-            "monthly_summary": result
-        }), 200
+            "monthly_summary": rollup_controller.get_monthly_summary(
+                user_id, year, month_format="%b")
+        }
 
-    except Exception as e:
-        return jsonify({'error': f"Error fetching monthly summary: {str(e)}"}), 500
+    payload = response_cache.get_or_compute(
+        cache_scope(user), 'transactions/monthly-summary', {"year": year},
+        summarize, end_date=date(year, 12, 31))
+    return jsonify(payload), 200
 
 
 @plaid_bp.route('/transactions/expense-categories', methods=['POST'])
 @requires_auth
+@plaid_errors('Error fetching expense categories')
 def get_expense_categories():
     """
     Endpoint to get expense categories breakdown for the previous month.
     """
-    plaid_client = current_app.plaid_client
-    plaid_controller = PlaidController(plaid_client)
-    user_model = UserModel(current_app.dynamodb)
+    user_model = current_app.user_model
+    sync_controller = current_app.sync_controller
+    rollup_controller = current_app.rollup_controller
+    response_cache = current_app.response_cache
 
     # Get request data
     data = request.json
-    user_id = data.get('user_id')
+    user_id = data.get('user_id', request.user_id)
 
     if not user_id:
         return jsonify({'error': 'User ID is required'}), 400
 
-    try:
-        # Retrieve user from DynamoDB
-        user = user_model.get_user(user_id)
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+    # Retrieve user from DynamoDB
+    user = user_model.get_user(user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
 
-        access_token = user.get('access_token')
-        if not access_token:
-            return jsonify({'error': 'No linked bank account for this user'}), 400
+    access_token = user.get('access_token')
+    if not access_token:
+        return jsonify({'error': 'No linked bank account for this user'}), 400
 
-        # Fetch expense categories
-        result = plaid_controller.get_previous_month_expenses(access_token)
+    # Read last month's category totals from its rollup
+    month_start, month_end = previous_month_range()
 
-        return jsonify({
+    def categorize():
+        sync_controller.ensure_synced(user)
+        result = rollup_controller.get_expense_categories(
+            user_id, month_start)
+        return {
             "message": "Expense categories fetched successfully",
             "categories": result["categories"],
             "total_categories": result["total_categories"],
             "total_expenses": result["total_expenses"]
-        }), 200
+        }
+
+    payload = response_cache.get_or_compute(
+        cache_scope(user), 'transactions/expense-categories',
+        {"month": month_start}, categorize, end_date=month_end)
+    return jsonify(payload), 200
+
+
+@plaid_bp.route('/transactions/export', methods=['GET'])
+@requires_auth
+@plaid_errors('Error exporting transactions')
+def export_transactions():
+    """
+    Stream the user's transactions as NDJSON (default) or CSV
+    (`?format=csv`). Optional `start_date`, `end_date` (YYYY-MM-DD) and
+    repeated `account_id` query parameters narrow the export.
+    """
+    user_model = current_app.user_model
+    sync_controller = current_app.sync_controller
+    transaction_controller = current_app.transaction_controller
+
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+
+    try:
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        start_date = datetime.strptime(
+            start_date, "%Y-%m-%d").date() if start_date else None
+        end_date = datetime.strptime(
+            end_date, "%Y-%m-%d").date() if end_date else None
+    except ValueError:
+        return jsonify({'error': 'Dates must be formatted as YYYY-MM-DD'}), 400
+
+    # Retrieve user from DynamoDB
+    user = user_model.get_user(request.user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    if not user.get('access_token'):
+        return jsonify({'error': 'No linked bank account for this user'}), 400
 
-    except Exception as e:
-        return jsonify({'error': f"Error fetching expense categories: {str(e)}"}), 500
+    # Bring the store up to date before streaming from it
+    sync_controller.ensure_synced(user)
+
+    rows = transaction_controller.export_transactions(
+        user['user_id'], start_date=start_date, end_date=end_date,
+        account_ids=request.args.getlist('account_id'))
+
+    if export_format == 'csv':
+        return csv_response(rows, EXPORT_FIELDS, filename="transactions.csv")
+    return ndjson_response(rows)
 
 
 @plaid_bp.route('/get_account_details', methods=['POST'])
 @requires_auth
+@plaid_errors('Error fetching account details')
 def get_account_details():
     """
     Fetch details of a specific account and its transactions, highlighting recurring ones.
     """
-    plaid_client = current_app.plaid_client
-    user_model = UserModel(current_app.dynamodb)
-    plaid_controller = PlaidController(plaid_client)
+    user_model = current_app.user_model
+    plaid_controller = current_app.plaid_controller
+    async_plaid_controller = current_app.async_plaid_controller
+    sync_controller = current_app.sync_controller
+    response_cache = current_app.response_cache
 
     # Get request data
     data = request.json
-    user_id = data.get('user_id')
+    user_id = data.get('user_id', request.user_id)
     account_id = data.get('account_id')
 
     if not user_id or not account_id:
         return jsonify({'error': 'User ID and Account ID are required'}), 400
 
-    try:
-        # Retrieve user from DynamoDB
-        user = user_model.get_user(user_id)
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+    # Retrieve user from DynamoDB
+    user = user_model.get_user(user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    access_token = user.get('access_token')
+    if not access_token:
+        return jsonify({'error': 'No linked bank account for this user'}), 400
+
+    end_date = datetime.now().date()
+
+    def fetch_details():
+        # Fetch the account details and read the last 90 days for this
+        # account concurrently; neither depends on the other
+        account_details, transactions = async_plaid_controller.run(
+            async_plaid_controller.gather(
+                async_plaid_controller.get_account_details(
+                    access_token, account_id),
+                async_plaid_controller.call(
+                    sync_controller.get_transactions, user,
+                    start_date=end_date - timedelta(days=90), end_date=end_date,
+                    account_id=account_id)
+            )
+        )
+        return {
+            "message": "Account details and transactions fetched successfully",
+            "account_details": account_details,
+            "transactions": transactions,
+            "recurring_transactions": plaid_controller.identify_recurring_transactions(
+                transactions)
+        }
 
-        access_token = user.get('access_token')
-        if not access_token:
-            return jsonify({'error': 'No linked bank account for this user'}), 400
+    payload = response_cache.get_or_compute(
+        cache_scope(user), 'get_account_details',
+        {"account_id": account_id, "end_date": end_date}, fetch_details,
+        end_date=end_date)
+    return jsonify(payload), 200
 
-        # Fetch account details
-        account_details = plaid_controller.get_account_details(
-            access_token, account_id)
 
-        # Fetch transactions and identify recurring ones
-        transactions_data = plaid_controller.get_transactions_for_account(
-            access_token, account_id)
+@plaid_bp.route('/dashboard', methods=['POST'])
+@requires_auth
+@plaid_errors('Error fetching dashboard')
+def get_dashboard():
+    """
+    Fetch everything the dashboard shows from a single read of the user's
+    transactions: income/expense summary, monthly summary, previous month's
+    expense categories and recurring transactions per account.
+    """
+    user_model = current_app.user_model
+    plaid_controller = current_app.plaid_controller
+    sync_controller = current_app.sync_controller
+    response_cache = current_app.response_cache
 
-        return jsonify({
-            "message": "Account details and transactions fetched successfully",
-            "account_details": account_details,
-            "transactions": transactions_data["transactions"],
-            "recurring_transactions": transactions_data["recurring_transactions"]
-        }), 200
+    data = request.json
+    user_id = data.get('user_id', request.user_id)
+
+    if not user_id:
+        return jsonify({'error': 'User ID is required'}), 400
+
+    # Retrieve user from DynamoDB
+    user = user_model.get_user(user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    if not user.get('access_token'):
+        return jsonify({'error': 'No linked bank account for this user'}), 400
+
+    # One read covering every widget's date window
+    today = date.today()
+    start_date, end_date = dashboard_range(today)
+
+    def build():
+        transactions = sync_controller.get_transactions(
+            user, start_date=start_date, end_date=end_date)
+        return {
+            "message": "Dashboard fetched successfully",
+            **plaid_controller.build_dashboard(transactions, today=today)
+        }
+
+    payload = response_cache.get_or_compute(
+        cache_scope(user), 'dashboard', {"today": today}, build,
+        end_date=end_date)
+    return jsonify(payload), 200
+
+
+@plaid_bp.route('/transactions/sync', methods=['POST'])
+@requires_auth
+@plaid_errors('Error syncing transactions')
+def sync_transactions():
+    """
+    Pull the latest transaction changes from Plaid into the local store.
+    """
+    user_model = current_app.user_model
+    plaid_controller = current_app.plaid_controller
+    sync_controller = current_app.sync_controller
+
+    data = request.json
+    user_id = data.get('user_id', request.user_id)
+
+    if not user_id:
+        return jsonify({'error': 'User ID is required'}), 400
 
-    except Exception as e:
-        return jsonify({'error': f"Error fetching account details: {str(e)}"}), 500
+    # Retrieve user from DynamoDB
+    user = user_model.get_user(user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    if not user.get('access_token'):
+        return jsonify({'error': 'No linked bank account for this user'}), 400
+
+    counts = sync_controller.sync_user(user)
+
+    return jsonify({
+        "message": "Transactions synced successfully",
+        **counts
+    }), 200
 
 
 @plaid_bp.route("/liabilities", methods=["POST"])
 @requires_auth
+@plaid_errors('Error fetching liabilities')
 def get_liabilities():
     """
     Fetch liabilities data for the user's accounts.
     Includes credit cards, mortgage, and student loans.
     """
-    plaid_client = current_app.plaid_client
-    user_model = UserModel(current_app.dynamodb)
-    plaid_controller = PlaidController(plaid_client)
+    user_model = current_app.user_model
+    plaid_controller = current_app.plaid_controller
+    response_cache = current_app.response_cache
 
     # Retrieve request body data
     data = request.json
-    user_id = data.get("user_id")
+    user_id = data.get("user_id", request.user_id)
 
     if not user_id:
         return jsonify({"error": "User ID is required"}), 400
 
+    # Fetch user from database
+    user = user_model.get_user(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    access_token = user.get("access_token")
+    if not access_token:
+        return jsonify({"error": "No linked bank account for this user"}), 400
+
+    # Fetch liabilities from Plaid
+    def fetch_liabilities():
+        return {
+            "message": "Liabilities fetched successfully",
+            "liabilities": plaid_controller.get_liabilities(access_token)
+        }
+
+    payload = response_cache.get_or_compute(
+        cache_scope(user), 'liabilities', {}, fetch_liabilities)
+    return jsonify(payload), 200
+
+
+@plaid_bp.route('/webhook', methods=['POST'])
+def plaid_webhook():
+    """
+    Receive a Plaid webhook, verify its signature and queue it as a
+    background job. Plaid only needs a quick 200.
+    """
+    webhook_verifier = current_app.webhook_verifier
+    webhook_controller = current_app.webhook_controller
+    job_controller = current_app.job_controller
+
+    # The signature covers the raw body, so read it before parsing
+    body = request.get_data()
     try:
-        # Fetch user from database
-        user = user_model.get_user(user_id)
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        webhook_verifier.verify(body, request.headers.get('Plaid-Verification'))
+    except WebhookVerificationError as e:
+        return jsonify({'error': str(e)}), 401
 
-        access_token = user.get("access_token")
-        if not access_token:
-            return jsonify({"error": "No linked bank account for this user"}), 400
+    event = request.get_json(silent=True)
+    if not isinstance(event, dict) or not event.get('item_id'):
+        return jsonify({'error': 'Invalid webhook payload'}), 400
 
-        # Fetch liabilities from Plaid
-        liabilities = plaid_controller.get_liabilities(access_token)
+    if not webhook_controller.should_handle(event):
+        return jsonify({'message': 'Webhook ignored'}), 200
 
-        return jsonify({
-            "message": "Liabilities fetched successfully",
-            "liabilities": liabilities
-        }), 200
+    try:
+        job = job_controller.enqueue_webhook(event)
+    except QueueFullError as e:
+        # Plaid retries webhooks that do not get a 200
+        return jsonify({'error': str(e)}), 503
+
+    return jsonify({'message': 'Webhook queued', 'job_id': job['job_id']}), 200
 
-    except Exception as e:
-        return jsonify({"error": f"Error fetching liabilities: {str(e)}"}), 500
+
+@plaid_bp.route('/scheduler/metrics', methods=['GET'])
+@requires_metrics_token
+def get_scheduler_metrics():
+    """
+    Per-endpoint Plaid call counts, throttling and queueing delay.
+    """
+    return jsonify(current_app.plaid_scheduler.metrics()), 200
@@ -0,0 +1,61 @@
+from functools import wraps
+from flask import Blueprint, request, jsonify, current_app, send_file
+from ..utils.request_profiler import PROFILE_FILES
+
+profile_bp = Blueprint('profile_bp', __name__)
+
+# Content types of the stored profile formats
+PROFILE_MIMETYPES = {
+    'collapsed': 'text/plain; charset=utf-8',
+    'pstats': 'application/octet-stream',
+    'text': 'text/plain; charset=utf-8'
+}
+
+
+def requires_profiler_secret(f):
+    """
+    Require `Authorization: Bearer <PROFILER_SECRET>`. The endpoints do not
+    exist (404) while PROFILER_SECRET is unset.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        profiler = current_app.request_profiler
+        if not profiler.secret:
+            return jsonify({'error': 'Profiling is disabled'}), 404
+        auth_header = request.headers.get('Authorization', '')
+        token = auth_header.split(' ', 1)[1] if auth_header.startswith('Bearer ') else None
+        if not profiler.is_admin(token):
+            return jsonify({'error': 'Invalid profiler secret'}), 401
+        return f(*args, **kwargs)
+    return decorated
+
+
+@profile_bp.route('', methods=['GET'])
+@requires_profiler_secret
+def list_profiles():
+    """
+    Metadata of the stored profiles, newest first.
+    """
+    return jsonify({'profiles': current_app.request_profiler.store.list()}), 200
+
+
+@profile_bp.route('/<profile_id>', methods=['GET'])
+@requires_profiler_secret
+def get_profile(profile_id):
+    profile = current_app.request_profiler.store.get(profile_id)
+    if not profile:
+        return jsonify({'error': 'Profile not found'}), 404
+    return jsonify(profile), 200
+
+
+@profile_bp.route('/<profile_id>/<kind>', methods=['GET'])
+@requires_profiler_secret
+def download_profile(profile_id, kind):
+    """
+    Download a profile as collapsed stacks, a pstats dump or a text report.
+    """
+    path = current_app.request_profiler.store.file_path(profile_id, kind)
+    if not path:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(path, mimetype=PROFILE_MIMETYPES[kind], as_attachment=True,
+                     download_name=profile_id + PROFILE_FILES[kind])
@@ -1,24 +1,54 @@
 from flask import Blueprint, request, jsonify, current_app
-from ..models.subscription_model import SubscriptionModel
-from ..controllers.subscription_controller import SubscriptionController
+from ..utils.auth import requires_auth
+from ..utils.http_pagination import page_args, wants_ndjson, ndjson_response
 
 subscription_bp = Blueprint('subscription_bp', __name__)
-subscription_model = SubscriptionModel(current_app.dynamodb)
-subscription_controller = SubscriptionController(subscription_model)
+
+
+@subscription_bp.before_request
+def setup_controller():
+    """
+    Point `subscription_controller` at the app's shared instance for this request.
+    """
+    global subscription_controller
+    subscription_controller = current_app.subscription_controller
 
 
 @subscription_bp.route('/', methods=['POST'])
+@requires_auth
 def add_subscription():
-    data = request.json
-    return subscription_controller.add_subscription(data)
+    """
+    Add a subscription for the authenticated user.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data.get('subscription_id'):
+        return jsonify({'error': 'Subscription ID is required'}), 400
+    return subscription_controller.add_subscription({**data, 'user_id': request.user_id})
 
 
 @subscription_bp.route('/', methods=['GET'])
+@requires_auth
 def get_subscriptions():
-    user_id = request.args.get('user_id')
-    return subscription_controller.get_subscriptions(user_id)
+    """
+    Cursor-paginated list of the authenticated user's subscriptions, or a
+    full NDJSON export.
+    """
+    user_id = request.user_id
+
+    if wants_ndjson():
+        return ndjson_response(subscription_controller.iter_subscriptions(user_id))
+
+    try:
+        limit, page_token = page_args()
+        return subscription_controller.get_subscriptions(user_id, limit, page_token)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 
 @subscription_bp.route('/<string:subscription_id>', methods=['DELETE'])
+@requires_auth
 def delete_subscription(subscription_id):
-    return subscription_controller.delete_subscription(subscription_id)
+    """
+    Delete one of the authenticated user's subscriptions.
+    """
+    return subscription_controller.delete_subscription(request.user_id, subscription_id)
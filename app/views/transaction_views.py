@@ -1,19 +1,100 @@
+import json
+from decimal import Decimal
 from flask import Blueprint, request, jsonify, current_app
-from ..models.transaction_model import TransactionModel
-from ..controllers.transaction_controller import TransactionController
+from ..utils.auth import requires_auth
+from ..controllers.sync_controller import BulkImportError
+from ..utils.batch_writer import BatchWriteError
+from ..utils.http_pagination import page_args, wants_ndjson, ndjson_response
 
 transaction_bp = Blueprint('transaction_bp', __name__)
-transaction_model = TransactionModel(current_app.dynamodb)
-transaction_controller = TransactionController(transaction_model)
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
+
+
+@transaction_bp.before_request
+def setup_controller():
+    """
+    Point `transaction_controller` at the app's shared instance for this request.
+    """
+    global transaction_controller
+    transaction_controller = current_app.transaction_controller
 
 
 @transaction_bp.route('/', methods=['POST'])
+@requires_auth
 def add_transaction():
-    data = request.json
-    return transaction_controller.add_transaction(data)
+    """
+    Add one transaction for the authenticated user.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    return import_transactions([data], "Transaction added successfully")
 
 
 @transaction_bp.route('/', methods=['GET'])
+@requires_auth
 def get_transactions():
-    user_id = request.args.get('user_id')
-    return transaction_controller.get_transactions(user_id)
+    """
+    Cursor-paginated list of the authenticated user's transactions, or a
+    full NDJSON export.
+    """
+    user_id = request.user_id
+
+    if wants_ndjson():
+        return ndjson_response(transaction_controller.iter_transactions(user_id))
+
+    try:
+        limit, page_token = page_args()
+        return transaction_controller.get_transactions(user_id, limit, page_token)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+def iter_bulk_transactions():
+    """
+    Yield transactions from a JSON array body, or line by line from an
+    NDJSON body so large imports are never fully buffered.
+    Amounts are parsed as Decimal, which DynamoDB requires.
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        for line in request.stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line, parse_float=Decimal)
+        return
+
+    transactions = json.loads(request.get_data(), parse_float=Decimal)
+    if not isinstance(transactions, list):
+        raise ValueError("Expected a JSON array of transactions")
+    yield from transactions
+
+
+@transaction_bp.route('/bulk', methods=['POST'])
+@requires_auth
+def add_transactions_bulk():
+    """
+    Import many transactions at once for the authenticated user.
+    Accepts a JSON array or NDJSON (one transaction per line).
+    """
+    return import_transactions(iter_bulk_transactions(), "Transactions imported successfully")
+
+
+def import_transactions(transactions, message):
+    """
+    Store transactions for the authenticated user the way a sync does, so
+    rollups, detected subscriptions and cached responses stay in step.
+    """
+    user = current_app.user_model.get_user(request.user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    try:
+        written = current_app.sync_controller.import_transactions(
+            user, transactions, workers=current_app.config['BULK_WRITE_WORKERS'])
+    except BulkImportError as e:
+        # Chunks before the invalid row are already stored
+        return jsonify({'error': f"Invalid transactions: {str(e)}", 'written': e.written}), 400
+    except BatchWriteError as e:
+        return jsonify({'error': f"Error importing transactions: {str(e)}"}), 500
+    return jsonify({"message": message, "written": written}), 201
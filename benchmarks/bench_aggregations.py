@@ -0,0 +1,240 @@
+"""
+Time and memory per row of PlaidController's aggregation paths.
+
+    python -m benchmarks.bench_aggregations [--sizes 100,1000,10000,100000,1000000]
+        [--repeat 5] [--input records|dicts] [--only summary,recurring]
+        [--output FILE] [--compare BASELINE --tolerance 0.25]
+
+Feeds synthetic transaction lists of each size to the functions behind
+the summary (`summarize_transactions`, the work behind
+/plaid/transactions/summary), monthly summary (`summarize_monthly`),
+previous month expenses (`summarize_expense_categories`),
+`identify_recurring_transactions` and `build_dashboard`. For every size it
+reports the median time, time per row and, from a separate tracemalloc
+run, the peak memory allocated and the memory still held afterwards. The
+scaling exponent is the log-log slope of time against rows between the
+two largest sizes: ~1.0 is linear, noticeably more means a path has gone
+superlinear.
+
+`--input records` (the default) passes the slotted records the Plaid
+client path produces; `dicts` passes plain dicts as read from DynamoDB.
+`--compare` checks the results against an earlier `--output` file and
+exits non-zero when any function got more than `--tolerance` slower per
+row at any size.
+"""
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from app.controllers.plaid_controller import PlaidController
+from app.utils.transaction_record import Transaction
+from benchmarks.fake_plaid import MERCHANTS, SUBSCRIPTIONS
+from benchmarks.bench_endpoints import git_commit
+
+TODAY = date(2024, 6, 15)
+
+
+def synthetic_transactions(count, days=730, accounts=3, seed=7, as_dicts=False):
+    """
+    `count` transactions spread evenly over the `days` before TODAY, newest
+    first, mixing card spend, payroll and fixed-amount subscriptions.
+    """
+    rng = random.Random(seed)
+    transactions = []
+    for number in range(count):
+        txn_date = TODAY - timedelta(days=number * days // max(1, count))
+        if number % 40 < len(SUBSCRIPTIONS):
+            name, category, amount = SUBSCRIPTIONS[number % 40]
+        elif number % 15 == 0:
+            name, category, amount = "Gusto Payroll", ["Transfer", "Payroll"], -round(
+                rng.uniform(1800, 3200), 2)
+        else:
+            name, category, low, high = MERCHANTS[rng.randrange(len(MERCHANTS))]
+            amount = round(rng.uniform(low, high), 2)
+        txn = Transaction(
+            f"txn-{number:07d}", account_id=f"acc-{rng.randrange(accounts)}", amount=amount,
+            date=txn_date, name=name, merchant_name=name, category=list(category))
+        if as_dicts:
+            txn = {**txn.to_dict(), 'date': txn_date.isoformat()}
+        transactions.append(txn)
+    return transactions
+
+
+def aggregations(controller):
+    """
+    Benchmarked functions by name; each takes the transaction list.
+    """
+    return {
+        'summary': controller.summarize_transactions,
+        'monthly_summary': controller.summarize_monthly,
+        'previous_month_expenses': controller.summarize_expense_categories,
+        'recurring': controller.identify_recurring_transactions,
+        'dashboard': lambda transactions: controller.build_dashboard(transactions, today=TODAY)
+    }
+
+
+def time_call(fn, transactions, repeat):
+    """
+    Median wall time of `fn(transactions)`, with the GC paused as in timeit.
+    """
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn(transactions)
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return statistics.median(timings)
+
+
+def trace_call(fn, transactions):
+    """
+    Bytes allocated at the peak of `fn(transactions)` and bytes still held
+    once its result is dropped, both relative to before the call.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = fn(transactions)
+        peak = tracemalloc.get_traced_memory()[1]
+        del result
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return peak - baseline, max(0, retained - baseline)
+
+
+def scaling_exponent(points):
+    """
+    Log-log slope of seconds against rows between the two largest sizes.
+    """
+    if len(points) < 2:
+        return None
+    (rows_a, seconds_a), (rows_b, seconds_b) = points[-2], points[-1]
+    if seconds_a <= 0 or seconds_b <= 0:
+        return None
+    return round(math.log(seconds_b / seconds_a) / math.log(rows_b / rows_a), 3)
+
+
+def run(sizes, repeat, as_dicts, only):
+    controller = PlaidController(plaid_client=None)
+    functions = {name: fn for name, fn in aggregations(controller).items()
+                 if not only or any(part in name for part in only)}
+    results = {name: {'sizes': []} for name in functions}
+
+    for size in sizes:
+        transactions = synthetic_transactions(size, as_dicts=as_dicts)
+        # Fewer timed runs on the largest inputs keep a 1M-row run tractable
+        runs = max(1, min(repeat, repeat * 10000 // size)) if size > 10000 else repeat
+        for name, fn in functions.items():
+            print(f"{name} x {size} ...", file=sys.stderr)
+            fn(transactions)  # warm-up
+            seconds = time_call(fn, transactions, runs)
+            peak, retained = trace_call(fn, transactions)
+            results[name]['sizes'].append({
+                'rows': size,
+                'runs': runs,
+                'seconds': round(seconds, 6),
+                'ns_per_row': round(seconds * 1e9 / size, 1),
+                'peak_alloc_bytes': peak,
+                'peak_alloc_bytes_per_row': round(peak / size, 1),
+                'retained_bytes': retained
+            })
+        del transactions
+
+    for name, result in results.items():
+        result['scaling_exponent'] = scaling_exponent(
+            [(point['rows'], point['seconds']) for point in result['sizes']])
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return (function, rows, ratio) for every size that got slower per row
+    than `baseline` by more than `tolerance`.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = {point['rows']: point for point in
+                    baseline.get('functions', {}).get(name, {}).get('sizes', [])}
+        for point in result['sizes']:
+            before = previous.get(point['rows'])
+            if not before or not before['ns_per_row']:
+                continue
+            ratio = point['ns_per_row'] / before['ns_per_row']
+            if ratio > 1 + tolerance:
+                regressions.append((name, point['rows'], round(ratio, 2)))
+    return regressions
+
+
+def print_report(results):
+    header = (f"{'function':<24} {'rows':>8} {'median ms':>10} {'ns/row':>9} "
+              f"{'peak KiB':>10} {'B/row':>7} {'kept KiB':>9}")
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        for point in result['sizes']:
+            print(f"{name:<24} {point['rows']:>8} {point['seconds'] * 1000:>10.2f} "
+                  f"{point['ns_per_row']:>9.0f} {point['peak_alloc_bytes'] / 1024:>10.1f} "
+                  f"{point['peak_alloc_bytes_per_row']:>7.0f} "
+                  f"{point['retained_bytes'] / 1024:>9.1f}")
+        print(f"{name:<24} scaling exponent: {result['scaling_exponent']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000,100000,1000000",
+                        help="comma-separated transaction counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--input", choices=["records", "dicts"], default="records")
+    parser.add_argument("--only", default=None,
+                        help="comma-separated substrings selecting which functions to run")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="results JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed per-row slowdown against --compare (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    only = [part.strip() for part in (args.only or '').split(',') if part.strip()]
+    results = run(sizes, args.repeat, args.input == "dicts", only)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'commit': git_commit(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'options': {'sizes': sizes, 'repeat': args.repeat, 'input': args.input},
+                'functions': results
+            }, output, indent=2)
+        print(f"wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for name, rows, ratio in regressions:
+            print(f"REGRESSION {name} at {rows} rows: {ratio}x slower per row")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
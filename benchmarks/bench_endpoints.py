@@ -0,0 +1,559 @@
+"""
+End-to-end throughput of every /plaid/* and /auth/* endpoint.
+
+    python -m benchmarks.bench_endpoints [--transactions 1000] [--users 8]
+        [--concurrency 8] [--requests 200] [--plaid-latency 0.05]
+        [--dynamodb-endpoint URL] [--endpoints dashboard,auth] [--output FILE]
+
+Runs `create_app()` behind Werkzeug's threaded server (as `run.py` does)
+in its own process, wired to local stand-ins: benchmarks.fake_plaid for
+Plaid and benchmarks.fake_cognito for Cognito, both in a second process,
+and a DynamoDB-compatible server at `--dynamodb-endpoint` (DynamoDB Local
+or `moto_server`). Without an endpoint, moto's server is started when moto
+is installed. The tables are created if missing.
+
+`--users` users are registered, logged in, linked to a Plaid item with
+`--transactions` transactions and synced; then each endpoint is driven
+by `--concurrency` client threads for `--requests` requests. The report
+gives req/s, p50/p95/p99 latency, status codes and the app process's peak
+RSS while the endpoint ran. Cached endpoints are measured warm, and the
+app's own Plaid rate limits stay on, so throttled calls show up as 429s.
+`--output` writes the results as JSON, tagged with the git commit, for
+comparing runs across commits.
+"""
+import argparse
+import hashlib
+import http.client
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from urllib.parse import urlencode
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from benchmarks.fake_cognito import generate_signing_key
+
+REGION = "us-east-1"
+USER_POOL_ID = "us-east-1_bench"
+APP_CLIENT_ID = "bench-client"
+APP_CLIENT_SECRET = "bench-client-secret"
+PASSWORD = "Bench-Passw0rd!"
+METRICS_TOKEN = "bench-metrics-token"
+WEBHOOK_KEY_ID = "bench-webhook-key"
+
+# (table, key schema, global secondary indexes), matching the models
+TABLES = [
+    ('spend-wise-users', [('user_id', 'HASH')],
+     {'item_id-index': [('item_id', 'HASH')]}),
+    ('SpendWiseTransactions', [('user_id', 'HASH'), ('transaction_id', 'RANGE')],
+     {'user_id-date-index': [('user_id', 'HASH'), ('date', 'RANGE')]}),
+    ('SpendWiseRollups', [('user_id', 'HASH'), ('month', 'RANGE')], {}),
+    ('SpendWiseBudgets', [('user_id', 'HASH'), ('category', 'RANGE')], {}),
+    ('SpendWiseSubscriptions', [('user_id', 'HASH'), ('subscription_id', 'RANGE')], {}),
+    # Only read when JOB_STORE_TABLE is set
+    ('SpendWiseJobs', [('job_id', 'HASH')], {})
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def rss_bytes(pid, field='VmRSS'):
+    """
+    Current (VmRSS) or peak (VmHWM) resident set size of `pid`, or None
+    where /proc is unavailable.
+    """
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+# Child processes. They are started with "spawn", so the app reads its
+# configuration from the environment set here rather than the parent's
+
+def _run_stand_ins(conn, options, signing_key_pem, webhook_jwk):
+    from benchmarks.fake_plaid import FakePlaid, serve_fake_plaid
+    from benchmarks.fake_cognito import FakeCognito, TokenMinter, serve_fake_cognito
+
+    signing_key = serialization.load_pem_private_key(signing_key_pem, password=None)
+    plaid = FakePlaid(transactions_per_item=options['transactions'], days=options['days'],
+                      latency=options['plaid_latency'], jitter=options['plaid_jitter'],
+                      webhook_jwk=webhook_jwk)
+    cognito = FakeCognito(TokenMinter(signing_key, REGION, USER_POOL_ID, APP_CLIENT_ID))
+    plaid_server = serve_fake_plaid(plaid)
+    cognito_server = serve_fake_cognito(cognito)
+    conn.send((plaid_server.server_port, cognito_server.server_port))
+    # Serve until the parent asks for the Plaid call counts and exits
+    conn.recv()
+    conn.send(dict(plaid.counts))
+
+
+def _run_moto(port):
+    from moto.server import ThreadedMotoServer
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = ThreadedMotoServer(ip_address='127.0.0.1', port=port, verbose=False)
+    server.start()
+    threading.Event().wait()
+
+
+def _run_app(conn, environ):
+    os.environ.update(environ)
+    # Drop request logs and the controllers' prints; they would dominate the output
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    sys.stdout = open(os.devnull, 'w')
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    app = create_app()
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    conn.send(server.server_port)
+    server.serve_forever()
+
+
+def start_process(target, *args):
+    context = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = context.Pipe()
+    process = context.Process(target=target, args=(child_conn, *args), daemon=True)
+    process.start()
+    return process, parent_conn
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise Exception(f"Nothing is listening on port {port}")
+
+
+def create_tables(endpoint_url):
+    import boto3
+    dynamodb = boto3.resource('dynamodb', region_name=REGION, endpoint_url=endpoint_url,
+                              aws_access_key_id='bench', aws_secret_access_key='bench')
+    existing = set(dynamodb.meta.client.list_tables()['TableNames'])
+    for name, key_schema, indexes in TABLES:
+        if name in existing:
+            continue
+        attributes = {attr for attr, _ in key_schema}
+        attributes.update(attr for schema in indexes.values() for attr, _ in schema)
+        table_args = {
+            'TableName': name,
+            'KeySchema': [{'AttributeName': attr, 'KeyType': kind} for attr, kind in key_schema],
+            'AttributeDefinitions': [{'AttributeName': attr, 'AttributeType': 'S'}
+                                     for attr in sorted(attributes)],
+            'BillingMode': 'PAY_PER_REQUEST'
+        }
+        if indexes:
+            table_args['GlobalSecondaryIndexes'] = [{
+                'IndexName': index,
+                'KeySchema': [{'AttributeName': attr, 'KeyType': kind} for attr, kind in schema],
+                'Projection': {'ProjectionType': 'ALL'}
+            } for index, schema in indexes.items()]
+        dynamodb.create_table(**table_args).wait_until_exists()
+
+
+class Client:
+    """
+    One keep-alive HTTP connection to the app.
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.conn = None
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Return `(status, response body)`.
+        """
+        headers = dict(headers or {})
+        payload = body
+        if body is not None:
+            # Bytes are sent as is (e.g. a signed webhook body)
+            if not isinstance(body, bytes):
+                payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=300)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                # The server may close idle keep-alive connections; reconnect once
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+    def json(self, method, path, body=None, headers=None, expect=200):
+        status, data = self.request(method, path, body, headers)
+        if status != expect:
+            raise Exception(f"{method} {path} returned {status}: {data[:200]!r}")
+        return json.loads(data)
+
+
+class Bench:
+    """
+    Sets up users and items, then runs each endpoint scenario.
+    """
+
+    def __init__(self, args, app_port, app_pid, webhook_key):
+        self.args = args
+        self.app_port = app_port
+        self.app_pid = app_pid
+        self.webhook_key = webhook_key
+        self.run_id = uuid.uuid4().hex[:8]
+        self.users = []
+        self.link_users = []
+
+    def register(self, client, name, last_name):
+        email = f"bench-{self.run_id}-{name}@example.com"
+        client.json('POST', '/auth/register', {
+            'email': email, 'password': PASSWORD,
+            'first_name': 'Bench', 'last_name': last_name}, expect=201)
+        login = client.json('POST', '/auth/login', {'email': email, 'password': PASSWORD})
+        return email, login, {'Authorization': f"Bearer {login['access_token']}"}
+
+    def setup_users(self):
+        client = Client(self.app_port)
+        for i in range(self.args.users):
+            email, login, headers = self.register(client, i, f"User {i}")
+            linked = client.json('POST', '/plaid/exchange_public_token', {
+                'public_token': f"public-bench-{i}"}, headers=headers)
+            self.users.append({
+                'email': email,
+                'user_id': login['user_id'],
+                'item_id': linked['item_id'],
+                'account_id': f"acc-bench-{i}-0",
+                'headers': headers
+            })
+        # Throwaway users for the link scenario, so the benchmark users
+        # keep their items and sync state
+        for i in range(self.args.concurrency):
+            self.link_users.append(self.register(client, f"link-{i}", f"Link {i}")[2])
+
+    def initial_sync(self):
+        """
+        Pull every item's full history into the store, one thread per user.
+        """
+        def sync(user):
+            Client(self.app_port).json('POST', '/plaid/transactions/sync', {},
+                                       headers=user['headers'])
+
+        threads = [threading.Thread(target=sync, args=(user,)) for user in self.users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def scenarios(self):
+        """
+        `(name, build)` pairs; `build(n)` returns the n-th request as
+        `(method, path, body, headers)`.
+        """
+        today = date.today()
+        summary_window = {'start_date': (today - timedelta(days=90)).isoformat(),
+                          'end_date': today.isoformat()}
+
+        def user(n):
+            return self.users[n % len(self.users)]
+
+        def authed(method, path, body=None):
+            return lambda n: (method, path, body, user(n)['headers'])
+
+        return [
+            ('POST /auth/register', lambda n: ('POST', '/auth/register', {
+                'email': f"bench-{self.run_id}-load-{n}@example.com", 'password': PASSWORD,
+                'first_name': 'Load', 'last_name': str(n)}, None)),
+            ('POST /auth/login', lambda n: ('POST', '/auth/login', {
+                'email': user(n)['email'], 'password': PASSWORD}, None)),
+            # Each sign-out revokes its token, so sign in first for a fresh one
+            ('POST /auth/sign_out', self._sign_out_request),
+            ('POST /plaid/create_link_token', authed('POST', '/plaid/create_link_token', {})),
+            ('POST /plaid/exchange_public_token', lambda n: (
+                'POST', '/plaid/exchange_public_token', {
+                    'public_token': f"public-bench-{self.args.users + n}"},
+                self.link_users[n % len(self.link_users)])),
+            ('POST /plaid/get_user_bank_info', authed('POST', '/plaid/get_user_bank_info', {})),
+            ('POST /plaid/transactions/sync', authed('POST', '/plaid/transactions/sync', {})),
+            ('POST /plaid/transactions/summary',
+             authed('POST', '/plaid/transactions/summary', summary_window)),
+            ('POST /plaid/transactions/monthly-summary',
+             authed('POST', '/plaid/transactions/monthly-summary', {})),
+            ('POST /plaid/transactions/expense-categories',
+             authed('POST', '/plaid/transactions/expense-categories', {})),
+            ('GET /plaid/transactions/export',
+             authed('GET', '/plaid/transactions/export?' + urlencode({'format': 'ndjson'}))),
+            ('POST /plaid/get_account_details', lambda n: (
+                'POST', '/plaid/get_account_details', {'account_id': user(n)['account_id']},
+                user(n)['headers'])),
+            ('POST /plaid/dashboard', authed('POST', '/plaid/dashboard', {})),
+            ('POST /plaid/liabilities', authed('POST', '/plaid/liabilities', {})),
+            ('POST /plaid/webhook', self._webhook_request),
+            ('GET /plaid/scheduler/metrics', lambda n: (
+                'GET', '/plaid/scheduler/metrics', None,
+                {'Authorization': f"Bearer {METRICS_TOKEN}"}))
+        ]
+
+    def run(self, name, build):
+        counter = itertools.count()
+        latencies = []
+        statuses = Counter()
+        lock = threading.Lock()
+        peak_rss = [rss_bytes(self.app_pid)]
+        done = threading.Event()
+
+        def sample_rss():
+            while not done.wait(0.02):
+                rss = rss_bytes(self.app_pid)
+                if rss is not None:
+                    peak_rss[0] = max(peak_rss[0] or 0, rss)
+
+        def worker():
+            client = Client(self.app_port)
+            while True:
+                n = next(counter)
+                if n >= self.args.requests:
+                    return
+                method, path, body, headers = build(n)
+                started = time.perf_counter()
+                try:
+                    status, _ = client.request(method, path, body, headers)
+                except Exception:
+                    status = 'connection_error'
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[status] += 1
+
+        sampler = threading.Thread(target=sample_rss, daemon=True)
+        sampler.start()
+        workers = [threading.Thread(target=worker) for _ in range(self.args.concurrency)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        done.set()
+        sampler.join()
+
+        ordered = sorted(latencies)
+        ok = sum(count for status, count in statuses.items()
+                 if isinstance(status, int) and status < 400)
+        return {
+            'endpoint': name,
+            'requests': len(latencies),
+            'errors': len(latencies) - ok,
+            'status_counts': {str(status): count for status, count in sorted(
+                statuses.items(), key=lambda entry: str(entry[0]))},
+            'seconds': round(elapsed, 3),
+            'req_per_sec': round(len(latencies) / elapsed, 2) if elapsed else None,
+            'latency_ms': {
+                'p50': _ms(percentile(ordered, 50)),
+                'p95': _ms(percentile(ordered, 95)),
+                'p99': _ms(percentile(ordered, 99)),
+                'mean': _ms(sum(ordered) / len(ordered)) if ordered else None,
+                'max': _ms(ordered[-1]) if ordered else None
+            },
+            'peak_rss_mb': _mb(peak_rss[0])
+        }
+
+    def _sign_out_request(self, n):
+        login = Client(self.app_port).json('POST', '/auth/login', {
+            'email': self.users[n % len(self.users)]['email'], 'password': PASSWORD})
+        return ('POST', '/auth/sign_out', None,
+                {'Authorization': f"Bearer {login['access_token']}"})
+
+    def _webhook_request(self, n):
+        event = {'webhook_type': 'TRANSACTIONS', 'webhook_code': 'SYNC_UPDATES_AVAILABLE',
+                 'item_id': self.users[n % len(self.users)]['item_id']}
+        body = json.dumps(event).encode('utf-8')
+        signature = jwt.encode(
+            {'iat': int(time.time()), 'request_body_sha256': hashlib.sha256(body).hexdigest()},
+            self.webhook_key, algorithm='ES256', headers={'kid': WEBHOOK_KEY_ID})
+        return ('POST', '/plaid/webhook', body, {'Plaid-Verification': signature})
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def _mb(size):
+    return round(size / (1024 * 1024), 1) if size is not None else None
+
+
+def webhook_jwk(private_key):
+    jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key()))
+    return {**jwk, 'alg': 'ES256', 'kid': WEBHOOK_KEY_ID, 'use': 'sig',
+            'created_at': int(time.time()), 'expired_at': None}
+
+
+def print_report(results):
+    header = (f"{'endpoint':<44} {'reqs':>5} {'errs':>5} {'req/s':>8} {'p50 ms':>8} "
+              f"{'p95 ms':>8} {'p99 ms':>8} {'rss MB':>7}")
+    print(header)
+    print('-' * len(header))
+    for result in results['endpoints']:
+        latency = result['latency_ms']
+        print(f"{result['endpoint']:<44} {result['requests']:>5} {result['errors']:>5} "
+              f"{result['req_per_sec'] or 0:>8.1f} {latency['p50'] or 0:>8.1f} "
+              f"{latency['p95'] or 0:>8.1f} {latency['p99'] or 0:>8.1f} "
+              f"{result['peak_rss_mb'] or 0:>7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=1000,
+                        help="transactions per Plaid item (e.g. 1000 to 100000)")
+    parser.add_argument("--days", type=int, default=730,
+                        help="days of history the transactions are spread over")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--plaid-latency", type=float, default=0.05,
+                        help="seconds added to every fake Plaid call")
+    parser.add_argument("--plaid-jitter", type=float, default=0.0,
+                        help="up to this many extra seconds per fake Plaid call")
+    parser.add_argument("--dynamodb-endpoint", default=os.getenv('AWS_ENDPOINT_URL_DYNAMODB'),
+                        help="DynamoDB-compatible endpoint, e.g. http://localhost:8000")
+    parser.add_argument("--endpoints", default=None,
+                        help="comma-separated substrings selecting which endpoints to run")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    processes = []
+    dynamodb_endpoint = args.dynamodb_endpoint
+    if not dynamodb_endpoint:
+        try:
+            import moto  # noqa: F401
+        except ImportError:
+            sys.exit("No --dynamodb-endpoint given and moto is not installed; start DynamoDB "
+                     "Local (docker run -p 8000:8000 amazon/dynamodb-local) and pass "
+                     "--dynamodb-endpoint http://localhost:8000")
+        port = free_port()
+        context = multiprocessing.get_context('spawn')
+        moto_process = context.Process(target=_run_moto, args=(port,), daemon=True)
+        moto_process.start()
+        processes.append(moto_process)
+        wait_for_port(port)
+        dynamodb_endpoint = f"http://127.0.0.1:{port}"
+
+    signing_key = generate_signing_key()
+    webhook_key = ec.generate_private_key(ec.SECP256R1())
+    signing_key_pem = signing_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption())
+
+    stand_ins, stand_ins_conn = start_process(
+        _run_stand_ins,
+        {'transactions': args.transactions, 'days': args.days,
+         'plaid_latency': args.plaid_latency, 'plaid_jitter': args.plaid_jitter},
+        signing_key_pem, webhook_jwk(webhook_key))
+    processes.append(stand_ins)
+    plaid_port, cognito_port = stand_ins_conn.recv()
+
+    create_tables(dynamodb_endpoint)
+
+    environ = {
+        'AWS_REGION': REGION,
+        'AWS_ACCESS_KEY_ID': 'bench',
+        'AWS_SECRET_ACCESS_KEY': 'bench',
+        'AWS_ENDPOINT_URL_DYNAMODB': dynamodb_endpoint,
+        'AWS_ENDPOINT_URL_COGNITO_IDENTITY_PROVIDER': f"http://127.0.0.1:{cognito_port}",
+        'COGNITO_USER_POOL_ID': USER_POOL_ID,
+        'COGNITO_APP_CLIENT_ID': APP_CLIENT_ID,
+        'COGNITO_APP_CLIENT_SECRET': APP_CLIENT_SECRET,
+        'COGNITO_JWKS_URL': f"http://127.0.0.1:{cognito_port}/.well-known/jwks.json",
+        'PLAID_HOST': f"http://127.0.0.1:{plaid_port}",
+        'PLAID_CLIENT_ID': 'bench',
+        'PLAID_SECRET': 'bench',
+        'JOB_STORE_TABLE': '',
+        'METRICS_TOKEN': METRICS_TOKEN
+    }
+    app_process, app_conn = start_process(_run_app, environ)
+    processes.append(app_process)
+    app_port = app_conn.recv()
+
+    try:
+        bench = Bench(args, app_port, app_process.pid, webhook_key)
+        started = time.perf_counter()
+        bench.setup_users()
+        linked = time.perf_counter()
+        bench.initial_sync()
+        synced = time.perf_counter()
+
+        selected = [part.strip() for part in (args.endpoints or '').split(',') if part.strip()]
+        endpoints = []
+        for name, build in bench.scenarios():
+            if selected and not any(part in name for part in selected):
+                continue
+            print(f"running {name} ...", file=sys.stderr)
+            endpoints.append(bench.run(name, build))
+
+        stand_ins_conn.send('counts')
+        results = {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'options': {key: value for key, value in vars(args).items() if key != 'output'},
+            'setup': {
+                'register_login_link_seconds': round(linked - started, 3),
+                'initial_sync_seconds': round(synced - linked, 3)
+            },
+            'endpoints': endpoints,
+            'app_peak_rss_mb': _mb(rss_bytes(app_process.pid, 'VmHWM')),
+            'plaid_calls': stand_ins_conn.recv()
+        }
+    finally:
+        for process in processes:
+            process.terminate()
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Compare the JSON providers on realistic response payloads.
+
+    python -m benchmarks.bench_json_provider [--transactions 5000] [--repeat 20]
+
+Builds a `/plaid/transactions/summary` response (income/expense details
+with `date` objects and floats, as Plaid's `to_dict()` returns them) and a
+`/plaid/liabilities` response, then times each provider's `response()`
+and reports the payload size.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from flask import Flask
+from app.utils.json_provider import StdlibJSONProvider, OrjsonProvider, orjson
+
+CATEGORIES = [["Food and Drink", "Restaurants"], ["Travel", "Airlines"], ["Shops"],
+              ["Transfer", "Payroll"], ["Service", "Subscription"], ["Recreation", "Gyms"]]
+MERCHANTS = ["Starbucks", "United Airlines", "Amazon", "Gusto", "Netflix", "Planet Fitness"]
+
+
+def summary_payload(count, seed=7):
+    rng = random.Random(seed)
+    start = date(2021, 1, 1)
+    income, expenses = [], []
+    for i in range(count):
+        index = rng.randrange(len(MERCHANTS))
+        amount = round(rng.uniform(-2500, 400), 2)
+        txn = {
+            "transaction_id": f"txn-{i:08d}",
+            "account_id": f"acc-{rng.randrange(4)}",
+            "date": start + timedelta(days=rng.randrange(1460)),
+            "authorized_date": start + timedelta(days=rng.randrange(1460)),
+            "name": MERCHANTS[index],
+            "merchant_name": MERCHANTS[index],
+            "amount": amount,
+            "iso_currency_code": "USD",
+            "category": CATEGORIES[index],
+            "category_id": f"{13005000 + index}",
+            "pending": False,
+            "payment_channel": rng.choice(["online", "in store"]),
+            "location": {"city": "San Francisco", "region": "CA", "postal_code": "94103",
+                         "lat": 37.7749, "lon": -122.4194},
+            "personal_finance_category": {"primary": "FOOD_AND_DRINK",
+                                          "detailed": "FOOD_AND_DRINK_COFFEE"}
+        }
+        (income if amount < 0 else expenses).append(txn)
+    return {
+        "message": "Transactions summary fetched successfully",
+        "income": round(-sum(txn["amount"] for txn in income), 2),
+        "expenses": round(sum(txn["amount"] for txn in expenses), 2),
+        "income_details": income,
+        "expense_details": expenses
+    }
+
+
+def liabilities_payload(accounts=25, seed=11):
+    rng = random.Random(seed)
+    credit = [{
+        "account_id": f"acc-credit-{i}",
+        "aprs": [{"apr_percentage": 15.24, "apr_type": "purchase_apr",
+                  "balance_subject_to_apr": round(rng.uniform(0, 5000), 2),
+                  "interest_charge_amount": round(rng.uniform(0, 90), 2)}],
+        "is_overdue": False,
+        "last_payment_amount": round(rng.uniform(50, 900), 2),
+        "last_payment_date": date(2024, 5, rng.randrange(1, 28)),
+        "last_statement_issue_date": date(2024, 5, 1),
+        "last_statement_balance": round(rng.uniform(100, 5000), 2),
+        "minimum_payment_amount": 20.0,
+        "next_payment_due_date": date(2024, 6, 15)
+    } for i in range(accounts)]
+    student = [{
+        "account_id": f"acc-student-{i}",
+        "account_number": "4277075694",
+        "disbursement_dates": [date(2016, 8, 24)],
+        "expected_payoff_date": date(2032, 7, 28),
+        "guarantor": "DEPT OF ED",
+        "interest_rate": {"percentage": 5.25, "type": "fixed"},
+        "last_payment_amount": 138.05,
+        "last_payment_date": date(2024, 5, 1),
+        "loan_status": {"end_date": date(2032, 7, 28), "type": "repayment"},
+        "origination_principal_amount": 25000.0,
+        "outstanding_interest_amount": 6227.36,
+        "repayment_plan": {"description": "Standard Repayment", "type": "standard"}
+    } for i in range(accounts // 5)]
+    return {
+        "message": "Liabilities fetched successfully",
+        "liabilities": {"accounts": [{"account_id": item["account_id"],
+                                      "balances": {"current": 410.0, "available": None}}
+                                     for item in credit],
+                        "liabilities": {"credit": credit, "student": student, "mortgage": []}}
+    }
+
+
+def bench(provider, payload, repeat):
+    """
+    Median time of `provider.response(payload)`, plus the body size.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = provider.response(payload)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(response.get_data())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = [("stdlib", StdlibJSONProvider(app))]
+    if orjson is not None:
+        providers.append(("orjson", OrjsonProvider(app)))
+    else:
+        print("orjson is not installed; only the stdlib provider is measured")
+
+    payloads = [
+        (f"transactions/summary ({args.transactions} txns)", summary_payload(args.transactions)),
+        ("liabilities", liabilities_payload())
+    ]
+
+    print(f"{'payload':<36} {'provider':<8} {'median ms':>10} {'bytes':>10} {'speedup':>8}")
+    with app.app_context():
+        for label, payload in payloads:
+            baseline = None
+            for name, provider in providers:
+                seconds, size = bench(provider, payload, args.repeat)
+                baseline = baseline or seconds
+                print(f"{label:<36} {name:<8} {seconds * 1000:>10.2f} {size:>10} "
+                      f"{baseline / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
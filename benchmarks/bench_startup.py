@@ -0,0 +1,168 @@
+"""
+Cold-start time of the app and where it goes.
+
+    python -m benchmarks.bench_startup [--runs 5] [--top 15] [--output FILE]
+        [--compare BASELINE --tolerance 0.25]
+
+Each run starts a fresh interpreter under `python -X importtime` that
+imports `app`, calls `create_app()` and then builds every lazily
+registered service with `warm_services()`, as the first requests to a new
+worker would. The report gives the median time of each stage, the import
+time per top-level package in each stage (the modules' own time from
+-X importtime, so packages add up to the stage's imports) and how long
+each service took to build, including any services it built first.
+`--compare` checks the stage times against an earlier `--output` file and
+exits non-zero when one got more than `--tolerance` slower.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from benchmarks.bench_endpoints import git_commit
+
+# Runs in the child interpreter; prints the stage timings as JSON and
+# marks where each stage starts in the -X importtime output (stderr)
+CHILD = """
+import json, sys, time
+sys.stderr.write('# stage import\\n')
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+sys.stderr.write('# stage create_app\\n')
+flask_app = app.create_app()
+created = time.perf_counter()
+sys.stderr.write('# stage warm_services\\n')
+flask_app.warm_services()
+warmed = time.perf_counter()
+print(json.dumps({
+    'stages': {'import': imported - started, 'create_app': created - imported,
+               'warm_services': warmed - created},
+    'services': flask_app.service_timings
+}))
+"""
+
+STAGES = ('process', 'import', 'create_app', 'warm_services')
+
+
+def parse_importtime(stderr):
+    """
+    Seconds of own import time per top-level package, by stage.
+    """
+    stages = defaultdict(lambda: defaultdict(float))
+    stage = 'interpreter'
+    for line in stderr.splitlines():
+        if line.startswith('# stage '):
+            stage = line[len('# stage '):].strip()
+        elif line.startswith('import time:') and 'self [us]' not in line:
+            self_us, _, name = line[len('import time:'):].split('|')
+            stages[stage][name.strip().split('.')[0]] += int(self_us) / 1e6
+    return stages
+
+
+def measure_once():
+    env = {**os.environ}
+    # boto3 needs a region to build clients; no AWS call is made
+    env.setdefault('AWS_REGION', 'us-east-1')
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD],
+                            capture_output=True, text=True, env=env, check=True)
+    elapsed = time.perf_counter() - started
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['stages']['process'] = elapsed
+    report['packages'] = parse_importtime(result.stderr)
+    return report
+
+
+def median_of(values):
+    names = {name for value in values for name in value}
+    return {name: round(statistics.median(value.get(name, 0.0) for value in values), 6)
+            for name in names}
+
+
+def run(runs):
+    reports = []
+    for number in range(runs):
+        print(f"run {number + 1}/{runs} ...", file=sys.stderr)
+        reports.append(measure_once())
+    return {
+        'stages': median_of([report['stages'] for report in reports]),
+        'packages': {stage: median_of([report['packages'].get(stage, {}) for report in reports])
+                     for stage in STAGES[1:]},
+        'services': median_of([report['services'] for report in reports])
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return (stage, ratio) for every stage slower than `baseline` by more
+    than `tolerance`.
+    """
+    regressions = []
+    for stage in STAGES:
+        before = baseline.get('results', {}).get('stages', {}).get(stage)
+        after = results['stages'].get(stage)
+        if before and after and after / before > 1 + tolerance:
+            regressions.append((stage, round(after / before, 2)))
+    return regressions
+
+
+def print_report(results, top):
+    print(f"{'stage':<24} {'ms':>9}")
+    for stage in STAGES:
+        print(f"{stage:<24} {results['stages'][stage] * 1000:>9.1f}")
+
+    for stage, stage_packages in results['packages'].items():
+        print(f"\n{'imports in ' + stage:<24} {'ms':>9}")
+        packages = sorted(stage_packages.items(), key=lambda item: -item[1])
+        for name, seconds in packages[:top]:
+            print(f"{name:<24} {seconds * 1000:>9.1f}")
+        rest = sum(seconds for _, seconds in packages[top:])
+        print(f"{'(other)':<24} {rest * 1000:>9.1f}")
+
+    print(f"\n{'service (first use)':<24} {'ms':>9}")
+    for name, seconds in sorted(results['services'].items(), key=lambda item: -item[1]):
+        print(f"{name:<24} {seconds * 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="packages to list by import time")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="results JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown per stage against --compare (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    print_report(results, args.top)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'commit': git_commit(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'options': {'runs': args.runs},
+                'results': results
+            }, output, indent=2)
+        print(f"wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for stage, ratio in regressions:
+            print(f"REGRESSION {stage}: {ratio}x slower")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
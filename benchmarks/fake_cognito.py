@@ -0,0 +1,152 @@
+"""
+Local stand-in for the Cognito user pool, used by the endpoint benchmarks.
+
+Answers the Cognito Identity Provider calls the app makes (SignUp,
+InitiateAuth, GlobalSignOut) over the same JSON protocol boto3 speaks, and
+serves the pool's JWKS at /.well-known/jwks.json. Tokens are RS256 JWTs
+with Cognito's claims, so the app verifies them with its real
+CognitoTokenVerifier. Point boto3 at it with
+AWS_ENDPOINT_URL_COGNITO_IDENTITY_PROVIDER and the verifier with
+COGNITO_JWKS_URL.
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+TARGET_PREFIX = "AWSCognitoIdentityProviderService."
+
+
+def generate_signing_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+class TokenMinter:
+    """
+    Issues Cognito-shaped access and ID tokens for a user pool.
+    """
+
+    def __init__(self, private_key, region, user_pool_id, app_client_id,
+                 key_id="bench-key", ttl=3600):
+        self.private_key = private_key
+        self.issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+        self.app_client_id = app_client_id
+        self.key_id = key_id
+        self.ttl = ttl
+
+    def jwks(self):
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(self.private_key.public_key()))
+        return {"keys": [{**jwk, "kid": self.key_id, "alg": "RS256", "use": "sig"}]}
+
+    def access_token(self, sub, username=None):
+        return self._sign({"sub": sub, "token_use": "access", "client_id": self.app_client_id,
+                           "username": username or sub, "scope": "aws.cognito.signin.user.admin"})
+
+    def id_token(self, sub, email=None):
+        return self._sign({"sub": sub, "token_use": "id", "aud": self.app_client_id,
+                           "email": email, "cognito:username": email or sub})
+
+    def _sign(self, claims):
+        now = int(time.time())
+        # `jti` keeps every token unique, as sign-out revokes by token hash
+        claims = {**claims, "iss": self.issuer, "iat": now, "exp": now + self.ttl,
+                  "jti": uuid.uuid4().hex}
+        return jwt.encode(claims, self.private_key, algorithm="RS256",
+                          headers={"kid": self.key_id})
+
+
+class FakeCognito:
+    """
+    In-memory user pool; `FakeCognitoHandler` serves it over HTTP.
+    """
+
+    def __init__(self, minter):
+        self.minter = minter
+        self.users = {}
+        self._lock = threading.Lock()
+        self.actions = {
+            'SignUp': self.sign_up,
+            'InitiateAuth': self.initiate_auth,
+            'GlobalSignOut': self.global_sign_out
+        }
+
+    def handle(self, target, request):
+        """
+        Return `(status, payload)` for a Cognito API call.
+        """
+        action = self.actions.get(target[len(TARGET_PREFIX):] if target else None)
+        if action is None:
+            return 400, self._error("InvalidParameterException", f"Unsupported action {target}")
+        return action(request)
+
+    def sign_up(self, request):
+        username = request['Username']
+        with self._lock:
+            if username in self.users:
+                return 400, self._error("UsernameExistsException", "User already exists")
+            sub = str(uuid.uuid4())
+            self.users[username] = {'password': request['Password'], 'sub': sub}
+        return 200, {"UserConfirmed": True, "UserSub": sub}
+
+    def initiate_auth(self, request):
+        parameters = request.get('AuthParameters') or {}
+        username = parameters.get('USERNAME')
+        user = self.users.get(username)
+        if user is None:
+            return 400, self._error("UserNotFoundException", "User does not exist.")
+        if user['password'] != parameters.get('PASSWORD'):
+            return 400, self._error("NotAuthorizedException", "Incorrect username or password.")
+        return 200, {"AuthenticationResult": {
+            "AccessToken": self.minter.access_token(user['sub'], username),
+            "IdToken": self.minter.id_token(user['sub'], username),
+            "RefreshToken": uuid.uuid4().hex,
+            "ExpiresIn": self.minter.ttl,
+            "TokenType": "Bearer"
+        }, "ChallengeParameters": {}}
+
+    def global_sign_out(self, request):
+        return 200, {}
+
+    def _error(self, error_type, message):
+        return {"__type": error_type, "message": message}
+
+
+class FakeCognitoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    cognito = None
+
+    def do_GET(self):
+        if self.path != '/.well-known/jwks.json':
+            return self._send(404, {"message": "Not found"}, 'application/json')
+        self._send(200, self.cognito.minter.jwks(), 'application/json')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        status, payload = self.cognito.handle(self.headers.get('X-Amz-Target'), request)
+        self._send(status, payload, 'application/x-amz-json-1.1')
+
+    def _send(self, status, payload, content_type):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fake_cognito(cognito, host='127.0.0.1', port=0):
+    """
+    Start serving `cognito` on a background thread and return the server.
+    """
+    handler = type('BoundFakeCognitoHandler', (FakeCognitoHandler,), {'cognito': cognito})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,309 @@
+"""
+Local stand-in for the Plaid API, used by the endpoint benchmarks.
+
+Serves the endpoints the app calls (/link/token/create,
+/item/public_token/exchange, /accounts/get, /transactions/get,
+/transactions/sync, /liabilities/get, /webhook_verification_key/get) with
+synthetic but schema-valid responses, so plaid-python deserializes them
+exactly as it would real ones. Every item has `transactions_per_item`
+transactions, generated deterministically from (item, index) rather than
+held in memory, and every call sleeps `latency` seconds (plus up to
+`jitter`) to model the round trip to Plaid.
+
+Public token `public-bench-<n>` exchanges for item `item-bench-<n>` with
+access token `access-bench-<n>`.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MERCHANTS = [
+    ("Starbucks", ["Food and Drink", "Restaurants", "Coffee Shop"], 4.0, 9.0),
+    ("Whole Foods", ["Shops", "Supermarkets and Groceries"], 20.0, 180.0),
+    ("Uber", ["Travel", "Taxi"], 8.0, 45.0),
+    ("Amazon", ["Shops", "Digital Purchase"], 10.0, 250.0),
+    ("Shell", ["Travel", "Gas Stations"], 25.0, 70.0),
+    ("United Airlines", ["Travel", "Airlines and Aviation Services"], 150.0, 600.0),
+    ("Chipotle", ["Food and Drink", "Restaurants"], 9.0, 25.0),
+    ("Target", ["Shops", "Department Stores"], 15.0, 140.0)
+]
+# Monthly charges with a fixed amount, so the recurring detector has work to do
+SUBSCRIPTIONS = [
+    ("Netflix", ["Service", "Subscription"], 15.49),
+    ("Spotify", ["Service", "Subscription"], 10.99),
+    ("Planet Fitness", ["Recreation", "Gyms and Fitness Centers"], 24.99)
+]
+ACCOUNTS = [
+    ("checking", "depository", "Plaid Checking"),
+    ("savings", "depository", "Plaid Saving"),
+    ("credit card", "credit", "Plaid Credit Card")
+]
+SYNC_PAGE_SIZE = 500
+
+
+def item_index(token):
+    """
+    `access-bench-7`, `item-bench-7` and `public-bench-7` all belong to item 7.
+    """
+    try:
+        return int(token.rsplit('-', 1)[1])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def account_id(index, number):
+    return f"acc-bench-{index}-{number}"
+
+
+class FakePlaid:
+    """
+    Builds Plaid response payloads; `FakePlaidHandler` serves them over HTTP.
+    """
+
+    def __init__(self, transactions_per_item=1000, days=730, latency=0.05, jitter=0.0,
+                 webhook_jwk=None, today=None):
+        self.transactions_per_item = transactions_per_item
+        self.days = days
+        self.latency = latency
+        self.jitter = jitter
+        self.webhook_jwk = webhook_jwk
+        self.today = today or date.today()
+        self.counts = {}
+        self._lock = threading.Lock()
+        self.routes = {
+            '/link/token/create': self.link_token_create,
+            '/item/public_token/exchange': self.item_public_token_exchange,
+            '/accounts/get': self.accounts_get,
+            '/transactions/get': self.transactions_get,
+            '/transactions/sync': self.transactions_sync,
+            '/liabilities/get': self.liabilities_get,
+            '/webhook_verification_key/get': self.webhook_verification_key_get
+        }
+
+    def handle(self, path, request):
+        """
+        Return `(status, payload)` for a Plaid API call.
+        """
+        route = self.routes.get(path)
+        with self._lock:
+            self.counts[path] = self.counts.get(path, 0) + 1
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        if route is None:
+            return 404, self._error("INVALID_REQUEST", "UNKNOWN_ENDPOINT", f"Unknown endpoint {path}")
+
+        index = item_index(request.get('access_token'))
+        if 'access_token' in request and index is None:
+            return 400, self._error("INVALID_INPUT", "INVALID_ACCESS_TOKEN", "Unknown access token")
+        return 200, route(request, index)
+
+    def transaction(self, index, number):
+        """
+        The `number`-th transaction of item `index`, newest first.
+        """
+        rng = random.Random(index * 1_000_003 + number)
+        txn_date = self.date_of(number)
+
+        if number % 40 < len(SUBSCRIPTIONS):
+            # Evenly spaced fixed charges (about monthly at the default volume)
+            name, category, amount = SUBSCRIPTIONS[number % 40]
+        elif number % 15 == 0:
+            name, category, amount = "Gusto Payroll", ["Transfer", "Payroll"], -round(
+                rng.uniform(1800, 3200), 2)
+        else:
+            name, category, low, high = MERCHANTS[rng.randrange(len(MERCHANTS))]
+            amount = round(rng.uniform(low, high), 2)
+
+        return {
+            "transaction_id": f"txn-bench-{index}-{number:06d}",
+            "account_id": account_id(index, rng.randrange(len(ACCOUNTS))),
+            "amount": amount,
+            "iso_currency_code": "USD",
+            "unofficial_currency_code": None,
+            "category": category,
+            "category_id": "13005000",
+            "check_number": None,
+            "date": txn_date.isoformat(),
+            "authorized_date": txn_date.isoformat(),
+            "authorized_datetime": None,
+            "datetime": None,
+            "location": {
+                "address": None, "city": "San Francisco", "region": "CA",
+                "postal_code": "94103", "country": "US", "lat": None, "lon": None,
+                "store_number": None
+            },
+            "merchant_name": name,
+            "name": name,
+            "payment_meta": {
+                "by_order_of": None, "payee": None, "payer": None, "payment_method": None,
+                "payment_processor": None, "ppd_id": None, "reason": None,
+                "reference_number": None
+            },
+            "payment_channel": "in store",
+            "pending": False,
+            "pending_transaction_id": None,
+            "account_owner": None,
+            "transaction_code": None
+        }
+
+    def date_of(self, number):
+        # Spread each item's history evenly over the last `days` days
+        return self.today - timedelta(
+            days=number * self.days // max(1, self.transactions_per_item))
+
+    def link_token_create(self, request, index):
+        return {
+            "link_token": f"link-sandbox-{uuid.uuid4()}",
+            "expiration": (self.today + timedelta(days=1)).isoformat() + "T00:00:00Z",
+            "request_id": self._request_id()
+        }
+
+    def item_public_token_exchange(self, request, index):
+        index = item_index(request.get('public_token'))
+        return {
+            "access_token": f"access-bench-{index}",
+            "item_id": f"item-bench-{index}",
+            "request_id": self._request_id()
+        }
+
+    def accounts_get(self, request, index):
+        return {"accounts": self._accounts(index), "item": self._item(index),
+                "request_id": self._request_id()}
+
+    def transactions_get(self, request, index):
+        options = request.get('options') or {}
+        offset = options.get('offset', 0)
+        count = options.get('count', 100)
+        start = date.fromisoformat(request['start_date'])
+        end = date.fromisoformat(request['end_date'])
+        # Transactions are generated newest first, so the window maps to a
+        # contiguous range of numbers
+        in_window = list(self._numbers_between(start, end))
+        page = in_window[offset:offset + count]
+        return {
+            "accounts": self._accounts(index),
+            "transactions": [self.transaction(index, number) for number in page],
+            "total_transactions": len(in_window),
+            "item": self._item(index),
+            "request_id": self._request_id()
+        }
+
+    def transactions_sync(self, request, index):
+        offset = int(request.get('cursor') or 0)
+        count = min(request.get('count', 100), SYNC_PAGE_SIZE)
+        end = min(offset + count, self.transactions_per_item)
+        return {
+            "transactions_update_status": "HISTORICAL_UPDATE_COMPLETE",
+            "accounts": self._accounts(index),
+            "added": [self.transaction(index, number) for number in range(offset, end)],
+            "modified": [],
+            "removed": [],
+            "next_cursor": str(end),
+            "has_more": end < self.transactions_per_item,
+            "request_id": self._request_id()
+        }
+
+    def liabilities_get(self, request, index):
+        statement_date = self.today.replace(day=1)
+        return {
+            "accounts": self._accounts(index),
+            "item": self._item(index),
+            "liabilities": {
+                "credit": [{
+                    "account_id": account_id(index, 2),
+                    "aprs": [{"apr_percentage": 15.24, "apr_type": "purchase_apr",
+                              "balance_subject_to_apr": 1562.32,
+                              "interest_charge_amount": 130.22}],
+                    "is_overdue": False,
+                    "last_payment_amount": 168.25,
+                    "last_payment_date": statement_date.isoformat(),
+                    "last_statement_issue_date": statement_date.isoformat(),
+                    "last_statement_balance": 1708.77,
+                    "minimum_payment_amount": 20.0,
+                    "next_payment_due_date": (statement_date + timedelta(days=14)).isoformat()
+                }],
+                "mortgage": None,
+                "student": None
+            },
+            "request_id": self._request_id()
+        }
+
+    def webhook_verification_key_get(self, request, index):
+        return {"key": self.webhook_jwk, "request_id": self._request_id()}
+
+    def _numbers_between(self, start, end):
+        per_day = self.transactions_per_item / max(1, self.days)
+        first = max(0, int((self.today - end).days * per_day) - 1)
+        for number in range(first, self.transactions_per_item):
+            txn_date = self.date_of(number)
+            if txn_date < start:
+                return
+            if txn_date <= end:
+                yield number
+
+    def _accounts(self, index):
+        return [{
+            "account_id": account_id(index, number),
+            "balances": {"available": 100.0 * (number + 1), "current": 110.0 * (number + 1),
+                         "limit": 2000.0 if account_type == "credit" else None,
+                         "iso_currency_code": "USD", "unofficial_currency_code": None},
+            "mask": f"{number:04d}",
+            "name": name,
+            "official_name": f"{name} Account",
+            "type": account_type,
+            "subtype": subtype
+        } for number, (subtype, account_type, name) in enumerate(ACCOUNTS)]
+
+    def _item(self, index):
+        return {
+            "item_id": f"item-bench-{index}",
+            "webhook": None,
+            "error": None,
+            "available_products": ["balance"],
+            "billed_products": ["transactions", "liabilities"],
+            "consent_expiration_time": None,
+            "update_type": "background"
+        }
+
+    def _error(self, error_type, error_code, message):
+        return {"error_type": error_type, "error_code": error_code,
+                "error_message": message, "display_message": None,
+                "request_id": self._request_id()}
+
+    def _request_id(self):
+        return uuid.uuid4().hex[:15]
+
+
+class FakePlaidHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so the app's pooled urllib3 connections are reused
+    protocol_version = "HTTP/1.1"
+    plaid = None
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        status, payload = self.plaid.handle(self.path, request)
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fake_plaid(plaid, host='127.0.0.1', port=0):
+    """
+    Start serving `plaid` on a background thread and return the server.
+    """
+    handler = type('BoundFakePlaidHandler', (FakePlaidHandler,), {'plaid': plaid})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
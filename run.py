@@ -8,6 +8,10 @@ ENV = os.getenv("FLASK_ENV", "development")  # Default to "development"
 app = create_app()
 
 if __name__ == "__main__":
+    # Re-queue background jobs left pending by the last run (only when
+    # JOB_STORE_TABLE configures a durable job store)
+    app.job_runner.recover()
+
     # Get PORT dynamically from environment or fallback to 5000
     port = int(os.environ.get("PORT", 5000))
 
@@ -21,3 +21,11 @@ def app():
 @pytest.fixture
 def client(app):
     return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(mocker):
+    # Accept the fake bearer token as a verified Cognito access token
+    mocker.patch('app.utils.token_verifier.CognitoTokenVerifier.verify', return_value={
+        "sub": "test-user", "token_use": "access"})
+    return {"Authorization": "Bearer fake-access-token"}
@@ -0,0 +1,61 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from app.controllers.async_plaid_controller import AsyncPlaidController, PlaidCallTimeout
+
+
+def slow(value, delay=0.2):
+    time.sleep(delay)
+    return value
+
+
+def test_gather_runs_calls_concurrently():
+    controller = AsyncPlaidController(MagicMock(), workers=4)
+
+    started = time.perf_counter()
+    results = controller.run(controller.gather(
+        controller.call(slow, "accounts"),
+        controller.call(slow, "transactions")
+    ))
+
+    assert results == ["accounts", "transactions"]
+    assert time.perf_counter() - started < 0.35
+
+
+def test_call_times_out():
+    controller = AsyncPlaidController(MagicMock(), workers=2, call_timeout=0.05)
+
+    with pytest.raises(PlaidCallTimeout):
+        controller.run(controller.call(slow, "accounts"))
+
+
+def test_gather_abandons_pending_calls_on_failure():
+    controller = AsyncPlaidController(MagicMock(), workers=2)
+    finished = []
+
+    async def pending():
+        await controller.call(slow, "transactions", delay=0.5)
+        finished.append("transactions")
+
+    def fail():
+        raise Exception("Error fetching account details: boom")
+
+    with pytest.raises(Exception, match="boom"):
+        controller.run(controller.gather(controller.call(fail), pending()))
+    assert finished == []
+
+
+def test_get_account_details_endpoint(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": "fake-access-token"})
+    mocker.patch('app.controllers.plaid_controller.PlaidController.get_account_details',
+                 return_value={"account_id": "acc-1", "name": "Checking"})
+    mocker.patch('app.controllers.sync_controller.SyncController.get_transactions',
+                 return_value=[{"name": "Gym", "amount": 30.0, "date": "2024-01-02"}])
+
+    response = client.post("/plaid/get_account_details",
+                           json={"account_id": "acc-1"}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json["account_details"]["name"] == "Checking"
+    assert response.json["transactions"][0]["name"] == "Gym"
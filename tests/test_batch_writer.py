@@ -0,0 +1,89 @@
+from unittest.mock import MagicMock
+from app.utils.batch_writer import BatchWritePipeline
+
+
+def _table():
+    table = MagicMock()
+    table.name = "SpendWiseTransactions"
+    table.meta.client.batch_write_item.return_value = {}
+    return table
+
+
+def test_put_items_chunks_and_dedupes():
+    table = _table()
+    pipeline = BatchWritePipeline(table, ["user_id", "transaction_id"])
+
+    items = [{"user_id": "u", "transaction_id": f"t{i % 60}"}
+             for i in range(80)]
+    written = pipeline.put_items(items)
+
+    assert written == 60
+    sizes = [len(call.kwargs["RequestItems"]["SpendWiseTransactions"])
+             for call in table.meta.client.batch_write_item.call_args_list]
+    assert sizes == [25, 25, 10]
+
+
+def test_unprocessed_items_are_retried_with_backoff():
+    table = _table()
+    unprocessed = {"SpendWiseTransactions": [
+        {"PutRequest": {"Item": {"user_id": "u", "transaction_id": "t0"}}}]}
+    table.meta.client.batch_write_item.side_effect = [
+        {"UnprocessedItems": unprocessed}, {"UnprocessedItems": unprocessed}, {}]
+    delays = []
+    pipeline = BatchWritePipeline(
+        table, ["user_id", "transaction_id"], sleep=delays.append)
+
+    assert pipeline.put_items([{"user_id": "u", "transaction_id": "t0"}]) == 1
+    assert delays == [0.05, 0.1]
+
+
+def test_parallel_workers_write_every_chunk():
+    table = _table()
+    pipeline = BatchWritePipeline(
+        table, ["user_id", "transaction_id"], workers=4)
+
+    written = pipeline.put_items(
+        {"user_id": "u", "transaction_id": f"t{i}"} for i in range(1000))
+
+    assert written == 1000
+    assert table.meta.client.batch_write_item.call_count == 40
+
+
+def test_put_items_keeps_first_copy_of_each_key():
+    table = _table()
+    pipeline = BatchWritePipeline(table, ["user_id", "transaction_id"])
+
+    pipeline.put_items([{"user_id": "u", "transaction_id": "t0", "v": 1},
+                        {"user_id": "u", "transaction_id": "t0", "v": 2}])
+
+    (request,) = table.meta.client.batch_write_item.call_args.kwargs[
+        "RequestItems"]["SpendWiseTransactions"]
+    assert request["PutRequest"]["Item"]["v"] == 1
+
+
+def test_bulk_endpoint_accepts_ndjson(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={"user_id": "test-user"})
+    apply_changes = mocker.patch('app.controllers.sync_controller.SyncController.apply_changes')
+
+    body = ('{"transaction_id": "t1", "amount": 12.5, "date": "2024-01-02"}\n\n'
+            '{"transaction_id": "t2", "amount": -3, "date": "2024-01-03"}\n')
+    response = client.post("/transactions/bulk", data=body, headers={
+        **auth_headers, "Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 201
+    assert response.json["written"] == 2
+    user, upserts, removed = apply_changes.call_args.args
+    assert user["user_id"] == "test-user"
+    assert [txn["transaction_id"] for txn in upserts] == ["t1", "t2"]
+
+
+def test_bulk_endpoint_rejects_missing_ids(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={"user_id": "test-user"})
+    apply_changes = mocker.patch('app.controllers.sync_controller.SyncController.apply_changes')
+
+    response = client.post("/transactions/bulk", json=[{"amount": 1}],
+                           headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.json["written"] == 0
+    apply_changes.assert_not_called()
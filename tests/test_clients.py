@@ -0,0 +1,47 @@
+from app.utils.aws_client_config import build_client_config
+from app.utils.plaid_client import init_plaid_client
+
+CONFIG = {
+    'AWS_MAX_POOL_CONNECTIONS': 64,
+    'AWS_MAX_ATTEMPTS': 4,
+    'AWS_CONNECT_TIMEOUT': 1.5,
+    'AWS_READ_TIMEOUT': 4.0,
+    'PLAID_ENV': 'sandbox',
+    'PLAID_CLIENT_ID': 'client-id',
+    'PLAID_SECRET': 'secret',
+    'PLAID_POOL_MAXSIZE': 12,
+    'PLAID_CONNECT_TIMEOUT': 2.0,
+    'PLAID_READ_TIMEOUT': 20.0
+}
+
+
+def test_botocore_config_is_tuned():
+    client_config = build_client_config(CONFIG)
+
+    assert client_config.max_pool_connections == 64
+    assert client_config.retries == {'mode': 'adaptive', 'max_attempts': 4}
+    assert client_config.connect_timeout == 1.5
+    assert client_config.read_timeout == 4.0
+
+
+def test_plaid_client_uses_shared_pool_and_default_timeout():
+    plaid_client = init_plaid_client(CONFIG)
+    api_client = plaid_client.api_client
+
+    assert api_client.configuration.connection_pool_maxsize == 12
+    assert api_client.rest_client.pool_manager.connection_pool_kw['maxsize'] == 12
+    assert api_client.request_timeout == (2.0, 20.0)
+    assert api_client.configuration.host == "https://sandbox.plaid.com"
+
+
+def test_plaid_host_overrides_environment_url():
+    plaid_client = init_plaid_client({**CONFIG, 'PLAID_HOST': "http://127.0.0.1:8080"})
+
+    assert plaid_client.api_client.configuration.host == "http://127.0.0.1:8080"
+
+
+def test_controllers_are_shared_across_requests(app):
+    with app.app_context():
+        assert app.sync_controller.plaid_controller is app.plaid_controller
+        assert app.sync_controller.user_model is app.user_model
+        assert app.auth_controller.token_verifier is app.token_verifier
@@ -0,0 +1,66 @@
+from decimal import Decimal
+from unittest.mock import MagicMock
+from app.controllers.transaction_controller import TransactionController
+from app.models.transaction_model import TransactionModel
+
+STORED = [
+    {"user_id": "test-user", "transaction_id": "t1", "date": "2023-01-02",
+     "name": "Payroll", "amount": Decimal("-100"), "category": ["Transfer"],
+     "account_id": "acc-1", "pending": False},
+    {"user_id": "test-user", "transaction_id": "t2", "date": "2024-06-03",
+     "name": "Cafe", "merchant_name": "Blue Bottle", "amount": Decimal("25.5"),
+     "category": ["Food", "Coffee"], "account_id": "acc-2", "pending": False}
+]
+
+
+def test_export_reads_one_page_at_a_time():
+    dynamodb = MagicMock()
+    table = dynamodb.Table.return_value
+    table.query.side_effect = [
+        {"Items": STORED[:1], "LastEvaluatedKey": {"transaction_id": "t1"}},
+        {"Items": STORED[1:]}
+    ]
+    controller = TransactionController(TransactionModel(dynamodb))
+
+    rows = controller.export_transactions(
+        "test-user", account_ids=["acc-1", "acc-2"])
+    table.query.assert_not_called()
+
+    first = next(rows)
+    assert first["amount"] == -100.0
+    assert table.query.call_count == 1
+    assert [row["transaction_id"] for row in rows] == ["t2"]
+    assert table.query.call_args.kwargs["Limit"] == 500
+    assert "FilterExpression" in table.query.call_args.kwargs
+
+
+def test_export_endpoint_streams_csv(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": "fake-access-token"})
+    mocker.patch('app.controllers.sync_controller.SyncController.ensure_synced')
+    mock_iter = mocker.patch('app.models.transaction_model.TransactionModel.iter_transactions',
+                             return_value=iter([{**STORED[1], "amount": 25.5}]))
+
+    response = client.get(
+        "/plaid/transactions/export?format=csv&start_date=2024-01-01&account_id=acc-2",
+        headers=auth_headers)
+
+    lines = response.get_data(as_text=True).splitlines()
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert lines[0] == "transaction_id,date,name,merchant_name,amount,category,account_id,pending"
+    assert lines[1] == "t2,2024-06-03,Cafe,Blue Bottle,25.5,Food;Coffee,acc-2,False"
+    assert mock_iter.call_args.kwargs["account_id"] == ["acc-2"]
+
+
+def test_export_endpoint_streams_ndjson(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": "fake-access-token"})
+    mocker.patch('app.controllers.sync_controller.SyncController.ensure_synced')
+    mocker.patch('app.models.transaction_model.TransactionModel.iter_transactions',
+                 return_value=iter([{**STORED[1], "amount": 25.5}]))
+
+    response = client.get("/plaid/transactions/export", headers=auth_headers)
+
+    assert response.mimetype == "application/x-ndjson"
+    assert response.get_data(as_text=True).count("\n") == 1
@@ -0,0 +1,211 @@
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from plaid.exceptions import ApiException
+from app.controllers.job_controller import JobController
+from app.controllers.plaid_controller import PlaidController
+from app.controllers.sync_controller import SyncController
+from app.utils.job_runner import JobRunner, QueueFullError
+
+
+def wait_for(runner, job_id, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.get(job_id)
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_jobs_with_the_same_key_never_overlap():
+    runner = JobRunner(workers=4)
+    active, overlaps = [], []
+    lock = threading.Lock()
+
+    def sync(payload):
+        with lock:
+            if active:
+                overlaps.append(payload)
+            active.append(payload)
+        time.sleep(0.02)
+        with lock:
+            active.remove(payload)
+        return payload['n']
+
+    runner.register('sync', sync)
+    first = runner.submit('sync', {'n': 1}, key='item-1')
+    second = runner.submit('sync', {'n': 2}, key='item-1')
+
+    assert wait_for(runner, first['job_id'])['result'] == 1
+    # The second submit found the first one still queued or running
+    wait_for(runner, second['job_id'])
+    assert overlaps == []
+
+
+def test_queued_job_for_the_same_key_is_coalesced():
+    runner = JobRunner(workers=1)
+    release = threading.Event()
+    runner.register('block', lambda payload: release.wait(1))
+    runner.register('sync', lambda payload: payload)
+
+    runner.submit('block', key='other')
+    first = runner.submit('sync', {'n': 1}, key='item-1')
+    second = runner.submit('sync', {'n': 2}, key='item-1')
+    release.set()
+
+    assert first['job_id'] == second['job_id']
+    wait_for(runner, first['job_id'])
+
+
+def test_plaid_errors_are_retried_with_backoff(mocker):
+    runner = JobRunner(workers=1, max_retries=3, base_delay=0.01)
+    retry_later = mocker.spy(runner, '_retry_later')
+    handler = MagicMock(side_effect=[ApiException(status=503), ApiException(status=429), "ok"])
+    runner.register('sync', handler)
+
+    job = wait_for(runner, runner.submit('sync', key='item-1')['job_id'])
+
+    assert job['status'] == 'succeeded'
+    assert job['attempts'] == 3
+    assert [call.args[1] for call in retry_later.call_args_list] == [0.01, 0.02]
+
+
+def test_client_errors_from_plaid_are_not_retried():
+    runner = JobRunner(workers=1, base_delay=0.01)
+    handler = MagicMock(side_effect=ApiException(status=400, reason="ITEM_LOGIN_REQUIRED"))
+    runner.register('sync', handler)
+
+    job = wait_for(runner, runner.submit('sync', key='item-1')['job_id'])
+
+    assert job['status'] == 'failed'
+    assert job['attempts'] == 1
+    assert handler.call_count == 1
+
+
+def test_retry_does_not_hold_the_key():
+    runner = JobRunner(workers=1, base_delay=0.3)
+    order = []
+
+    def sync(payload):
+        order.append('sync')
+        if len(order) == 1:
+            raise ApiException(status=500)
+        return 'synced'
+
+    runner.register('sync', sync)
+    runner.register('rebuild', lambda payload: order.append('rebuild'))
+    sync_job = runner.submit('sync', key='item-1')
+    time.sleep(0.05)
+    rebuild_job = runner.submit('rebuild', key='item-1')
+
+    # The rebuild runs while the sync waits for its retry
+    assert wait_for(runner, rebuild_job['job_id'])['status'] == 'succeeded'
+    assert runner.get(sync_job['job_id'])['status'] == 'retrying'
+    assert wait_for(runner, sync_job['job_id'])['result'] == 'synced'
+    assert order == ['sync', 'rebuild', 'sync']
+
+
+def test_sync_job_retries_plaid_server_errors():
+    plaid_client = MagicMock()
+    plaid_client.transactions_sync.side_effect = [
+        ApiException(status=503),
+        SimpleNamespace(added=[], modified=[], removed=[], has_more=False, next_cursor="cursor-1")]
+    user_model = MagicMock()
+    user_model.get_user.return_value = {
+        "user_id": "test-user", "access_token": "fake-access-token", "item_id": "item-1"}
+    sync_controller = SyncController(PlaidController(plaid_client), user_model, MagicMock())
+    runner = JobRunner(workers=1, base_delay=0.01)
+    job_controller = JobController(runner, user_model, sync_controller, MagicMock(), MagicMock())
+
+    job = wait_for(runner, job_controller.enqueue_sync({"user_id": "test-user", "item_id": "item-1"})['job_id'])
+
+    assert job['status'] == 'succeeded'
+    assert job['attempts'] == 2
+    assert job['result'] == {"added": 0, "modified": 0, "removed": 0}
+    user_model.advance_cursor.assert_called_once()
+
+
+def test_other_errors_fail_without_retry():
+    runner = JobRunner(workers=1)
+    runner.register('sync', MagicMock(side_effect=ValueError("bad payload")))
+
+    job = wait_for(runner, runner.submit('sync')['job_id'])
+
+    assert job['status'] == 'failed'
+    assert job['error'] == "bad payload"
+    assert runner.stats()['jobs'] == {'failed': 1}
+
+
+def test_submit_rejects_when_full_and_recovers_from_store():
+    store = MagicMock()
+    store.pending_jobs.return_value = [{
+        'job_id': 'job-1', 'name': 'sync', 'key': 'item-1', 'payload': {},
+        'status': 'running', 'attempts': 1, 'error': None, 'result': None,
+        'created_at': '', 'updated_at': ''}]
+    runner = JobRunner(workers=1, maxsize=1, store=store)
+    release = threading.Event()
+    runner.register('sync', lambda payload: release.wait(1))
+
+    assert runner.recover() == 1
+    with pytest.raises(QueueFullError):
+        runner.submit('sync', key='item-2')
+    release.set()
+
+    assert wait_for(runner, 'job-1')['status'] == 'succeeded'
+    assert store.save.call_args.args[0]['status'] == 'succeeded'
+
+
+def test_rebuild_endpoint_queues_a_job(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": "fake-access-token", "item_id": "item-1"})
+    mock_submit = mocker.patch('app.utils.job_runner.JobRunner.submit',
+                               return_value={"job_id": "job-1", "status": "queued"})
+
+    response = client.post("/jobs/rollups/rebuild", json={}, headers=auth_headers)
+
+    assert response.status_code == 202
+    mock_submit.assert_called_once_with(
+        'rebuild_rollups', {'user_id': 'test-user'}, key='item-1')
+
+
+def test_sync_endpoint_queues_for_the_caller_only(client, mocker, auth_headers):
+    get_user = mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": "fake-access-token", "item_id": "item-1"})
+    mocker.patch('app.utils.job_runner.JobRunner.submit',
+                 return_value={"job_id": "job-1", "status": "queued"})
+
+    # No user_id in the body: it is never read from there
+    response = client.post("/jobs/sync", json={"other": "x"}, headers=auth_headers)
+
+    assert response.status_code == 202
+    get_user.assert_called_once_with("test-user")
+
+
+def test_process_jobs_refresh_this_processes_caches():
+    runner = JobRunner(workers=1)
+    # Stand-in for the process pool: the job runs elsewhere
+    runner._process_pool = MagicMock()
+    runner._process_pool.submit.return_value.result.return_value = "synced"
+    user_model = MagicMock()
+    user_model.get_user_fresh.return_value = {"user_id": "test-user", "item_id": "item-1"}
+    response_cache = MagicMock()
+    JobController(runner, user_model, MagicMock(), MagicMock(), MagicMock(), response_cache=response_cache)
+
+    job = wait_for(runner, runner.submit('sync_user', {'user_id': 'test-user'}, key='item-1')['job_id'])
+
+    assert job['result'] == "synced"
+    user_model.get_user_fresh.assert_called_once_with('test-user')
+    response_cache.invalidate.assert_called_once_with('item-1')
+
+
+def test_job_stats_use_the_metrics_token(app, client, auth_headers):
+    assert client.get("/jobs/stats", headers=auth_headers).status_code == 404
+
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+    assert client.get("/jobs/stats", headers=auth_headers).status_code == 401
+    response = client.get("/jobs/stats", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert response.json['pending'] == 0
@@ -0,0 +1,47 @@
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Flask
+from app.utils.json_provider import StdlibJSONProvider, OrjsonProvider, select_json_provider
+
+PAYLOAD = {
+    "amount": Decimal("25.50"),
+    "count": Decimal("3"),
+    "date": date(2024, 1, 2),
+    "synced_at": datetime(2024, 1, 2, 3, 4, 5),
+    "details": [{"name": "Café Zoë", "amount": 4.25, "pending": False, "category": None}]
+}
+
+
+def test_providers_produce_identical_bodies():
+    app = Flask(__name__)
+    with app.app_context():
+        stdlib_body = StdlibJSONProvider(app).response(PAYLOAD).get_data()
+        orjson_body = OrjsonProvider(app).response(PAYLOAD).get_data()
+
+    assert stdlib_body == orjson_body
+    assert stdlib_body.startswith(b'{"amount":25.5,"count":3,"date":"2024-01-02",'
+                                  b'"synced_at":"2024-01-02T03:04:05"')
+
+
+def test_providers_match_outside_responses_and_on_huge_decimals():
+    app = Flask(__name__)
+    payload = {"name": "Café", "max": Decimal(2 ** 64 - 1), "inf": Decimal("1E+400")}
+    stdlib, fast = StdlibJSONProvider(app), OrjsonProvider(app)
+
+    assert stdlib.dumps(payload) == fast.dumps(payload) == \
+        '{"name":"Café","max":18446744073709551615,"inf":"1E+400"}'
+    # Beyond 64 bits an integral Decimal is sent as a float
+    big = {"big": Decimal("1" + "0" * 30)}
+    assert stdlib.loads(stdlib.dumps(big)) == fast.loads(fast.dumps(big)) == {"big": 1e30}
+
+
+def test_stdlib_options_fall_back_to_the_stdlib():
+    provider = OrjsonProvider(Flask(__name__))
+
+    assert provider.loads('{"amount": 1.10}', parse_float=Decimal) == {"amount": Decimal("1.10")}
+    assert provider.loads('{"amount": 1.10}') == {"amount": 1.1}
+
+
+def test_app_uses_orjson_when_available(app):
+    assert isinstance(app.json, select_json_provider('auto'))
+    assert select_json_provider('stdlib') is StdlibJSONProvider
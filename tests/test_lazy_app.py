@@ -0,0 +1,38 @@
+import threading
+import time
+from app.utils.lazy_app import LazyServiceApp
+
+
+def test_create_app_defers_clients_until_first_use(app):
+    assert 'dynamodb' not in app.__dict__
+    assert 'plaid_controller' not in app.__dict__
+
+    user_model = app.user_model
+
+    assert app.user_model is user_model
+    assert set(app.service_timings) == {'dynamodb', 'user_model'}
+
+
+def test_job_runner_comes_with_its_handlers(app):
+    assert set(app.job_runner.handlers) == {'sync_user', 'rebuild_rollups', 'plaid_webhook'}
+
+
+def test_concurrent_first_use_builds_service_once():
+    app = LazyServiceApp(__name__)
+    built = []
+
+    def build(app):
+        time.sleep(0.01)
+        built.append(object())
+        return built[-1]
+
+    app.register_service('client', build)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(app.client)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
+    assert all(result is built[0] for result in results)
@@ -0,0 +1,58 @@
+from botocore.exceptions import ClientError
+from app.models.subscription_model import SubscriptionModel
+from app.utils.http_pagination import DEFAULT_PAGE_SIZE
+
+
+def test_budget_and_subscription_routes_require_auth(client, mocker):
+    create = mocker.patch('app.models.budget_model.BudgetModel.create_budget')
+    delete = mocker.patch('app.models.subscription_model.SubscriptionModel.delete_subscription')
+
+    assert client.post("/budgets/", json={"user_id": "u", "category": "Food"}).status_code == 401
+    assert client.get("/budgets/?user_id=u").status_code == 401
+    assert client.put("/budgets/Food", json={"amount": 1}).status_code == 401
+    assert client.delete("/budgets/Food?user_id=u").status_code == 401
+    assert client.post("/subscriptions/", json={"subscription_id": "s"}).status_code == 401
+    assert client.get("/subscriptions/?user_id=u").status_code == 401
+    assert client.delete("/subscriptions/s").status_code == 401
+    create.assert_not_called()
+    delete.assert_not_called()
+
+
+def test_budgets_are_scoped_to_caller(client, mocker, auth_headers):
+    create = mocker.patch('app.models.budget_model.BudgetModel.create_budget')
+    page = mocker.patch('app.models.budget_model.BudgetModel.get_budgets_page',
+                        return_value=([], None))
+    delete = mocker.patch('app.models.budget_model.BudgetModel.delete_budget')
+
+    client.post("/budgets/", json={"category": "Food", "amount": 100}, headers=auth_headers)
+    client.get("/budgets/?user_id=someone-else", headers=auth_headers)
+    client.delete("/budgets/Food?user_id=someone-else", headers=auth_headers)
+
+    create.assert_called_once_with("test-user", "Food", 100)
+    page.assert_called_once_with("test-user", DEFAULT_PAGE_SIZE, None)
+    delete.assert_called_once_with("test-user", "Food")
+
+
+def test_subscriptions_are_scoped_to_caller(client, mocker, auth_headers):
+    add = mocker.patch('app.models.subscription_model.SubscriptionModel.add_subscription')
+
+    response = client.post("/subscriptions/", json={"subscription_id": "s1", "user_id": "test-user"},
+                           headers=auth_headers)
+
+    assert response.status_code == 201
+    add.assert_called_once_with({"subscription_id": "s1", "user_id": "test-user"})
+
+
+def test_deleting_another_users_subscription_is_not_found(client, mocker, auth_headers):
+    table = mocker.MagicMock()
+    table.delete_item.side_effect = ClientError(
+        {"Error": {"Code": "ConditionalCheckFailedException"}}, "DeleteItem")
+    model = SubscriptionModel(mocker.MagicMock(**{"Table.return_value": table}))
+    mocker.patch('app.models.subscription_model.SubscriptionModel.delete_subscription',
+                 side_effect=model.delete_subscription)
+
+    response = client.delete("/subscriptions/other-user%23netflix", headers=auth_headers)
+
+    assert response.status_code == 404
+    assert table.delete_item.call_args.kwargs["Key"] == {
+        "user_id": "test-user", "subscription_id": "other-user#netflix"}
@@ -0,0 +1,96 @@
+import json
+import pytest
+from decimal import Decimal
+from unittest.mock import MagicMock
+from app.utils.dynamodb_pagination import (
+    InvalidPageToken, decode_page_token, encode_page_token, iter_query, query_page)
+
+
+def _paged_table(pages):
+    """
+    Fake table whose query() returns `pages` in order, chaining them with
+    LastEvaluatedKey like DynamoDB does.
+    """
+    table = MagicMock()
+
+    def query(**kwargs):
+        index = kwargs.get('ExclusiveStartKey', {}).get('page', 0)
+        response = {'Items': pages[index]}
+        if index + 1 < len(pages):
+            response['LastEvaluatedKey'] = {'page': index + 1}
+        return response
+    table.query.side_effect = query
+    return table
+
+
+def test_page_token_round_trip():
+    key = {"user_id": "test-user", "amount": Decimal("12.50")}
+    assert decode_page_token(encode_page_token(key)) == key
+    assert encode_page_token(None) is None
+    with pytest.raises(InvalidPageToken):
+        decode_page_token("not-a-token")
+
+
+def test_iter_query_follows_last_evaluated_key():
+    table = _paged_table([[1, 2], [3], [4, 5]])
+
+    assert list(iter_query(table, projection=["date", "amount"],
+                           KeyConditionExpression="user_id = :u")) == [1, 2, 3, 4, 5]
+    kwargs = table.query.call_args.kwargs
+    assert kwargs["ProjectionExpression"] == "#p0, #p1"
+    assert kwargs["ExpressionAttributeNames"] == {"#p0": "date", "#p1": "amount"}
+
+
+def test_query_page_returns_continuation_token():
+    table = _paged_table([[1], [2], [3]])
+
+    items, token = query_page(table, 2)
+    assert items == [1, 2]
+    assert decode_page_token(token) == {"page": 2}
+
+    items, token = query_page(table, 2, page_token=token)
+    assert items == [3]
+    assert token is None
+
+
+def test_transactions_endpoint_paginates(client, mocker, auth_headers):
+    mock_page = mocker.patch(
+        'app.models.transaction_model.TransactionModel.get_transactions_page',
+        return_value=([{"transaction_id": "t1"}], "next-token"))
+
+    # A user_id in the query is ignored; the token decides whose rows are read
+    response = client.get("/transactions/?user_id=someone-else&limit=1", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json["next_page_token"] == "next-token"
+    mock_page.assert_called_once_with("test-user", 1, None)
+
+
+def test_transactions_endpoint_streams_ndjson(client, mocker, auth_headers):
+    mocker.patch('app.models.transaction_model.TransactionModel.iter_transactions',
+                 return_value=iter([{"transaction_id": "t1"}, {"transaction_id": "t2"}]))
+
+    response = client.get("/transactions/?format=ndjson", headers=auth_headers)
+
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)["transaction_id"] for line in lines] == ["t1", "t2"]
+
+
+def test_transactions_endpoints_require_auth(client, mocker):
+    add = mocker.patch('app.controllers.sync_controller.SyncController.apply_changes')
+
+    assert client.get("/transactions/?user_id=test-user").status_code == 401
+    assert client.post("/transactions/", json={"user_id": "test-user"}).status_code == 401
+    add.assert_not_called()
+
+
+def test_add_transaction_is_owned_by_caller(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={"user_id": "test-user"})
+    add = mocker.patch('app.controllers.sync_controller.SyncController.apply_changes')
+    txn = {"transaction_id": "t1", "amount": 4.5, "date": "2024-01-02"}
+
+    response = client.post("/transactions/", json=txn, headers=auth_headers)
+
+    assert response.status_code == 201
+    add.assert_called_once_with({"user_id": "test-user"}, [txn], [], workers=4)
@@ -2,39 +2,50 @@ import pytest
 from unittest.mock import MagicMock
 
 
-def test_create_link_token(client, mocker):
+def test_create_link_token(client, mocker, auth_headers):
     # Mock the PlaidController's create_link_token
     mock_create_link_token = mocker.patch(
         'app.views.plaid_views.PlaidController.create_link_token')
     mock_create_link_token.return_value = "fake-link-token"
 
-    payload = {"user_id": "test-user-id"}
-    response = client.post("/plaid/create_link_token", json=payload)
+    response = client.post("/plaid/create_link_token", json={}, headers=auth_headers)
     assert response.status_code == 200
     assert response.json["link_token"] == "fake-link-token"
+    mock_create_link_token.assert_called_once_with("test-user")
 
 
-def test_exchange_public_token(client, mocker):
+def test_link_endpoints_require_auth(client, mocker):
+    link_item = mocker.patch('app.controllers.sync_controller.SyncController.link_item')
+
+    response = client.post("/plaid/exchange_public_token", json={
+        "public_token": "fake-public-token", "user_id": "victim"})
+
+    assert response.status_code == 401
+    assert client.post("/plaid/create_link_token", json={"user_id": "victim"}).status_code == 401
+    link_item.assert_not_called()
+
+
+def test_exchange_public_token(client, mocker, auth_headers):
     # Mock the PlaidController's exchange_public_token
     mock_exchange_token = mocker.patch(
         'app.views.plaid_views.PlaidController.exchange_public_token')
     mock_exchange_token.return_value = ("fake-access-token", "fake-item-id")
 
-    # Mock the UserModel's update_item
+    # Mock the UserModel's get_user and update_item
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": None})
     mock_update_item = mocker.patch(
         'app.models.user_model.UserModel.update_item')
 
-    payload = {
-        "public_token": "fake-public-token",
-        "user_id": "test-user-id"
-    }
-    response = client.post("/plaid/exchange_public_token", json=payload)
+    payload = {"public_token": "fake-public-token"}
+    response = client.post("/plaid/exchange_public_token", json=payload, headers=auth_headers)
     assert response.status_code == 200
     assert response.json["message"] == "Bank account linked successfully"
-    assert response.json["access_token"] == "fake-access-token"
+    assert "access_token" not in response.json
+    assert mock_update_item.call_args.args[0] == "test-user"
 
 
-def test_get_user_bank_info(client, mocker):
+def test_get_user_bank_info(client, mocker, auth_headers):
     # Mock UserModel.get_user to return a valid user with access_token
     mock_get_user = mocker.patch('app.models.user_model.UserModel.get_user')
     mock_get_user.return_value = {
@@ -49,7 +60,7 @@ def test_get_user_bank_info(client, mocker):
     ]
 
     # Prepare request headers and body
-    headers = {"Authorization": "Bearer fake-access-token"}
+    headers = auth_headers
     data = {"user_id": "test-user"}
 
     # Send POST request to the endpoint
@@ -69,3 +80,22 @@ def test_get_user_bank_info(client, mocker):
     # Ensure the mocks were called with correct arguments
     mock_get_user.assert_called_once_with("test-user")
     mock_get_accounts.assert_called_once_with("fake-access-token")
+
+
+def test_requires_auth_rejects_invalid_token(client, mocker):
+    from app.utils.token_verifier import TokenVerificationError
+    mocker.patch('app.utils.token_verifier.CognitoTokenVerifier.verify',
+                 side_effect=TokenVerificationError("Invalid token: bad signature"))
+
+    headers = {"Authorization": "Bearer forged-token"}
+    response = client.post("/plaid/get_user_bank_info",
+                           json={"user_id": "test-user"}, headers=headers)
+
+    assert response.status_code == 401
+
+
+def test_requires_auth_rejects_other_users(client, auth_headers):
+    response = client.post("/plaid/get_user_bank_info",
+                           json={"user_id": "someone-else"}, headers=auth_headers)
+
+    assert response.status_code == 403
@@ -0,0 +1,124 @@
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import pytest
+from app.controllers.plaid_controller import PlaidController
+from app.utils.transaction_record import Transaction
+
+
+def _fake_transactions_get(total):
+    def transactions_get(request):
+        offset = request.options.offset
+        count = request.options.count
+        page = [SimpleNamespace(transaction_id=f"t{i}", amount=1.0)
+                for i in range(offset, min(offset + count, total))]
+        return SimpleNamespace(transactions=page, total_transactions=total)
+    return transactions_get
+
+
+def test_fetch_transactions_reads_every_page():
+    plaid_client = MagicMock()
+    plaid_client.transactions_get.side_effect = _fake_transactions_get(1234)
+    plaid_controller = PlaidController(plaid_client)
+
+    transactions = plaid_controller.fetch_transactions(
+        "fake-access-token", date(2024, 1, 1), date(2024, 12, 31))
+
+    assert len(transactions) == 1234
+    assert [t["transaction_id"] for t in transactions] == [
+        f"t{i}" for i in range(1234)]
+    assert plaid_client.transactions_get.call_count == 3
+
+
+def test_fetch_transactions_single_page():
+    plaid_client = MagicMock()
+    plaid_client.transactions_get.side_effect = _fake_transactions_get(3)
+    plaid_controller = PlaidController(plaid_client)
+
+    transactions = plaid_controller.fetch_transactions(
+        "fake-access-token", date(2024, 1, 1), date(2024, 1, 31),
+        account_ids=["acc-1"])
+
+    assert len(transactions) == 3
+    plaid_client.transactions_get.assert_called_once()
+    request = plaid_client.transactions_get.call_args.args[0]
+    assert request.options.account_ids == ["acc-1"]
+
+
+def test_build_dashboard_single_pass():
+    plaid_controller = PlaidController(MagicMock())
+    transactions = [
+        {"date": "2024-03-01", "amount": -1000.0, "category": ["Transfer"],
+         "name": "Payroll", "account_id": "acc-1"},
+        {"date": "2024-02-10", "amount": 40.0, "category": ["Food"],
+         "name": "Cafe", "account_id": "acc-1"},
+        {"date": "2024-02-20", "amount": 10.0, "category": None,
+         "name": "Cafe", "account_id": "acc-1"},
+        {"date": "2024-01-20", "amount": 15.0, "category": ["Food"],
+         "name": "Cafe", "account_id": "acc-1"},
+        {"date": "2023-12-31", "amount": 99.0, "category": ["Travel"],
+         "name": "Airline", "account_id": "acc-2"}
+    ]
+
+    dashboard = plaid_controller.build_dashboard(
+        transactions, today=date(2024, 3, 5))
+
+    assert dashboard["summary"] == {"income": 1000.0, "expenses": 50.0}
+    assert dashboard["monthly_summary"] == [
+        {"month": "Jan", "income": 0.0, "expenses": 15.0},
+        {"month": "Feb", "income": 0.0, "expenses": 50.0},
+        {"month": "Mar", "income": 1000.0, "expenses": 0.0}
+    ]
+    assert dashboard["expense_categories"]["total_expenses"] == 50.0
+    assert dashboard["expense_categories"]["total_categories"] == 2
+    # Three Cafe visits at irregular intervals are not a recurring charge
+    assert dashboard["recurring_transactions"]["acc-1"] == []
+
+
+def test_sync_transactions_projects_records():
+    plaid_client = MagicMock()
+    plaid_client.transactions_sync.return_value = SimpleNamespace(
+        added=[SimpleNamespace(
+            transaction_id="t1", account_id="acc-1", amount=12.5, date=date(2024, 3, 1),
+            name="Cafe", merchant_name=None, category=["Food and Drink"], pending=False,
+            location=SimpleNamespace(city="Boston"))],
+        modified=[],
+        removed=[SimpleNamespace(transaction_id="t0")],
+        has_more=False,
+        next_cursor="cursor-1")
+    plaid_controller = PlaidController(plaid_client)
+
+    deltas = plaid_controller.sync_transactions("fake-access-token")
+
+    added = deltas["added"][0]
+    assert added["amount"] == 12.5
+    assert added.get("category") == ["Food and Drink"]
+    assert added.get("location") is None
+    assert {**added}["date"] == date(2024, 3, 1)
+    assert deltas["removed"] == [{"transaction_id": "t0"}]
+    assert deltas["next_cursor"] == "cursor-1"
+
+
+def test_transaction_records_behave_like_dicts():
+    txn = Transaction("t1", amount=12.5, name="Cafe")
+
+    assert "name" in txn and "location" not in txn
+    assert list(txn) == list(Transaction.__slots__)
+    assert dict(txn.items()) == txn.to_dict() == dict(txn)
+    assert txn["amount"] == 12.5
+    # Methods and other attributes are not items
+    for key in ("get", "to_dict", "__slots__"):
+        with pytest.raises(KeyError):
+            txn[key]
+
+
+def test_get_liabilities_skips_missing_liability_types():
+    plaid_client = MagicMock()
+    plaid_client.liabilities_get.return_value.to_dict.return_value = {
+        "liabilities": {"credit": [{"account_id": "acc-1"}], "mortgage": None, "student": None}}
+    plaid_controller = PlaidController(plaid_client)
+
+    liabilities = plaid_controller.get_liabilities("fake-access-token")
+
+    assert liabilities["liabilities"]["credit"] == [{"account_id": "acc-1", "account_number": ""}]
+    assert liabilities["liabilities"]["mortgage"] is None
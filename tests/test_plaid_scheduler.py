@@ -0,0 +1,133 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+from plaid.exceptions import ApiException
+from plaid.model.accounts_get_request import AccountsGetRequest
+from app.utils.plaid_scheduler import PlaidScheduler, PlaidRateLimitError, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_queues_then_rejects():
+    clock = FakeClock()
+    bucket = TokenBucket(60, capacity=2, clock=clock)
+
+    assert bucket.reserve(max_wait=5) == 0
+    assert bucket.reserve(max_wait=5) == 0
+    assert bucket.reserve(max_wait=5) == pytest.approx(1.0)
+    assert bucket.reserve(max_wait=1.5) is None
+
+
+def test_per_item_bucket_throttles_and_records_delay():
+    clock = FakeClock()
+    scheduler = PlaidScheduler({'accounts_get': (600, 2)}, max_wait=60,
+                               clock=clock, sleep=clock.sleep)
+    client = scheduler.wrap(MagicMock())
+
+    for _ in range(3):
+        client.accounts_get(AccountsGetRequest(access_token="token-1"))
+    client.accounts_get(AccountsGetRequest(access_token="token-2"))
+
+    metrics = scheduler.metrics()['accounts_get']
+    assert metrics['calls'] == 4
+    assert metrics['queue_delay_max'] == pytest.approx(30.0)
+
+
+def test_rejects_calls_that_would_wait_too_long():
+    clock = FakeClock()
+    scheduler = PlaidScheduler({'accounts_get': (600, 1)}, max_wait=5,
+                               clock=clock, sleep=clock.sleep)
+    client = scheduler.wrap(MagicMock())
+    client.accounts_get(AccountsGetRequest(access_token="token-1"))
+
+    with pytest.raises(PlaidRateLimitError) as e:
+        client.accounts_get(AccountsGetRequest(access_token="token-1"))
+    assert e.value.retry_after == pytest.approx(60.0)
+
+
+def test_rate_limit_responses_are_retried_with_backoff():
+    delays = []
+    scheduler = PlaidScheduler(max_retries=2, base_delay=0.5, sleep=delays.append)
+    plaid_client = MagicMock()
+    plaid_client.liabilities_get.side_effect = [
+        ApiException(status=429), ApiException(status=429), "liabilities"]
+
+    result = scheduler.wrap(plaid_client).liabilities_get(
+        AccountsGetRequest(access_token="token-1"))
+
+    assert result == "liabilities"
+    assert delays == [0.5, 1.0]
+
+
+def test_concurrent_identical_reads_share_one_call():
+    scheduler = PlaidScheduler()
+    started, release = threading.Event(), threading.Event()
+    plaid_client = MagicMock()
+
+    def accounts_get(request):
+        started.set()
+        release.wait(1)
+        return "accounts"
+
+    plaid_client.accounts_get.side_effect = accounts_get
+    client = scheduler.wrap(plaid_client)
+    request = AccountsGetRequest(access_token="token-1")
+    results = []
+
+    leader = threading.Thread(target=lambda: results.append(client.accounts_get(request)))
+    leader.start()
+    started.wait(1)
+    follower = threading.Thread(target=lambda: results.append(client.accounts_get(request)))
+    follower.start()
+    while not scheduler.flights.shared:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert results == ["accounts", "accounts"]
+    assert plaid_client.accounts_get.call_count == 1
+
+
+def test_rate_limited_endpoint_returns_429(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": "fake-access-token"})
+    mocker.patch('app.controllers.plaid_controller.PlaidController.get_accounts',
+                 side_effect=PlaidRateLimitError('accounts_get', 12.3))
+
+    response = client.post("/plaid/get_user_bank_info",
+                           json={"user_id": "test-user"}, headers=auth_headers)
+
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == "13"
+
+
+def test_rate_limits_from_the_store_sync_also_return_429(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": "fake-access-token"})
+    mocker.patch('app.controllers.sync_controller.SyncController.sync_user',
+                 side_effect=PlaidRateLimitError('transactions_sync', 2))
+
+    response = client.post("/plaid/transactions/sync",
+                           json={"user_id": "test-user"}, headers=auth_headers)
+
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == "2"
+
+
+def test_scheduler_metrics_use_the_metrics_token(app, client, auth_headers):
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+
+    # A user's token is not enough
+    assert client.get("/plaid/scheduler/metrics", headers=auth_headers).status_code == 401
+    assert client.get("/plaid/scheduler/metrics", headers={
+        "Authorization": "Bearer scrape-secret"}).status_code == 200
@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock
+from app.utils.recurring_detector import RecurringDetector, normalize_merchant
+from app.controllers.recurring_controller import RecurringController
+
+
+def monthly(name, amounts, start_month=1, prefix="t"):
+    return [
+        {"transaction_id": f"{prefix}{i}", "name": name, "amount": amount,
+         "date": f"2024-{start_month + i:02d}-05"}
+        for i, amount in enumerate(amounts)
+    ]
+
+
+def test_normalize_merchant_strips_processor_noise():
+    assert normalize_merchant("SQ *BLUE BOTTLE #1234") == "blue bottle"
+    assert normalize_merchant("Blue Bottle 5678") == "blue bottle"
+    assert normalize_merchant("POS DEBIT Netflix.com 03/05") == "netflix"
+
+
+def test_detects_monthly_charge_with_stable_amount():
+    detector = RecurringDetector()
+    detector.update(monthly("NETFLIX.COM 123", [15.49, 15.49, 15.49, 15.49]))
+    detector.update([
+        {"transaction_id": "c1", "name": "Cafe", "amount": 4.0, "date": "2024-01-02"},
+        {"transaction_id": "c2", "name": "Cafe", "amount": 12.0, "date": "2024-01-19"},
+        {"transaction_id": "c3", "name": "Cafe", "amount": 7.0, "date": "2024-01-21"}
+    ])
+
+    recurring = detector.recurring()
+
+    assert [result["merchant"] for result in recurring] == ["netflix"]
+    assert recurring[0]["frequency"] == "monthly"
+    assert recurring[0]["score"] == 1.0
+    assert recurring[0]["next_date"] == "2024-05-05"
+
+
+def test_income_and_refunds_are_not_subscriptions():
+    detector = RecurringDetector()
+    # Plaid signs inflows negative
+    detector.update(monthly("ACME PAYROLL", [-2500.0, -2500.0, -2500.0, -2500.0]))
+    detector.update(monthly("Gym", [30.0, 30.0, 30.0], prefix="g"))
+
+    assert [result["merchant"] for result in detector.recurring()] == ["gym"]
+
+    # A charge that turns into a refund leaves the series
+    detector.update([{"transaction_id": "g2", "name": "Gym", "amount": -30.0, "date": "2024-03-05"}])
+    assert detector.pop_changes() == ([], ["gym"])
+
+
+def test_incremental_updates_only_rescore_touched_merchants():
+    detector = RecurringDetector()
+    detector.update(monthly("Gym", [30.0, 30.0]))
+    assert detector.pop_changes() == ([], [])
+
+    detector.update(monthly("Gym", [30.0], start_month=3, prefix="new"))
+    recurring, dropped = detector.pop_changes()
+    assert recurring[0]["occurrences"] == 3
+
+    detector.remove(["new0"])
+    assert detector.pop_changes() == ([], ["gym"])
+
+
+def test_apply_sync_writes_detected_subscriptions():
+    transaction_model = MagicMock()
+    transaction_model.iter_transactions.return_value = monthly(
+        "Spotify", [9.99, 9.99, 9.99])
+    subscription_model = MagicMock()
+    controller = RecurringController(transaction_model, subscription_model)
+
+    counts = controller.apply_sync("test-user", [], [])
+
+    assert counts == {"detected": 1, "dropped": 0}
+    item = subscription_model.add_subscriptions.call_args.args[0][0]
+    assert item["subscription_id"] == "test-user#spotify"
+    assert item["frequency"] == "monthly"
+
+    # Later syncs reuse the cached state instead of rescanning the store
+    controller.apply_sync("test-user", [], ["t2"])
+    transaction_model.iter_transactions.assert_called_once()
+    subscription_model.delete_subscription.assert_called_once_with(
+        "test-user", "test-user#spotify")
+
+
+def test_rebuilt_detector_drops_stored_subscriptions_that_stopped():
+    transaction_model = MagicMock()
+    transaction_model.iter_transactions.return_value = monthly("Spotify", [9.99, 9.99])
+    subscription_model = MagicMock()
+    subscription_model.iter_subscriptions.return_value = [
+        {"merchant": "spotify", "source": "detected"},
+        {"merchant": "netflix", "source": "detected"},
+        {"merchant": "rent", "source": "manual"}]
+    controller = RecurringController(transaction_model, subscription_model)
+
+    # A cold cache (new process or expired state) rebuilds from the store
+    counts = controller.apply_sync("test-user", [], ["t2"])
+
+    assert counts == {"detected": 0, "dropped": 2}
+    deleted = {call.args[1] for call in subscription_model.delete_subscription.call_args_list}
+    assert deleted == {"test-user#spotify", "test-user#netflix"}
@@ -0,0 +1,66 @@
+from app.utils.request_metrics import MetricsRegistry, timed
+
+
+def _bank_info(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": "fake-access-token"})
+
+    def get_accounts(access_token):
+        with timed('plaid'):
+            with timed('plaid'):
+                return [{"account_id": "12345"}]
+
+    mocker.patch('app.views.plaid_views.PlaidController.get_accounts', side_effect=get_accounts)
+    return client.post("/plaid/get_user_bank_info", json={}, headers=auth_headers)
+
+
+def test_server_timing_header_is_opt_in(app, client, mocker, auth_headers):
+    assert 'Server-Timing' not in _bank_info(client, mocker, auth_headers).headers
+
+
+def test_server_timing_header_breaks_down_request(app, client, mocker, auth_headers):
+    app.config['SERVER_TIMING_HEADER'] = True
+    response = _bank_info(client, mocker, auth_headers)
+
+    assert response.status_code == 200
+    entries = [entry.split(';')[0] for entry in response.headers['Server-Timing'].split(', ')]
+    assert entries == ['plaid', 'serialize', 'total']
+
+
+def test_metrics_endpoint_exports_request_histograms(app, client, mocker, auth_headers):
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+    _bank_info(client, mocker, auth_headers)
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert ('spendwise_request_duration_seconds_count{endpoint="/plaid/get_user_bank_info",'
+            'method="POST",status="200"} 1') in body
+    assert ('spendwise_request_phase_seconds_count{endpoint="/plaid/get_user_bank_info",'
+            'phase="plaid"} 1') in body
+    assert "# TYPE spendwise_plaid_calls_total counter" in body
+
+
+def test_metrics_endpoint_requires_token(app, client):
+    # Disabled until a token is configured
+    assert client.get("/metrics").status_code == 404
+
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={
+        "Authorization": "Bearer scrape-secret"}).status_code == 200
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe('/x', 'GET', 200, 0.05, {})
+    registry.observe('/x', 'GET', 200, 0.5, {})
+
+    body = registry.render()
+
+    assert 'spendwise_request_duration_seconds_bucket{endpoint="/x",method="GET",status="200",le="0.1"} 1' in body
+    assert 'spendwise_request_duration_seconds_bucket{endpoint="/x",method="GET",status="200",le="1.0"} 2' in body
+    assert 'spendwise_request_duration_seconds_bucket{endpoint="/x",method="GET",status="200",le="+Inf"} 2' in body
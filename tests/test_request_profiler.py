@@ -0,0 +1,92 @@
+import marshal
+import threading
+import time
+from app.utils.request_profiler import RequestProfiler, ProfileStore, StackSampler
+
+SECRET = "profile-secret"
+
+
+def _use_profiler(app, tmp_path, **options):
+    app.request_profiler = RequestProfiler(ProfileStore(str(tmp_path)), secret=SECRET, **options)
+    return app.request_profiler
+
+
+def _bank_info(client, mocker, auth_headers, headers=None):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": "fake-access-token"})
+    mocker.patch('app.views.plaid_views.PlaidController.get_accounts',
+                 return_value=[{"account_id": "12345"}])
+    return client.post("/plaid/get_user_bank_info", json={},
+                       headers={**auth_headers, **(headers or {})})
+
+
+def test_profile_header_captures_request(app, client, mocker, auth_headers, tmp_path):
+    _use_profiler(app, tmp_path)
+
+    response = _bank_info(client, mocker, auth_headers, {"X-Profile-Request": SECRET})
+
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+    admin = {"Authorization": f"Bearer {SECRET}"}
+    profiles = client.get("/admin/profiles", headers=admin).get_json()['profiles']
+    assert [(p['profile_id'], p['endpoint'], p['user_id'], p['trigger'], p['mode'])
+            for p in profiles] == [
+        (profile_id, '/plaid/get_user_bank_info', 'test-user', 'header', 'sample')]
+    download = client.get(f"/admin/profiles/{profile_id}/collapsed", headers=admin)
+    assert download.status_code == 200
+    assert download.headers['Content-Disposition'].endswith(f'{profile_id}.collapsed')
+
+
+def test_cprofile_mode_stores_pstats(app, client, mocker, auth_headers, tmp_path):
+    _use_profiler(app, tmp_path)
+
+    response = _bank_info(client, mocker, auth_headers, {
+        "X-Profile-Request": SECRET, "X-Profile-Mode": "cprofile"})
+
+    download = client.get(f"/admin/profiles/{response.headers['X-Profile-Id']}/pstats",
+                          headers={"Authorization": f"Bearer {SECRET}"})
+    stats = marshal.loads(download.get_data())
+    assert any(function == 'get_user_bank_info' for _, _, function in stats)
+
+
+def test_requests_are_not_profiled_without_secret_or_sampling(app, client, mocker, auth_headers,
+                                                              tmp_path):
+    _use_profiler(app, tmp_path)
+
+    response = _bank_info(client, mocker, auth_headers, {"X-Profile-Request": "wrong"})
+
+    assert 'X-Profile-Id' not in response.headers
+    assert client.get("/admin/profiles").status_code == 401
+    assert client.get("/admin/profiles", headers={
+        "Authorization": "Bearer wrong"}).status_code == 401
+
+
+def test_sampling_is_limited_to_configured_endpoints(app, tmp_path):
+    profiler = _use_profiler(app, tmp_path, sample_rate=1.0, endpoints=['/plaid/'])
+
+    assert profiler.trigger('/plaid/get_account_details', {}) == 'sample'
+    assert profiler.trigger('/auth/login', {}) is None
+
+
+def test_store_keeps_only_newest_profiles(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+
+    ids = []
+    for number in range(3):
+        ids.append(store.save({'number': number}, {'collapsed': b"main 1\n"}))
+
+    assert [profile['number'] for profile in store.list()] == [2, 1]
+    assert store.file_path(ids[0], 'collapsed') is None
+    assert store.file_path('../etc/passwd', 'collapsed') is None
+
+
+def test_stack_sampler_collapses_stacks():
+    sampler = StackSampler(threading.get_ident(), interval=0.001)
+    sampler.start()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    sampler.stop()
+
+    assert sampler.samples > 0
+    assert 'test_stack_sampler_collapses_stacks' in sampler.collapsed()
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+from app.utils.response_cache import MemoryBackend, ResponseCache
+
+
+class ImmediateExecutor:
+    def submit(self, fn):
+        fn()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(clock):
+    cache = ResponseCache(MemoryBackend(clock=clock), ttl=60,
+                          past_ttl=3600, stale_ttl=300, clock=clock)
+    cache.executor = ImmediateExecutor()
+    return cache
+
+
+def test_hit_skips_compute_and_params_are_normalized():
+    cache = make_cache(FakeClock())
+    compute = MagicMock(return_value={"income": 1.0})
+
+    cache.get_or_compute("item-1", "summary", {"a": 1, "b": 2}, compute)
+    payload = cache.get_or_compute("item-1", "summary", {"b": 2, "a": 1}, compute)
+
+    assert payload == {"income": 1.0}
+    compute.assert_called_once()
+
+
+def test_stale_entry_is_served_while_it_refreshes():
+    clock = FakeClock()
+    cache = make_cache(clock)
+    cache.get_or_compute("item-1", "summary", {}, lambda: {"version": 1})
+
+    clock.now += 120  # past the 60s TTL but within the stale window
+    stale = cache.get_or_compute("item-1", "summary", {}, lambda: {"version": 2})
+    fresh = cache.get_or_compute("item-1", "summary", {}, lambda: {"version": 3})
+
+    assert stale == {"version": 1}
+    assert fresh == {"version": 2}
+
+
+def test_invalidate_bumps_the_item_generation():
+    cache = make_cache(FakeClock())
+    cache.get_or_compute("item-1", "summary", {}, lambda: {"version": 1})
+    cache.get_or_compute("item-2", "summary", {}, lambda: {"version": 1})
+
+    cache.invalidate("item-1")
+
+    assert cache.get_or_compute("item-1", "summary", {}, lambda: {"version": 2}) == {"version": 2}
+    assert cache.get_or_compute("item-2", "summary", {}, lambda: {"version": 2}) == {"version": 1}
+
+
+def test_past_windows_are_cached_longer():
+    cache = make_cache(FakeClock())
+
+    assert cache.ttl_for(date.today()) == 60
+    assert cache.ttl_for(date.today() - timedelta(days=40)) == 3600
+
+
+def test_summary_endpoint_is_cached(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": "fake-access-token", "item_id": "item-1"})
+    mock_get_transactions = mocker.patch(
+        'app.controllers.sync_controller.SyncController.get_transactions',
+        return_value=[{"date": "2024-01-03", "amount": 25.5, "category": ["Food"], "name": "Cafe"}])
+
+    body = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+    first = client.post("/plaid/transactions/summary", json=body, headers=auth_headers)
+    second = client.post("/plaid/transactions/summary", json=body, headers=auth_headers)
+
+    assert first.json == second.json
+    assert second.json["expenses"] == 25.5
+    mock_get_transactions.assert_called_once()
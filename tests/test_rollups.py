@@ -0,0 +1,120 @@
+import threading
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+from app.controllers.rollup_controller import RollupController
+from app.controllers.sync_controller import SyncController
+from app.utils.keyed_lock import KeyedLock
+from app.models.rollup_model import RollupModel, compute_rollup_deltas
+
+
+def test_compute_rollup_deltas_replaces_old_versions():
+    old_items = [
+        {"transaction_id": "t1", "date": "2024-02-03",
+            "amount": Decimal("20.00"), "category": ["Food"]}
+    ]
+    new_items = [
+        {"transaction_id": "t1", "date": "2024-02-03",
+            "amount": Decimal("25.50"), "category": ["Food"]},
+        {"transaction_id": "t2", "date": "2024-03-01",
+            "amount": Decimal("-1000"), "category": ["Transfer"]}
+    ]
+
+    deltas = compute_rollup_deltas(new_items, old_items)
+
+    assert deltas["2024-02"]["expenses"] == Decimal("5.50")
+    assert deltas["2024-02"]["transaction_count"] == 0
+    assert deltas["2024-02"]["categories"]["Food"] == Decimal("5.50")
+    assert deltas["2024-03"]["income"] == Decimal("1000")
+    assert deltas["2024-03"]["transaction_count"] == 1
+
+
+def test_apply_deltas_uses_atomic_add():
+    dynamodb = MagicMock()
+    table = dynamodb.Table.return_value
+    rollup_model = RollupModel(dynamodb)
+
+    rollup_model.apply_deltas("test-user", compute_rollup_deltas([
+        {"date": "2024-02-03", "amount": Decimal("12"), "category": ["Food"]}
+    ], []))
+
+    kwargs = table.update_item.call_args.kwargs
+    assert kwargs["Key"] == {"user_id": "test-user", "month": "2024-02"}
+    assert kwargs["UpdateExpression"].startswith("ADD ")
+    assert "category:Food" in kwargs["ExpressionAttributeNames"].values()
+
+
+def test_rollup_controller_formats_reads():
+    rollup_model = MagicMock()
+    rollup_model.get_rollups.return_value = [
+        {"month": "2024-02", "income": 0.0, "expenses": 50.0,
+            "transaction_count": 2, "categories": {"Food": 50.0}},
+        {"month": "2024-01", "income": 1000.0, "expenses": 15.0,
+            "transaction_count": 2, "categories": {"Food": 15.0}}
+    ]
+    rollup_model.get_rollup.return_value = rollup_model.get_rollups.return_value[0]
+    rollup_controller = RollupController(rollup_model)
+
+    assert rollup_controller.get_monthly_summary("test-user", 2024) == [
+        {"month": "Jan", "income": 1000.0, "expenses": 15.0},
+        {"month": "Feb", "income": 0.0, "expenses": 50.0}
+    ]
+    assert rollup_controller.get_expense_categories("test-user", date(2024, 2, 1)) == {
+        "categories": [{"category": "Food", "amount": 50.0}],
+        "total_categories": 1,
+        "total_expenses": 50.0
+    }
+    rollup_model.get_rollup.assert_called_once_with("test-user", "2024-02")
+
+
+def test_rebuild_overwrites_rollups_and_drops_empty_months():
+    dynamodb = MagicMock()
+    table = dynamodb.Table.return_value
+    table.query.return_value = {"Items": [{"month": "2024-01"}, {"month": "2024-02"}]}
+    batch = table.batch_writer.return_value.__enter__.return_value
+    transaction_model = MagicMock()
+    transaction_model.iter_stored_items.return_value = iter([
+        {"date": "2024-02-03", "amount": Decimal("25.50"), "category": ["Food"]}
+    ])
+
+    result = RollupController(RollupModel(dynamodb), transaction_model).rebuild("test-user")
+
+    assert result == {"months": 1}
+    item = batch.put_item.call_args.kwargs["Item"]
+    assert item["month"] == "2024-02"
+    assert item["category:Food"] == Decimal("25.50")
+    batch.delete_item.assert_called_once_with(
+        Key={"user_id": "test-user", "month": "2024-01"})
+
+
+def test_rebuild_waits_for_a_running_sync_of_the_same_user():
+    user_locks = KeyedLock()
+    fetching, release = threading.Event(), threading.Event()
+
+    def sync_transactions(access_token, cursor):
+        fetching.set()
+        release.wait(1)
+        return {"added": [], "modified": [], "removed": [], "next_cursor": "cursor-1"}
+
+    plaid_controller = MagicMock()
+    plaid_controller.sync_transactions.side_effect = sync_transactions
+    sync_controller = SyncController(plaid_controller, MagicMock(), MagicMock(), user_locks=user_locks)
+    transaction_model = MagicMock()
+    transaction_model.iter_stored_items.return_value = iter([])
+    rollup_controller = RollupController(MagicMock(), transaction_model, user_locks=user_locks)
+
+    sync = threading.Thread(target=sync_controller.sync_user, args=(
+        {"user_id": "test-user", "access_token": "fake-access-token"},))
+    sync.start()
+    fetching.wait(1)
+    rebuild = threading.Thread(target=rollup_controller.rebuild, args=("test-user",))
+    rebuild.start()
+    rebuild.join(0.1)
+
+    assert rebuild.is_alive()
+    transaction_model.iter_stored_items.assert_not_called()
+    release.set()
+    sync.join(1)
+    rebuild.join(1)
+    transaction_model.iter_stored_items.assert_called_once()
+    assert user_locks.in_use() == 0
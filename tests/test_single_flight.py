@@ -0,0 +1,75 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from app.utils.single_flight import SingleFlight
+from app.utils.ttl_cache import TTLCache
+from app.models.user_model import UserModel
+
+
+def run_concurrently(count, target):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    results, errors = run_concurrently(8, lambda: flights.do("key", load))
+
+    assert results == ["value"] * 8
+    assert errors == []
+    assert len(calls) == 1
+    assert flights.shared == 7
+    assert flights.in_flight() == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_remembered():
+    flights = SingleFlight()
+
+    def fail():
+        time.sleep(0.05)
+        raise Exception("Error fetching accounts: boom")
+
+    results, errors = run_concurrently(4, lambda: flights.do("key", fail))
+
+    assert results == []
+    assert len(errors) == 4 and all("boom" in str(e) for e in errors)
+    assert flights.do("key", lambda: "retried") == "retried"
+
+
+def test_get_user_collapses_concurrent_cache_misses():
+    dynamodb = MagicMock()
+    table = dynamodb.Table.return_value
+
+    def get_item(Key):
+        time.sleep(0.05)
+        return {"Item": {"user_id": Key["user_id"], "access_token": "token"}}
+
+    table.get_item.side_effect = get_item
+    user_model = UserModel(dynamodb, cache=TTLCache(), flights=SingleFlight())
+
+    results, _ = run_concurrently(6, lambda: user_model.get_user("test-user"))
+
+    assert len(results) == 6
+    table.get_item.assert_called_once()
+    # Each caller still gets its own copy
+    assert len({id(user) for user in results}) == 6
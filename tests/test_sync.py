@@ -0,0 +1,298 @@
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+import pytest
+from botocore.exceptions import ClientError
+from app.controllers.sync_controller import SyncController, BulkImportError
+from app.models.user_model import UserModel
+from app.utils.ttl_cache import TTLCache
+
+
+def test_sync_user_applies_deltas_and_saves_cursor():
+    plaid_controller = MagicMock()
+    plaid_controller.sync_transactions.return_value = {
+        "added": [{"transaction_id": "t1", "amount": 10.0}],
+        "modified": [{"transaction_id": "t2", "amount": 5.0}],
+        "removed": [{"transaction_id": "t3"}],
+        "next_cursor": "cursor-2"
+    }
+    user_model = MagicMock()
+    transaction_model = MagicMock()
+    sync_controller = SyncController(
+        plaid_controller, user_model, transaction_model)
+
+    user = {"user_id": "test-user", "access_token": "fake-access-token",
+            "item_id": "fake-item-id", "transactions_cursor": "cursor-1"}
+    counts = sync_controller.sync_user(user)
+
+    assert counts == {"added": 1, "modified": 1, "removed": 1}
+    plaid_controller.sync_transactions.assert_called_once_with(
+        "fake-access-token", "cursor-1")
+    transaction_model.put_transactions.assert_called_once_with(
+        "test-user", "fake-item-id",
+        [{"transaction_id": "t1", "amount": 10.0},
+         {"transaction_id": "t2", "amount": 5.0}], workers=1)
+    transaction_model.delete_transactions.assert_called_once_with(
+        "test-user", ["t3"])
+    user_id, item_id, old_cursor, new_cursor, _ = user_model.advance_cursor.call_args.args
+    assert (user_id, item_id, old_cursor, new_cursor) == (
+        "test-user", "fake-item-id", "cursor-1", "cursor-2")
+    assert user["transactions_cursor"] == "cursor-2"
+
+
+def _racing_sync_controller():
+    plaid_controller = MagicMock()
+    plaid_controller.sync_transactions.return_value = {
+        "added": [{"transaction_id": "t1", "amount": 10.0, "date": "2024-01-02"}],
+        "modified": [], "removed": [], "next_cursor": "cursor-2"}
+    user_model = MagicMock()
+    transaction_model = MagicMock()
+    transaction_model.get_stored_items.return_value = []
+    rollup_model = MagicMock()
+    controller = SyncController(plaid_controller, user_model, transaction_model, rollup_model=rollup_model)
+    return controller, user_model, transaction_model, rollup_model
+
+
+def test_sync_that_loses_the_cursor_race_writes_nothing():
+    controller, user_model, transaction_model, rollup_model = _racing_sync_controller()
+    user_model.advance_cursor.return_value = False
+    user_model.get_user.return_value = {
+        "user_id": "test-user", "transactions_cursor": "cursor-2",
+        "transactions_synced_at": "2024-01-02T00:00:00"}
+
+    user = {"user_id": "test-user", "access_token": "fake-access-token",
+            "item_id": "item-1", "transactions_cursor": "cursor-1"}
+    counts = controller.sync_user(user)
+
+    assert counts == {"added": 0, "modified": 0, "removed": 0}
+    transaction_model.put_transactions.assert_not_called()
+    rollup_model.apply_deltas.assert_not_called()
+    # The caller picks up the cursor the winning sync saved
+    assert user["transactions_cursor"] == "cursor-2"
+
+
+def test_failed_write_hands_the_cursor_back():
+    controller, user_model, transaction_model, rollup_model = _racing_sync_controller()
+    user_model.advance_cursor.return_value = True
+    transaction_model.put_transactions.side_effect = RuntimeError("throttled")
+
+    user = {"user_id": "test-user", "access_token": "fake-access-token",
+            "item_id": "item-1", "transactions_cursor": "cursor-1"}
+    with pytest.raises(RuntimeError):
+        controller.sync_user(user)
+
+    claim, release = user_model.advance_cursor.call_args_list
+    assert claim.args[2:4] == ("cursor-1", "cursor-2")
+    assert release.args[2:4] == ("cursor-2", "cursor-1")
+    rollup_model.apply_deltas.assert_not_called()
+
+
+class _StoreFakes:
+    """
+    In-memory transaction store and rollups, enough to run a sync end to end.
+    """
+
+    def __init__(self):
+        self.stored = {}
+        self.rollups = {}
+        self.fail_next_rollup = False
+
+    def put_transactions(self, user_id, item_id, transactions, workers=1):
+        items = [dict(txn, amount=Decimal(str(txn["amount"]))) for txn in transactions]
+        self.stored.update((item["transaction_id"], item) for item in items)
+        return items
+
+    def get_stored_items(self, user_id, transaction_ids):
+        return [self.stored[i] for i in transaction_ids if i in self.stored]
+
+    def iter_stored_items(self, user_id, projection=None, start_date=None, end_date=None):
+        return iter([item for item in self.stored.values()
+                     if start_date <= item["date"] <= end_date])
+
+    def apply_deltas(self, user_id, deltas):
+        if self.fail_next_rollup:
+            self.fail_next_rollup = False
+            raise RuntimeError("rollup write failed")
+        for month, delta in deltas.items():
+            self.rollups[month] = self.rollups.get(month, Decimal("0")) + delta["expenses"]
+
+    def replace_rollups(self, user_id, totals, months=None):
+        for month in months:
+            self.rollups.pop(month, None)
+        self.rollups.update((month, total["expenses"]) for month, total in totals.items())
+
+
+def test_sync_retry_after_a_failed_rollup_write_keeps_totals_right():
+    store = _StoreFakes()
+    store.put_transactions("test-user", "item-1", [
+        {"transaction_id": "t1", "amount": 5, "date": "2024-01-02"}])
+    store.rollups["2024-01"] = Decimal("5")
+    plaid_controller = MagicMock()
+    plaid_controller.sync_transactions.return_value = {
+        "added": [{"transaction_id": "t2", "amount": 10, "date": "2024-01-03"}],
+        "modified": [{"transaction_id": "t1", "amount": 7, "date": "2024-01-02"}],
+        "removed": [], "next_cursor": "cursor-2"}
+    user_model = MagicMock()
+    controller = SyncController(plaid_controller, user_model, store, rollup_model=store)
+    user = {"user_id": "test-user", "access_token": "fake-access-token",
+            "item_id": "item-1", "transactions_cursor": "cursor-1"}
+
+    store.fail_next_rollup = True
+    with pytest.raises(RuntimeError):
+        controller.sync_user(dict(user))
+    # The transactions were written before the rollups failed, and the
+    # cursor was handed back
+    assert user_model.advance_cursor.call_args.args[2:4] == ("cursor-2", "cursor-1")
+
+    controller.sync_user(dict(user))
+
+    assert store.rollups == {"2024-01": Decimal("17")}
+
+
+def test_advance_cursor_is_conditional_on_the_old_cursor_and_item():
+    dynamodb = MagicMock()
+    table = dynamodb.Table.return_value
+    user_model = UserModel(dynamodb, cache=TTLCache())
+
+    assert user_model.advance_cursor("test-user", "item-1", "cursor-1", "cursor-2", "now")
+    kwargs = table.update_item.call_args.kwargs
+    assert kwargs["ConditionExpression"] == \
+        "transactions_cursor = :old_cursor AND item_id = :item_id"
+    assert kwargs["ExpressionAttributeValues"][":old_cursor"] == "cursor-1"
+
+    user_model.advance_cursor("test-user", "item-1", None, "cursor-1", "now")
+    assert "attribute_not_exists(transactions_cursor)" in \
+        table.update_item.call_args.kwargs["ConditionExpression"]
+
+    table.update_item.side_effect = ClientError(
+        {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem")
+    assert user_model.advance_cursor("test-user", "item-1", "cursor-1", "cursor-2", "now") is False
+
+
+def _import_controller():
+    transaction_model = MagicMock()
+    transaction_model.get_stored_items.return_value = []
+    transaction_model.put_transactions.side_effect = \
+        lambda user_id, item_id, txns, workers=1: [dict(txn) for txn in txns]
+    rollup_model, recurring_controller, response_cache = MagicMock(), MagicMock(), MagicMock()
+    controller = SyncController(
+        MagicMock(), MagicMock(), transaction_model, rollup_model=rollup_model,
+        recurring_controller=recurring_controller, response_cache=response_cache)
+    return controller, transaction_model, rollup_model, recurring_controller, response_cache
+
+
+def test_import_updates_rollups_subscriptions_and_cache():
+    controller, transaction_model, rollups, recurring, cache = _import_controller()
+    user = {"user_id": "test-user", "item_id": "item-1"}
+    rows = [{"transaction_id": "t1", "amount": 5, "date": "2024-01-02"},
+            {"transaction_id": "t2", "amount": 7, "date": "2024-01-03"},
+            {"transaction_id": "t1", "amount": 9, "date": "2024-01-02"}]
+
+    written = controller.import_transactions(user, rows, chunk_size=2)
+
+    assert written == 2
+    # The later copy of t1 (in the second chunk) replaces the first one
+    chunks = [call.args[2] for call in transaction_model.put_transactions.call_args_list]
+    assert [[txn["amount"] for txn in chunk] for chunk in chunks] == [[5, 7], [9]]
+    # Imported rows are not tied to the Plaid item
+    assert all(call.args[1] is None for call in transaction_model.put_transactions.call_args_list)
+    assert rollups.apply_deltas.call_count == 2
+    assert recurring.apply_sync.call_count == 2
+    cache.invalidate.assert_called_with("item-1")
+
+
+def test_import_reports_rows_written_before_an_invalid_one():
+    controller, transaction_model, *_ = _import_controller()
+    rows = [{"transaction_id": "t1", "amount": 5, "date": "2024-01-02"},
+            {"transaction_id": "t2", "amount": 7, "date": "2024-01-03"},
+            {"transaction_id": "t3", "amount": "seven", "date": "2024-01-03"}]
+
+    with pytest.raises(BulkImportError) as error:
+        controller.import_transactions({"user_id": "test-user"}, rows, chunk_size=2)
+
+    assert error.value.written == 2
+    assert "transaction 2" in str(error.value)
+    # The chunk holding the invalid row was not written at all
+    assert transaction_model.put_transactions.call_count == 1
+
+
+def test_get_transactions_skips_sync_when_fresh():
+    plaid_controller = MagicMock()
+    transaction_model = MagicMock()
+    transaction_model.get_transactions.return_value = []
+    sync_controller = SyncController(
+        plaid_controller, MagicMock(), transaction_model, max_age=300)
+
+    user = {"user_id": "test-user", "access_token": "fake-access-token",
+            "transactions_cursor": "cursor-1",
+            "transactions_synced_at": datetime.utcnow().isoformat()}
+    sync_controller.get_transactions(user)
+
+    plaid_controller.sync_transactions.assert_not_called()
+    transaction_model.get_transactions.assert_called_once()
+
+
+def test_transactions_summary_reads_local_store(client, mocker, auth_headers):
+    mocker.patch('app.models.user_model.UserModel.get_user', return_value={
+        "user_id": "test-user", "access_token": "fake-access-token"})
+    mocker.patch('app.controllers.sync_controller.SyncController.get_transactions', return_value=[
+        {"date": "2024-01-02", "amount": -100.0,
+            "category": ["Transfer"], "name": "Payroll"},
+        {"date": "2024-01-03", "amount": 25.5,
+            "category": ["Food"], "name": "Cafe"}
+    ])
+    mock_fetch = mocker.patch(
+        'app.views.plaid_views.PlaidController.fetch_transactions')
+
+    response = client.post("/plaid/transactions/summary",
+                           json={"user_id": "test-user"}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json["income"] == 100.0
+    assert response.json["expenses"] == 25.5
+    mock_fetch.assert_not_called()
+
+
+def test_relink_purges_the_replaced_items_transactions():
+    transaction_model = MagicMock()
+    transaction_model.iter_stored_items.return_value = iter([
+        {"transaction_id": "t1", "item_id": "old-item"},
+        {"transaction_id": "t2", "item_id": None},
+        {"transaction_id": "t3", "item_id": "old-item"}])
+    stored = [{"transaction_id": "t1", "date": "2024-01-02", "amount": Decimal("5"), "category": ["Food"]},
+              {"transaction_id": "t3", "date": "2024-01-03", "amount": Decimal("7"), "category": ["Food"]}]
+    transaction_model.get_stored_items.return_value = stored
+    user_model, rollup_model, recurring, cache = MagicMock(), MagicMock(), MagicMock(), MagicMock()
+    controller = SyncController(
+        MagicMock(), user_model, transaction_model, rollup_model=rollup_model,
+        recurring_controller=recurring, response_cache=cache)
+
+    purged = controller.link_item(
+        {"user_id": "test-user", "item_id": "old-item"}, "new-access-token", "new-item")
+
+    assert purged == 2
+    user_model.update_item.assert_called_once_with(
+        "test-user", access_token="new-access-token", item_id="new-item",
+        transactions_cursor=None, transactions_synced_at=None)
+    # Imported rows (no item_id) stay
+    transaction_model.delete_transactions.assert_called_once_with("test-user", ["t1", "t3"])
+    (month_delta,) = rollup_model.apply_deltas.call_args.args[1].values()
+    assert month_delta["expenses"] == Decimal("-12")
+    recurring.apply_sync.assert_called_once_with("test-user", [], ["t1", "t3"])
+    cache.invalidate.assert_called_once_with("old-item")
+
+
+def test_stale_reads_queue_a_sync_when_webhooks_keep_the_store_current():
+    enqueue_sync = MagicMock()
+    controller = SyncController(MagicMock(), MagicMock(), MagicMock(), enqueue_sync=enqueue_sync)
+    controller.sync_user = MagicMock()
+    stale = {"user_id": "test-user", "access_token": "fake-access-token",
+             "transactions_cursor": "cursor-1", "transactions_synced_at": "2024-01-01T00:00:00"}
+
+    assert controller.ensure_synced(stale) is None
+    enqueue_sync.assert_called_once_with(stale)
+    controller.sync_user.assert_not_called()
+
+    # A user who was never synced has nothing stored to serve yet
+    controller.ensure_synced({"user_id": "new-user", "access_token": "fake-access-token"})
+    controller.sync_user.assert_called_once()
@@ -0,0 +1,64 @@
+import time
+import jwt
+import pytest
+from unittest.mock import MagicMock
+from cryptography.hazmat.primitives.asymmetric import rsa
+from app.utils.token_verifier import CognitoTokenVerifier, TokenVerificationError
+
+ISSUER = "https://cognito-idp.us-east-1.amazonaws.com/us-east-1_test"
+
+
+@pytest.fixture
+def signing_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture
+def verifier(signing_key):
+    verifier = CognitoTokenVerifier("us-east-1", "us-east-1_test", "app-client")
+    verifier.jwks_client = MagicMock()
+    verifier.jwks_client.get_signing_key_from_jwt.return_value.key = signing_key.public_key()
+    return verifier
+
+
+def _token(signing_key, **claims):
+    payload = {"sub": "test-user", "iss": ISSUER, "token_use": "access",
+               "client_id": "app-client", "exp": int(time.time()) + 3600}
+    payload.update(claims)
+    return jwt.encode(payload, signing_key, algorithm="RS256")
+
+
+def test_verify_caches_claims(verifier, signing_key):
+    token = _token(signing_key)
+
+    assert verifier.verify(token)["sub"] == "test-user"
+    assert verifier.verify(token)["sub"] == "test-user"
+    verifier.jwks_client.get_signing_key_from_jwt.assert_called_once()
+
+
+def test_verify_checks_audience_and_expiry(verifier, signing_key):
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(_token(signing_key, client_id="other-client"))
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(_token(signing_key, exp=int(time.time()) - 10))
+    assert verifier.verify(_token(signing_key, token_use="id", aud="app-client",
+                                  client_id=None))["sub"] == "test-user"
+
+
+def test_verify_can_require_a_token_use(verifier, signing_key):
+    id_token = _token(signing_key, token_use="id", aud="app-client", client_id=None)
+
+    assert verifier.verify(id_token, token_use="id")["sub"] == "test-user"
+    # Also when the claims are already cached
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(id_token, token_use="access")
+    assert verifier.verify(_token(signing_key), token_use="access")["sub"] == "test-user"
+
+
+def test_revoked_tokens_are_rejected(verifier, signing_key):
+    token = _token(signing_key)
+    verifier.verify(token)
+    verifier.revoke(token)
+
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(token)
@@ -0,0 +1,72 @@
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+from app.utils.transaction_aggregator import TransactionFrame
+
+
+def _random_transactions(count, seed=7):
+    rng = random.Random(seed)
+    categories = [["Food"], ["Travel"], ["Transfer"], None, ["Shops"]]
+    start = date(2024, 1, 1)
+    return [
+        {
+            "date": (start + timedelta(days=rng.randrange(366))).isoformat(),
+            "amount": round(rng.uniform(-500, 500), 2),
+            "category": rng.choice(categories),
+            "name": f"Merchant {rng.randrange(20)}",
+            "account_id": f"acc-{rng.randrange(3)}"
+        }
+        for _ in range(count)
+    ]
+
+
+def test_summary_matches_row_by_row_loop():
+    transactions = _random_transactions(2000)
+
+    income, expenses = 0, 0
+    for txn in transactions:
+        if txn["amount"] < 0:
+            income += abs(txn["amount"])
+        else:
+            expenses += txn["amount"]
+
+    summary = TransactionFrame(transactions).summary()
+    assert summary["income"] == income
+    assert summary["expenses"] == expenses
+    assert len(summary["income_details"]) + \
+        len(summary["expense_details"]) == 2000
+
+
+def test_monthly_and_categories_match_row_by_row_loop():
+    transactions = _random_transactions(2000)
+    transactions.append({"date": None, "amount": 5.0, "name": "No date"})
+
+    monthly = defaultdict(lambda: {"income": 0.0, "expenses": 0.0})
+    categories = defaultdict(float)
+    total = 0.0
+    for txn in transactions:
+        amount = txn["amount"]
+        if txn["date"]:
+            month = date.fromisoformat(txn["date"]).strftime("%b")
+            if amount < 0:
+                monthly[month]["income"] += abs(amount)
+            else:
+                monthly[month]["expenses"] += amount
+        if amount > 0:
+            categories[(txn.get("category") or ["Uncategorized"])[0]] += amount
+            total += amount
+
+    month_order = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                   "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    frame = TransactionFrame(transactions)
+    assert frame.monthly_summary(month_format="%b") == [
+        {"month": month, "income": round(monthly[month]["income"], 2),
+         "expenses": round(monthly[month]["expenses"], 2)}
+        for month in month_order if month in monthly
+    ]
+    assert frame.expense_categories() == {
+        "categories": [{"category": cat, "amount": round(amount, 2)}
+                       for cat, amount in categories.items()],
+        "total_categories": len(categories),
+        "total_expenses": round(total, 2)
+    }
@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock
+from app.models.user_model import UserModel
+from app.utils.ttl_cache import TTLCache
+
+
+def test_ttl_cache_expires_and_evicts():
+    now = [0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)           # evicts "b"
+    assert cache.get("b") is None
+
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_get_user_is_cached_until_update():
+    dynamodb = MagicMock()
+    table = dynamodb.Table.return_value
+    table.get_item.return_value = {
+        "Item": {"user_id": "test-user", "access_token": "fake-access-token"}}
+    user_model = UserModel(dynamodb, cache=TTLCache())
+
+    assert user_model.get_user("test-user")["access_token"] == "fake-access-token"
+    assert user_model.get_user("test-user")["access_token"] == "fake-access-token"
+    assert table.get_item.call_count == 1
+
+    user_model.update_item("test-user", access_token="new-access-token")
+    user_model.get_user("test-user")
+    assert table.get_item.call_count == 2
+
+
+def test_get_user_fresh_reads_consistently_and_refreshes_the_cache():
+    dynamodb = MagicMock()
+    table = dynamodb.Table.return_value
+    table.get_item.return_value = {"Item": {"user_id": "test-user", "item_id": "item-1"}}
+    user_model = UserModel(dynamodb, cache=TTLCache())
+
+    assert user_model.get_user_fresh("test-user")["item_id"] == "item-1"
+    table.get_item.assert_called_once_with(Key={"user_id": "test-user"}, ConsistentRead=True)
+    user_model.get_user("test-user")
+    assert table.get_item.call_count == 1
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import time
+import jwt
+import pytest
+from unittest.mock import MagicMock
+from cryptography.hazmat.primitives.asymmetric import ec
+from app.utils.webhook_verifier import PlaidWebhookVerifier, WebhookVerificationError
+from app.controllers.webhook_controller import WebhookController
+
+PRIVATE_KEY = ec.generate_private_key(ec.SECP256R1())
+PUBLIC_JWK = {**json.loads(jwt.algorithms.ECAlgorithm.to_jwk(PRIVATE_KEY.public_key())),
+              "alg": "ES256", "kid": "key-1", "use": "sig", "created_at": 0,
+              "expired_at": None}
+EVENT = {"webhook_type": "TRANSACTIONS", "webhook_code": "SYNC_UPDATES_AVAILABLE",
+         "item_id": "item-1"}
+
+
+def sign(body, iat=None):
+    claims = {"iat": iat or int(time.time()),
+              "request_body_sha256": hashlib.sha256(body).hexdigest()}
+    return jwt.encode(claims, PRIVATE_KEY, algorithm="ES256", headers={"kid": "key-1"})
+
+
+def make_verifier():
+    plaid_client = MagicMock()
+    plaid_client.webhook_verification_key_get.return_value.to_dict.return_value = {
+        "key": PUBLIC_JWK}
+    return PlaidWebhookVerifier(plaid_client), plaid_client
+
+
+def test_verifies_signature_and_caches_key():
+    verifier, plaid_client = make_verifier()
+    body = json.dumps(EVENT).encode()
+
+    verifier.verify(body, sign(body))
+    verifier.verify(body, sign(body))
+
+    plaid_client.webhook_verification_key_get.assert_called_once()
+
+
+def test_rejects_tampered_or_old_webhooks():
+    verifier, _ = make_verifier()
+    body = json.dumps(EVENT).encode()
+
+    with pytest.raises(WebhookVerificationError, match="does not match"):
+        verifier.verify(body + b" ", sign(body))
+    with pytest.raises(WebhookVerificationError, match="too old"):
+        verifier.verify(body, sign(body, iat=int(time.time()) - 600))
+    with pytest.raises(WebhookVerificationError):
+        verifier.verify(body, None)
+
+
+def test_transactions_webhook_syncs_the_item():
+    user_model = MagicMock()
+    user_model.get_user_by_item_id.return_value = {"user_id": "test-user", "item_id": "item-1"}
+    user_model.get_user_fresh.return_value = {
+        "user_id": "test-user", "item_id": "item-1", "access_token": "fake-access-token"}
+    sync_controller = MagicMock()
+    controller = WebhookController(user_model, sync_controller)
+
+    assert controller.should_handle(EVENT)
+    controller.handle(EVENT)
+
+    user_model.get_user_fresh.assert_called_once_with("test-user")
+    sync_controller.sync_user.assert_called_once_with(
+        {"user_id": "test-user", "item_id": "item-1", "access_token": "fake-access-token"})
+
+
+def test_webhook_for_a_replaced_item_is_ignored():
+    user_model = MagicMock()
+    # The item index still points at the user, who has since relinked
+    user_model.get_user_by_item_id.return_value = {"user_id": "test-user", "item_id": "item-1"}
+    user_model.get_user_fresh.return_value = {"user_id": "test-user", "item_id": "item-2"}
+    sync_controller = MagicMock()
+
+    assert WebhookController(user_model, sync_controller).handle(EVENT) is None
+    sync_controller.sync_user.assert_not_called()
+
+
+def test_webhook_endpoint_queues_verified_events(app, client, mocker):
+    mocker.patch('app.utils.webhook_verifier.PlaidWebhookVerifier.verify')
+    mock_submit = mocker.patch('app.utils.job_runner.JobRunner.submit',
+                               return_value={"job_id": "job-1"})
+
+    response = client.post("/plaid/webhook", json=EVENT)
+
+    assert response.status_code == 200
+    mock_submit.assert_called_once_with(
+        'plaid_webhook', {'event': EVENT}, key='item-1')
+
+
+def test_webhook_endpoint_rejects_unsigned_requests(client):
+    response = client.post("/plaid/webhook", json=EVENT)
+
+    assert response.status_code == 401